@@ -0,0 +1,36 @@
+"""add trigram indexes for fuzzy lookups
+
+Revision ID: 3b7d9f1c2a64
+Revises: e95c5c8352ee
+Create Date: 2026-10-17 10:03:27.118954
+
+"""
+from alembic import op
+
+
+revision = '3b7d9f1c2a64'
+down_revision = 'e95c5c8352ee'
+branch_labels = None
+depends_on = None
+
+# (index name, table, column) - must match the models' __table_args__
+TRIGRAM_INDEXES = [
+    ('ix_users_full_name_trgm', 'users', 'full_name'),
+    ('ix_users_email_trgm', 'users', 'email'),
+    ('ix_merches_name_trgm', 'merches', 'name'),
+    ('ix_merches_brand_trgm', 'merches', 'brand'),
+]
+
+
+def upgrade():
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for name, table, column in TRIGRAM_INDEXES:
+        op.create_index(
+            name, table, [column], unique=False,
+            postgresql_using='gin', postgresql_ops={column: 'gin_trgm_ops'},
+        )
+
+
+def downgrade():
+    for name, table, _ in reversed(TRIGRAM_INDEXES):
+        op.drop_index(name, table_name=table, postgresql_using='gin')
@@ -0,0 +1,38 @@
+"""add translations table
+
+Revision ID: 5a1e7c3b9f20
+Revises: 8f2c4e6a1d93
+Create Date: 2026-10-17 12:40:55.261873
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '5a1e7c3b9f20'
+down_revision = '8f2c4e6a1d93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'translations',
+        sa.Column('text_hash', sa.String(length=32), nullable=False),
+        sa.Column('source_lang', sa.String(length=5), nullable=False),
+        sa.Column('target_lang', sa.String(length=5), nullable=False),
+        sa.Column('source_text', sa.Text(), nullable=False),
+        sa.Column('translated_text', sa.Text(), nullable=False),
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_translations_id'), 'translations', ['id'], unique=False)
+    op.create_index(op.f('ix_translations_text_hash'), 'translations', ['text_hash'], unique=True)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_translations_text_hash'), table_name='translations')
+    op.drop_index(op.f('ix_translations_id'), table_name='translations')
+    op.drop_table('translations')
@@ -0,0 +1,71 @@
+"""add composite and partial indexes for list queries
+
+Revision ID: 8f2c4e6a1d93
+Revises: 3b7d9f1c2a64
+Create Date: 2026-10-17 11:26:04.730512
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '8f2c4e6a1d93'
+down_revision = '3b7d9f1c2a64'
+branch_labels = None
+depends_on = None
+
+# Every list endpoint filters on a few equality columns and pages newest first
+# (ORDER BY created_at DESC, id DESC); a btree on (filter, created_at, id)
+# serves that with a backward index scan and no sort.
+# (index name, table, columns, partial index predicate) - must match the models
+LIST_INDEXES = [
+    ('ix_news_created_at_id', 'news', ['created_at', 'id'], None),
+    ('ix_news_category_created_at_id', 'news', ['category', 'created_at', 'id'], None),
+    ('ix_news_author_id_created_at', 'news', ['author_id', 'created_at'], None),
+
+    ('ix_merches_created_at_id', 'merches', ['created_at', 'id'], None),
+    ('ix_merches_is_available_created_at_id', 'merches', ['is_available', 'created_at', 'id'], None),
+    ('ix_merches_owner_id_created_at', 'merches', ['owner_id', 'created_at'], None),
+    ('ix_merches_new_created_at_id', 'merches', ['created_at', 'id'], 'is_new'),
+    ('ix_merches_discount_percent', 'merches', ['discount_percent'], 'discount_percent > 0'),
+
+    ('ix_job_vacancies_created_at_id', 'job_vacancies', ['created_at', 'id'], None),
+    ('ix_job_vacancies_is_active_created_at_id', 'job_vacancies', ['is_active', 'created_at', 'id'], None),
+    ('ix_job_vacancies_region_created_at', 'job_vacancies', ['region', 'created_at'], None),
+    ('ix_job_vacancies_employment_type_created_at', 'job_vacancies', ['employment_type', 'created_at'], None),
+    ('ix_job_vacancies_sport_type_created_at', 'job_vacancies', ['sport_type', 'created_at'], None),
+
+    ('ix_education_created_at_id', 'education', ['created_at', 'id'], None),
+    ('ix_education_region_created_at_id', 'education', ['region', 'created_at', 'id'], None),
+    ('ix_education_type_created_at_id', 'education', ['type', 'created_at', 'id'], None),
+
+    ('ix_courses_approved_created_at_id', 'courses', ['created_at', 'id'], "status = 'approved'"),
+    ('ix_courses_approved_sport_type_created_at_id', 'courses', ['sport_type', 'created_at', 'id'], "status = 'approved'"),
+    ('ix_courses_pending_created_at', 'courses', ['created_at'], "status = 'pending'"),
+    ('ix_courses_uploaded_by_id_created_at', 'courses', ['uploaded_by_id', 'created_at'], None),
+
+    ('ix_users_created_at_id', 'users', ['created_at', 'id'], None),
+    ('ix_users_role_created_at_id', 'users', ['role', 'created_at', 'id'], None),
+
+    ('ix_cart_user_id_merch_id', 'cart', ['user_id', 'merch_id'], None),
+    ('ix_favorites_user_id_merch_id', 'favorites', ['user_id', 'merch_id'], None),
+]
+
+
+def upgrade():
+    # CONCURRENTLY so the tables stay writable while the indexes build; it
+    # can't run inside the migration transaction.
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in LIST_INDEXES:
+            op.create_index(
+                name, table, columns, unique=False,
+                postgresql_where=sa.text(where) if where else None,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(LIST_INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,34 @@
+"""add view_count_flushes table
+
+Revision ID: a9d4f2b7c3e8
+Revises: f3c7a1d9e5b2
+Create Date: 2026-10-17 23:05:41.218364
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'a9d4f2b7c3e8'
+down_revision = 'f3c7a1d9e5b2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'view_count_flushes',
+        sa.Column('flush_id', sa.String(length=32), nullable=False),
+        sa.Column('resource', sa.String(length=30), nullable=False),
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('flush_id')
+    )
+    op.create_index(op.f('ix_view_count_flushes_id'), 'view_count_flushes', ['id'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_view_count_flushes_id'), table_name='view_count_flushes')
+    op.drop_table('view_count_flushes')
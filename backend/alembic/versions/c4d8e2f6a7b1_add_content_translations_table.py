@@ -0,0 +1,38 @@
+"""add content_translations table
+
+Revision ID: c4d8e2f6a7b1
+Revises: 5a1e7c3b9f20
+Create Date: 2026-10-17 14:05:12.904417
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'c4d8e2f6a7b1'
+down_revision = '5a1e7c3b9f20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'content_translations',
+        sa.Column('resource', sa.String(length=30), nullable=False),
+        sa.Column('resource_id', sa.String(length=36), nullable=False),
+        sa.Column('field', sa.String(length=50), nullable=False),
+        sa.Column('lang', sa.String(length=5), nullable=False),
+        sa.Column('text', sa.Text(), nullable=False),
+        sa.Column('source_hash', sa.String(length=32), nullable=False),
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('resource', 'resource_id', 'lang', 'field', name='uq_content_translation')
+    )
+    op.create_index(op.f('ix_content_translations_id'), 'content_translations', ['id'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_content_translations_id'), table_name='content_translations')
+    op.drop_table('content_translations')
@@ -0,0 +1,42 @@
+"""add stored_files table
+
+Revision ID: d7e3a9c5b2f4
+Revises: c4d8e2f6a7b1
+Create Date: 2026-10-17 17:42:08.517203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'd7e3a9c5b2f4'
+down_revision = 'c4d8e2f6a7b1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'stored_files',
+        sa.Column('key', sa.String(length=255), nullable=False),
+        sa.Column('sha256', sa.String(length=64), nullable=False),
+        sa.Column('size', sa.BigInteger(), nullable=False),
+        sa.Column('content_type', sa.String(length=100), nullable=True),
+        sa.Column('ref_count', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('key')
+    )
+    op.create_index(op.f('ix_stored_files_id'), 'stored_files', ['id'], unique=False)
+    op.create_index(
+        'ix_stored_files_unreferenced', 'stored_files', ['updated_at'], unique=False,
+        postgresql_where=sa.text('ref_count <= 0')
+    )
+
+
+def downgrade():
+    op.drop_index('ix_stored_files_unreferenced', table_name='stored_files', postgresql_where=sa.text('ref_count <= 0'))
+    op.drop_index(op.f('ix_stored_files_id'), table_name='stored_files')
+    op.drop_table('stored_files')
@@ -0,0 +1,30 @@
+"""add image variants
+
+Revision ID: e2b6f8a4c9d1
+Revises: d7e3a9c5b2f4
+Create Date: 2026-10-17 19:05:41.238916
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = 'e2b6f8a4c9d1'
+down_revision = 'd7e3a9c5b2f4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('stored_files', sa.Column('variants', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+    op.add_column('users', sa.Column('avatar_variants', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+    op.add_column('users', sa.Column('cover_variants', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+    op.add_column('gallery_photos', sa.Column('image_variants', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+
+
+def downgrade():
+    op.drop_column('gallery_photos', 'image_variants')
+    op.drop_column('users', 'cover_variants')
+    op.drop_column('users', 'avatar_variants')
+    op.drop_column('stored_files', 'variants')
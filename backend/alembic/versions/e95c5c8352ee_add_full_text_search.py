@@ -0,0 +1,68 @@
+"""add full-text search vectors
+
+Revision ID: e95c5c8352ee
+Revises: cfdb5a218e8b
+Create Date: 2026-10-17 09:12:41.503118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = 'e95c5c8352ee'
+down_revision = 'cfdb5a218e8b'
+branch_labels = None
+depends_on = None
+
+# (table, [(column, weight), ...]) - must match the models' search_vector_column()
+SEARCHABLE_TABLES = [
+    ('news', [('title', 'A'), ('snippet', 'B'), ('content', 'C')]),
+    ('merches', [('name', 'A'), ('brand', 'A'), ('description', 'B')]),
+    ('job_vacancies', [('title', 'A'), ('company', 'A'), ('description', 'B')]),
+    ('education', [('name', 'A'), ('description', 'B'), ('address', 'C')]),
+    ('courses', [('title', 'A'), ('description', 'B')]),
+]
+
+
+def _vector_sql(columns):
+    return " || ".join(
+        f"setweight(to_tsvector('simple_unaccent', coalesce({name}, '')), '{weight}')"
+        for name, weight in columns
+    )
+
+
+def upgrade():
+    # Language-neutral config (Uzbek/Russian/English content): no stemming,
+    # lowercased, diacritics stripped
+    op.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+    op.execute("""
+        DO $$
+        BEGIN
+            IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'simple_unaccent') THEN
+                CREATE TEXT SEARCH CONFIGURATION simple_unaccent (COPY = simple);
+                ALTER TEXT SEARCH CONFIGURATION simple_unaccent
+                    ALTER MAPPING FOR hword, hword_part, word WITH unaccent, simple;
+            END IF;
+        END
+        $$;
+    """)
+
+    for table, columns in SEARCHABLE_TABLES:
+        op.add_column(table, sa.Column(
+            'search_vector',
+            postgresql.TSVECTOR(),
+            sa.Computed(_vector_sql(columns), persisted=True),
+            nullable=True,
+        ))
+        op.create_index(
+            f'ix_{table}_search_vector', table, ['search_vector'],
+            unique=False, postgresql_using='gin',
+        )
+
+
+def downgrade():
+    for table, _ in reversed(SEARCHABLE_TABLES):
+        op.drop_index(f'ix_{table}_search_vector', table_name=table, postgresql_using='gin')
+        op.drop_column(table, 'search_vector')
+    op.execute("DROP TEXT SEARCH CONFIGURATION IF EXISTS simple_unaccent")
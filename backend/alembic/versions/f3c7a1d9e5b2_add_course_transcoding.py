@@ -0,0 +1,35 @@
+"""add course transcoding
+
+Revision ID: f3c7a1d9e5b2
+Revises: e2b6f8a4c9d1
+Create Date: 2026-10-17 21:14:27.604518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = 'f3c7a1d9e5b2'
+down_revision = 'e2b6f8a4c9d1'
+branch_labels = None
+depends_on = None
+
+transcodestatus = postgresql.ENUM('pending', 'processing', 'ready', 'failed', name='transcodestatus', create_type=False)
+
+
+def upgrade():
+    transcodestatus.create(op.get_bind(), checkfirst=True)
+    op.add_column('courses', sa.Column('hls_manifest_url', sa.String(length=1024), nullable=True))
+    # Existing courses stay NULL: served as uploaded, no transcoding required
+    op.add_column('courses', sa.Column('transcode_status', transcodestatus, nullable=True))
+    op.add_column('courses', sa.Column('transcode_error', sa.Text(), nullable=True))
+    op.add_column('courses', sa.Column('publish_when_ready', sa.Boolean(), server_default='false', nullable=False))
+
+
+def downgrade():
+    op.drop_column('courses', 'publish_when_ready')
+    op.drop_column('courses', 'transcode_error')
+    op.drop_column('courses', 'transcode_status')
+    op.drop_column('courses', 'hls_manifest_url')
+    transcodestatus.drop(op.get_bind(), checkfirst=True)
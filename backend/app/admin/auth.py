@@ -10,7 +10,7 @@ import bcrypt
 
 from app.db.session import get_db, AsyncSessionLocal
 from starlette.responses import RedirectResponse
-from app.models.user import User, UserRole
+from app.models.user import User, UserLoad, UserRole
 from app.core.security import create_access_token, verify_password, get_current_active_user
 from app.schemas.auth import TokenResponse
 from sqladmin.authentication import AuthenticationBackend
@@ -46,7 +46,7 @@ async def login(
         db: AsyncSession = Depends(get_db)
 ):
     # Query user by email
-    result = await db.execute(select(User).where(User.email == form_data.username))
+    result = await db.execute(select(User).options(*UserLoad.options(UserLoad.AUTH)).where(User.email == form_data.username))
     user = result.scalar_one_or_none()
 
     # Verify user exists
@@ -88,7 +88,7 @@ async def register(
 ):
     try:
         # Check if user already exists
-        result = await db.execute(select(User).where(User.email == user_data.email))
+        result = await db.execute(select(User).options(*UserLoad.options(UserLoad.AUTH)).where(User.email == user_data.email))
         existing_user = result.scalar_one_or_none()
 
         if existing_user:
@@ -174,7 +174,7 @@ class AdminAuthBackend(AuthenticationBackend):
 
         async with AsyncSessionLocal() as session:
             result = await session.execute(
-                select(User).where(User.email == username)
+                select(User).options(*UserLoad.options(UserLoad.AUTH)).where(User.email == username)
             )
             user = result.scalar_one_or_none()
 
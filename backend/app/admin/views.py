@@ -1,15 +1,27 @@
 from sqladmin import ModelView
 import wtforms
 from wtforms.validators import DataRequired
+from sqlalchemy.ext.asyncio import async_object_session
 from starlette.requests import Request
 from app.models.news import News
 from app.models.merch import Merch
 from app.models.education import Education
 from app.models.job_vacancy import JobVacancy
 from app.models.user import User, UserRole
+from app.core.counting import invalidate_counts
+from app.core.cache import response_cache
+from app.core.principal import principal_cache
+from app.core.content_translation import TRANSLATABLE_CONTENT, schedule_translation
+from app.core.password import get_password_hash
+from app.services.storage import storage_service
+from app.services.user_service import invalidate_deleted_user, release_user_files
 
 
 class BaseAdminView(ModelView):
+    # Response cache namespace of the public API for this model (None = not cached)
+    cache_resource = None
+    # Columns holding upload URLs, reference-counted in stored_files like the API does
+    upload_columns = ()
 
     def _is_super(self, request: Request) -> bool:
         # Use new session key "admin_is_superuser"
@@ -48,13 +60,57 @@ class BaseAdminView(ModelView):
     def can_view_details(self, request: Request) -> bool:
         return True
 
+    async def on_model_change(self, data: dict, model, is_created: bool, request: Request) -> None:
+        changes = [
+            (None if is_created else getattr(model, column), data[column])
+            for column in self.upload_columns if column in data
+        ]
+        if not changes:
+            return
+        # An edited row is loaded in sqladmin's session: count the files in
+        # its transaction. A new row isn't in one yet; counting it early only
+        # keeps a file longer if the insert fails.
+        session = async_object_session(model)
+        if session is not None:
+            for old_url, new_url in changes:
+                await storage_service.replace(session, old_url, new_url)
+            return
+        async with self.session_maker() as session:
+            for old_url, new_url in changes:
+                await storage_service.replace(session, old_url, new_url)
+            await session.commit()
+
+    # Runs in the deleting session, so the release commits with the delete
+    async def on_model_delete(self, model, request: Request) -> None:
+        session = async_object_session(model)
+        await storage_service.release(session, *(getattr(model, column) for column in self.upload_columns))
+
+    # Rows edited here bypass the API handlers, so drop the cached list
+    # counts and responses for this table the same way they do.
+    async def after_model_change(self, data: dict, model, is_created: bool, request: Request) -> None:
+        await invalidate_counts(self.model)
+        if self.cache_resource:
+            await response_cache.invalidate(self.cache_resource, model.id)
+        if self.cache_resource in TRANSLATABLE_CONTENT:
+            schedule_translation(self.cache_resource, model.id)
+
+    async def after_model_delete(self, model, request: Request) -> None:
+        await invalidate_counts(self.model)
+        if self.cache_resource:
+            await response_cache.invalidate(self.cache_resource, model.id)
+        if self.cache_resource in TRANSLATABLE_CONTENT:
+            schedule_translation(self.cache_resource, model.id)
+
 
 class NewsAdmin(BaseAdminView, model=News):
     name = "News"
+    cache_resource = "news"
+    upload_columns = ("image_url",)
     name_plural = "News Articles"
     icon = "fa-solid fa-newspaper"
     column_list = [News.id, News.title, News.category, News.author, News.views_count, News.created_at]
     column_searchable_list = [News.title, News.content, News.snippet]
+    column_details_exclude_list = [News.search_vector]
     column_sortable_list = [News.id, News.title, News.views_count, News.created_at]
     column_default_sort = [(News.created_at, True)]
     column_filters = [News.category, News.author_id]
@@ -75,10 +131,13 @@ class NewsAdmin(BaseAdminView, model=News):
 
 class MerchAdmin(BaseAdminView, model=Merch):
     name = "Merchandise"
+    cache_resource = "merches"
+    upload_columns = ("image_url",)
     name_plural = "Merchandise"
     icon = "fa-solid fa-shirt"
     column_list = [Merch.id, Merch.name, Merch.brand, Merch.category, Merch.price, Merch.stock, Merch.is_available, Merch.owner, Merch.created_at]
     column_searchable_list = [Merch.name, Merch.description, Merch.brand]
+    column_details_exclude_list = [Merch.search_vector]
     column_sortable_list = [Merch.id, Merch.name, Merch.price, Merch.stock, Merch.created_at]
     column_default_sort = [(Merch.created_at, True)]
     column_filters = [Merch.category, Merch.is_available, Merch.owner_id]
@@ -97,10 +156,13 @@ class MerchAdmin(BaseAdminView, model=Merch):
 
 class EducationAdmin(BaseAdminView, model=Education):
     name = "Educational Institution"
+    cache_resource = "education"
+    upload_columns = ("image_url",)
     name_plural = "Educational Institutions"
     icon = "fa-solid fa-school"
     column_list = [Education.id, Education.name, Education.region, Education.address, Education.created_at]
     column_searchable_list = [Education.name, Education.description, Education.address]
+    column_details_exclude_list = [Education.search_vector]
     column_sortable_list = [Education.id, Education.name, Education.created_at]
     column_filters = [Education.region, Education.type]
     form_overrides = {
@@ -123,6 +185,7 @@ class EducationAdmin(BaseAdminView, model=Education):
         Education.description: lambda m, a: (m.description[:100] + "...") if m.description and len(m.description) > 100 else m.description,
     }
     async def on_model_change(self, data: dict, model, is_created: bool, request) -> None:
+        await super().on_model_change(data, model, is_created, request)
         education_type = data.get("type")
         if education_type is not None:
             normalized_type = str(education_type).strip().lower()
@@ -138,12 +201,15 @@ class EducationAdmin(BaseAdminView, model=Education):
 
 class JobVacancyAdmin(BaseAdminView, model=JobVacancy):
     name = "Job Vacancy"
+    cache_resource = "job_vacancies"
+    upload_columns = ("image_url",)
     name_plural = "Job Vacancies"
     icon = "fa-solid fa-briefcase"
     column_list = [JobVacancy.id, JobVacancy.title, JobVacancy.company, JobVacancy.region,
                    JobVacancy.employment_type, JobVacancy.sport_type, JobVacancy.location,
                    JobVacancy.is_active, JobVacancy.created_at]
     column_searchable_list = [JobVacancy.title, JobVacancy.description, JobVacancy.company]
+    column_details_exclude_list = [JobVacancy.search_vector]
     column_sortable_list = [JobVacancy.id, JobVacancy.title, JobVacancy.created_at]
     column_default_sort = [(JobVacancy.created_at, True)]
     column_filters = [JobVacancy.is_active, JobVacancy.location, JobVacancy.region,
@@ -168,6 +234,7 @@ class JobVacancyAdmin(BaseAdminView, model=JobVacancy):
 class UserAdmin(BaseAdminView, model=User):
     name = "User"
     name_plural = "Users"
+    upload_columns = ("avatar_url", "cover_url", "passport_url")
     icon = "fa-solid fa-users"
     column_list = [User.id, User.email, User.full_name, User.role, User.is_active, User.is_superuser, User.created_at]
     column_searchable_list = [User.email, User.full_name]
@@ -181,6 +248,7 @@ class UserAdmin(BaseAdminView, model=User):
     }
 
     async def on_model_change(self, data: dict, model, is_created: bool, request) -> None:
+        await super().on_model_change(data, model, is_created, request)
         password = data.pop("password", None)
 
         if is_created:
@@ -190,6 +258,21 @@ class UserAdmin(BaseAdminView, model=User):
         elif password:
             model.hashed_password = get_password_hash(password)
 
+    # Role/active/superuser edits must reach the cached auth principal
+    async def after_model_change(self, data: dict, model, is_created: bool, request: Request) -> None:
+        await super().after_model_change(data, model, is_created, request)
+        await principal_cache.invalidate(model.id)
+
+    # Gallery photos, news and merch are deleted with the user: release
+    # their files too (in place of the upload columns alone), and drop
+    # their cached counts and responses afterwards
+    async def on_model_delete(self, model, request: Request) -> None:
+        model.deleted_content = await release_user_files(async_object_session(model), model)
+
+    async def after_model_delete(self, model, request: Request) -> None:
+        await super().after_model_delete(model, request)
+        await invalidate_deleted_user(model.id, model.deleted_content)
+
     page_size = 20
     can_export = True
     allow_admin_delete = False
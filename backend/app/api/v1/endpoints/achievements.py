@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select
 from typing import Optional
 
 from app.db.session import get_db
@@ -25,11 +25,10 @@ async def list_achievements(
         raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="user_id query param is required")
 
     query = select(Achievement).where(Achievement.user_id == user_id).order_by(Achievement.created_at.desc())
-    count_query = select(func.count()).select_from(query.subquery())
-    total = await db.scalar(count_query)
     result = await db.execute(query)
     items = result.scalars().all()
-    return {"items": items, "total": total}
+    # The whole list is returned (no pagination), so the total is just its length
+    return {"items": items, "total": len(items)}
 
 
 @router.post("/", response_model=AchievementResponse, status_code=status.HTTP_201_CREATED)
@@ -7,10 +7,11 @@ from pydantic import BaseModel, EmailStr
 import bcrypt
 
 from app.db.session import get_db
-from app.models.user import User, UserRole
+from app.models.user import User, UserLoad, UserRole
 from app.core.security import create_access_token, verify_password, get_current_active_user
 from app.schemas.auth import TokenResponse
 from app.core.config import settings
+from app.core.counting import invalidate_counts
 
 router = APIRouter()
 
@@ -44,7 +45,7 @@ async def login(
         db: AsyncSession = Depends(get_db)
 ):
     # Query user by email
-    result = await db.execute(select(User).where(User.email == form_data.username))
+    result = await db.execute(select(User).options(*UserLoad.options(UserLoad.AUTH)).where(User.email == form_data.username))
     user = result.scalar_one_or_none()
 
     # Verify user exists
@@ -86,7 +87,7 @@ async def register(
 ):
     try:
         # Check if user already exists
-        result = await db.execute(select(User).where(User.email == user_data.email))
+        result = await db.execute(select(User).options(*UserLoad.options(UserLoad.AUTH)).where(User.email == user_data.email))
         existing_user = result.scalar_one_or_none()
 
         if existing_user:
@@ -115,6 +116,7 @@ async def register(
 
         db.add(new_user)
         await db.commit()
+        await invalidate_counts(User)
         await db.refresh(new_user)
 
         return new_user
@@ -5,8 +5,9 @@ from sqlalchemy.orm import selectinload
 from app.db.session import get_db
 from app.models.cart import Cart
 from app.models.merch import Merch
-from app.core.security import get_current_active_user
-from app.models.user import User
+from app.models.user import UserLoad
+from app.core.security import get_current_active_principal
+from app.core.principal import Principal
 
 router = APIRouter()
 
@@ -14,11 +15,11 @@ router = APIRouter()
 @router.get("/")
 async def view_cart(
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_principal)
 ):
     result = await db.execute(
         select(Cart)
-        .options(selectinload(Cart.merch).selectinload(Merch.owner))
+        .options(UserLoad.related(Merch.owner, UserLoad.CARD, parent=selectinload(Cart.merch)))
         .where(Cart.user_id == current_user.id)
     )
     items = result.scalars().all()
@@ -51,7 +52,7 @@ async def view_cart(
 async def add_to_cart(
     body: dict,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_principal)
 ):
     merch_id = body.get("merch_id")
     quantity = body.get("quantity", 1)
@@ -84,7 +85,7 @@ async def update_cart_item(
     cart_id: int,
     body: dict,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_principal)
 ):
     quantity = body.get("quantity", 1)
 
@@ -105,7 +106,7 @@ async def update_cart_item(
 async def remove_from_cart(
     cart_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_principal)
 ):
     cart_res = await db.execute(
         select(Cart).where(Cart.id == cart_id, Cart.user_id == current_user.id)
@@ -123,7 +124,7 @@ async def remove_from_cart(
 @router.delete("/clear")
 async def clear_cart(
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_principal)
 ):
     result = await db.execute(
         select(Cart).where(Cart.user_id == current_user.id)
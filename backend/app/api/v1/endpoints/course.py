@@ -14,25 +14,36 @@ from fastapi import (
     Form,
     HTTPException,
     Query,
+    Request,
     UploadFile,
     status,
 )
 from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, func, update
 
 from app.db.session import get_db
 from app.core.security import get_current_active_user
 from app.core.permissions import require_admin_or_superuser
-from app.models.course import Course, CourseStatus, SportType
-from app.models.user import User, UserRole
+from app.core.pagination import paginate
+from app.core.search import apply_search
+from app.core.cards import COURSE_CARD_COLUMNS, attach_users, card_select
+from app.core.counting import count_rows, invalidate_counts
+from app.core.cache import cached_response, response_cache, json_response, overlay_fields, offset_field
+from app.core.http_cache import not_modified
+from app.core.view_counter import view_counter
+from app.core.content_translation import ContentLanguage, apply_translations, schedule_translation
+from app.services.storage import storage_service
+from app.services.video import schedule_transcode
+from app.models.course import Course, CourseStatus, SportType, TranscodeStatus
+from app.models.user import User, UserLoad, UserRole
 from app.schemas.course import (
     CourseCreate,
     CourseUpdate,
     CourseReview,
     CourseResponse,
     CoursesPage,
+    CourseCardsPage,
 )
 # NOTE: best guess based on your app.core.security / app.core.permissions layout.
 # If this import fails, tell me the real path to your settings object and I'll fix it.
@@ -45,66 +56,15 @@ ALLOWED_VIDEO_TYPES = {"video/mp4", "video/webm", "video/quicktime", "video/x-ms
 ALLOWED_VIDEO_EXTENSIONS = {".mp4", ".webm", ".mov", ".avi"}
 ALLOWED_IMAGE_TYPES = {"image/jpeg", "image/png", "image/webp"}
 ALLOWED_IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp"}
-MAX_VIDEO_SIZE_MB   = 500
-MAX_VIDEO_SIZE_BYTES = MAX_VIDEO_SIZE_MB * 1024 * 1024
+MAX_VIDEO_SIZE_BYTES = settings.MAX_VIDEO_UPLOAD_SIZE
+MAX_THUMBNAIL_SIZE_BYTES = 5 * 1024 * 1024
 MEDIA_DIR = settings.UPLOAD_DIR
+COURSE_LIST_CACHE_TTL   = 60
+COURSE_DETAIL_CACHE_TTL = 300
 
 
 # ─── Helpers (no DB access) ───────────────────────────────────────────────────
 
-def _save_upload(
-    upload: UploadFile,
-    subfolder: str,
-    allowed_extensions: set[str],
-    max_size_bytes: Optional[int] = None,
-) -> str:
-    """
-    Save an uploaded file to MEDIA_DIR/{subfolder}/ and return its relative URL.
-    Replace this entire function with S3/GCS logic if you use cloud storage.
-
-    The extension is checked against an explicit allowlist here — the client's
-    Content-Type header (checked separately by callers) is not trustworthy on
-    its own, since it's just a header the client sets and can be spoofed.
-    """
-    ext = os.path.splitext(upload.filename or "")[1].lower()
-    if ext not in allowed_extensions:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Unsupported file extension: {ext or '(none)'}. "
-                   f"Allowed: {', '.join(sorted(allowed_extensions))}",
-        )
-
-    dest_dir = os.path.join(MEDIA_DIR, subfolder)
-    os.makedirs(dest_dir, exist_ok=True)
-
-    filename = f"{uuid.uuid4()}{ext}"
-    dest     = os.path.join(dest_dir, filename)
-
-    size = 0
-    chunk_size = 1024 * 1024  # 1 MB at a time, so we never buffer a huge file fully in memory
-    try:
-        with open(dest, "wb") as f:
-            while True:
-                chunk = upload.file.read(chunk_size)
-                if not chunk:
-                    break
-                size += len(chunk)
-                if max_size_bytes and size > max_size_bytes:
-                    raise HTTPException(
-                        status_code=400,
-                        detail=f"File exceeds the maximum allowed size of "
-                               f"{max_size_bytes // (1024 * 1024)}MB.",
-                    )
-                f.write(chunk)
-    except HTTPException:
-        # Clean up the partial file so a rejected oversized upload doesn't linger on disk
-        if os.path.exists(dest):
-            os.remove(dest)
-        raise
-
-    return f"/uploads/{subfolder}/{filename}"
-
-
 def _generate_qr(course_id: uuid.UUID) -> tuple[str, str]:
     """
     Generate a QR code PNG for the course detail page.
@@ -135,41 +95,46 @@ def _generate_qr(course_id: uuid.UUID) -> tuple[str, str]:
 
 # ─── Public endpoints (approved courses only) ─────────────────────────────────
 
-@router.get("", response_model=CoursesPage)
+@router.get("", response_model=CourseCardsPage)
+@cached_response("courses", CourseCardsPage, ttl=COURSE_LIST_CACHE_TTL, orm_model=Course)
 async def list_courses(
     skip:        int                  = Query(0, ge=0),
     limit:       int                  = Query(20, ge=1, le=100),
     sport_type:  Optional[SportType]  = Query(None, description="Filter by sport type"),
-    search:      Optional[str]        = Query(None, description="Search in title/description"),
+    search:      Optional[str]        = Query(None, description="Full-text search in title/description"),
+    cursor:      Optional[str]        = Query(None, description="Keyset cursor from a previous page's next_cursor (skip is ignored)"),
+    lang:        Optional[ContentLanguage] = Query(None, description="Response language (default: original Uzbek)"),
     db:          AsyncSession         = Depends(get_db),
 ):
     """
     Public endpoint — returns only approved courses.
     Supports search (title + description) and filter by sport_type.
     """
+    # Cards only: no description/review fields, plain rows instead of ORM objects
     query = (
-        select(Course)
-        .options(selectinload(Course.uploaded_by))
+        card_select(COURSE_CARD_COLUMNS)
         .where(Course.status == CourseStatus.approved)
     )
 
     if sport_type:
         query = query.where(Course.sport_type == sport_type)
 
+    # Full-text search, ranked by relevance
     if search:
-        term = f"%{search}%"
-        query = query.where(
-            (Course.title.ilike(term)) | (Course.description.ilike(term))
-        )
+        query = apply_search(query, Course, search)
 
-    count_query = select(func.count()).select_from(query.subquery())
-    total = await db.scalar(count_query)
+    total, total_is_estimate = await count_rows(
+        db, query, Course, None if search else {"status": CourseStatus.approved, "sport_type": sport_type}
+    )
 
-    query = query.order_by(Course.created_at.desc()).offset(skip).limit(limit)
-    result = await db.execute(query)
-    items = result.scalars().all()
+    items, next_cursor = await paginate(db, query, Course, skip, limit, cursor, ordered=bool(search))
+    await attach_users(db, items, "uploaded_by_id", "uploaded_by")
+    await apply_translations(db, "courses", items, lang)
 
-    return {"items": items, "total": total, "skip": skip, "limit": limit}
+    return {
+        "items": items, "total": total, "skip": skip, "limit": limit,
+        "next_cursor": next_cursor, "total_is_estimate": total_is_estimate,
+    }
 
 
 @router.get("/my", response_model=CoursesPage)
@@ -181,48 +146,88 @@ async def list_my_courses(
 ):
     query = (
         select(Course)
-        .options(selectinload(Course.uploaded_by))
+        .options(UserLoad.related(Course.uploaded_by, UserLoad.CARD))
         .where(Course.uploaded_by_id == current_user.id)
     )
 
-    count_query = select(func.count()).select_from(query.subquery())
-    total = await db.scalar(count_query)
+    total, total_is_estimate = await count_rows(db, query, Course, {"uploaded_by_id": current_user.id})
 
     query = query.order_by(Course.created_at.desc()).offset(skip).limit(limit)
     result = await db.execute(query)
     items = result.scalars().all()
 
-    return {"items": items, "total": total, "skip": skip, "limit": limit}
+    return {"items": items, "total": total, "skip": skip, "limit": limit, "total_is_estimate": total_is_estimate}
 
 
 @router.get("/{course_id}", response_model=CourseResponse)
 async def get_course(
+    request:   Request,
     course_id: uuid.UUID,
+    lang:      Optional[ContentLanguage] = Query(None, description="Response language (default: original Uzbek)"),
     db:        AsyncSession = Depends(get_db),
 ):
     """Public — returns a single approved course and increments its view count."""
-    result = await db.execute(
-        select(Course)
-        .options(selectinload(Course.uploaded_by))
+    # A revalidation of an unchanged course is still a view
+    validators = await response_cache.object_validators(
+        db, "courses", Course, course_id, lang, COURSE_DETAIL_CACHE_TTL,
+        criteria=(Course.status == CourseStatus.approved,),
+    )
+    if validators is not None and validators.is_fresh(request):
+        await view_counter.record("courses", course_id)
+        return not_modified(validators.headers)
+    headers = validators.headers if validators is not None else None
+
+    # The serialized course is cached (per language); only the view counter is live
+    cache_key = response_cache.object_key("courses", course_id, lang)
+    payload = await response_cache.get(cache_key, local=True)
+    if payload is None:
+        # Read before the row, so a body loaded before a write isn't stored after it
+        generation = await response_cache.generation("courses")
+        result = await db.execute(
+            select(Course)
+            .options(UserLoad.related(Course.uploaded_by, UserLoad.CARD))
+            .where(
+                Course.id == course_id,
+                Course.status == CourseStatus.approved,
+            )
+        )
+        course = result.scalar_one_or_none()
+
+        if not course:
+            raise HTTPException(status_code=404, detail="Course not found")
+
+        data = CourseResponse.model_validate(course).model_dump()
+        await apply_translations(db, "courses", [data], lang)
+        payload = CourseResponse.model_validate(data).model_dump_json().encode("utf-8")
+        await response_cache.set_if_current("courses", generation, cache_key, payload, COURSE_DETAIL_CACHE_TTL, local=True)
+
+    # Views are buffered in Redis and flushed to Postgres by a beat task;
+    # report the stored count plus the views not written yet
+    pending_views = await view_counter.record("courses", course_id)
+    if pending_views is not None:
+        return json_response(offset_field(payload, "view_count", pending_views), headers=headers)
+
+    # Redis unavailable: increment the row directly (guard against legacy NULLs,
+    # same pattern as news.py). The status check also catches a course that was
+    # unpublished after its body was cached.
+    view_count = await db.scalar(
+        update(Course)
         .where(
             Course.id == course_id,
             Course.status == CourseStatus.approved,
         )
+        .values(
+            view_count=func.coalesce(Course.view_count, 0) + 1,
+            updated_at=Course.updated_at,
+        )
+        .returning(Course.view_count)
     )
-    course = result.scalar_one_or_none()
+    await db.commit()
 
-    if not course:
+    if view_count is None:
         raise HTTPException(status_code=404, detail="Course not found")
 
-    # Increment view count (guard against legacy NULLs, same pattern as news.py)
-    course.view_count = (course.view_count or 0) + 1
-    await db.commit()
-    # Only re-pull the columns that actually changed server-side — refreshing with no
-    # attribute_names would expire (and re-lazy-load) the uploaded_by relationship too,
-    # which crashes under async SQLAlchemy since it isn't loaded inside a query here.
-    await db.refresh(course, attribute_names=["view_count", "updated_at"])
-
-    return course
+    return json_response(overlay_fields(payload, view_count=view_count), headers=headers)
 
 
 @router.get("/{course_id}/qr/download")
@@ -282,7 +287,9 @@ async def upload_course(
     """
     Trainer (or admin) uploads a new course video.
     - Trainers: course lands in status=pending, awaiting admin approval.
-    - Superusers: course is auto-approved and goes live immediately.
+    - Superusers: course is auto-approved and goes live as soon as the video
+      is transcoded.
+    The video is transcoded to HLS in the background (transcode_status).
     """
     is_admin = current_user.is_superuser
 
@@ -296,7 +303,7 @@ async def upload_course(
 
     # Content-Type header is client-supplied and can be spoofed, so it's checked
     # here as a first pass, but the real enforcement is the extension allowlist
-    # (and size limit) inside _save_upload.
+    # (and size limit) in storage_service.save_upload.
     if video.content_type not in ALLOWED_VIDEO_TYPES:
         raise HTTPException(
             status_code=400,
@@ -305,11 +312,13 @@ async def upload_course(
         )
 
     # Save video file
-    video_url = _save_upload(
+    # Streamed to storage off the event loop
+    stored_video = await storage_service.save_upload(
         video, "courses/videos",
         allowed_extensions=ALLOWED_VIDEO_EXTENSIONS,
         max_size_bytes=MAX_VIDEO_SIZE_BYTES,
     )
+    video_url = stored_video.url
 
     # Save thumbnail if provided
     thumbnail_url = None
@@ -320,13 +329,14 @@ async def upload_course(
                 detail=f"Unsupported thumbnail type: {thumbnail.content_type}. "
                        f"Allowed: {', '.join(ALLOWED_IMAGE_TYPES)}",
             )
-        thumbnail_url = _save_upload(
+        stored_thumbnail = await storage_service.save_upload(
             thumbnail, "courses/thumbnails",
             allowed_extensions=ALLOWED_IMAGE_EXTENSIONS,
+            max_size_bytes=MAX_THUMBNAIL_SIZE_BYTES,
         )
+        thumbnail_url = stored_thumbnail.url
 
-    initial_status = CourseStatus.approved if is_admin else CourseStatus.pending
-
+    # Nothing is published before it's transcoded, admin uploads included
     course = Course(
         title            = title,
         description      = description,
@@ -334,7 +344,9 @@ async def upload_course(
         difficulty_level = difficulty_level,
         video_url        = video_url,
         thumbnail_url    = thumbnail_url,
-        status           = initial_status,
+        status           = CourseStatus.pending,
+        transcode_status = TranscodeStatus.pending,
+        publish_when_ready = is_admin,
         uploaded_by_id   = current_user.id,
         reviewed_by_id   = current_user.id if is_admin else None,
         reviewed_at      = datetime.now(timezone.utc) if is_admin else None,
@@ -344,6 +356,7 @@ async def upload_course(
     course.uploaded_by = current_user
 
     db.add(course)
+    await storage_service.acquire(db, video_url, thumbnail_url)
     await db.flush()   # get the UUID before generating QR
 
     # Generate QR code
@@ -352,6 +365,10 @@ async def upload_course(
     course.qr_code_image_url  = qr_image_url
 
     await db.commit()
+    await invalidate_counts(Course)
+    await response_cache.invalidate("courses")
+    schedule_translation("courses", course.id)
+    schedule_transcode(course.id)
     # Narrow refresh to just the server-generated columns — refreshing with no
     # attribute_names would expire the uploaded_by relationship we just set manually above,
     # forcing a lazy-load on the next access (which crashes under async SQLAlchemy).
@@ -372,7 +389,7 @@ async def update_course(
     """
     result = await db.execute(
         select(Course)
-        .options(selectinload(Course.uploaded_by))
+        .options(UserLoad.related(Course.uploaded_by, UserLoad.CARD))
         .where(Course.id == course_id)
     )
     course = result.scalar_one_or_none()
@@ -385,7 +402,10 @@ async def update_course(
     if not (is_owner or is_admin):
         raise HTTPException(status_code=403, detail="Not allowed")
 
-    for field, value in payload.model_dump(exclude_unset=True).items():
+    changes = payload.model_dump(exclude_unset=True)
+    if "thumbnail_url" in changes:
+        await storage_service.replace(db, course.thumbnail_url, changes["thumbnail_url"])
+    for field, value in changes.items():
         setattr(course, field, value)
 
     # Re-submit for review if it was rejected
@@ -394,6 +414,9 @@ async def update_course(
         course.rejection_reason = None
 
     await db.commit()
+    await invalidate_counts(Course)
+    await response_cache.invalidate("courses", course_id)
+    schedule_translation("courses", course_id)
     # Narrow refresh to updated_at only — everything else was already set in memory from
     # payload above, and a full refresh would expire the eagerly-loaded uploaded_by relation.
     await db.refresh(course, attribute_names=["updated_at"])
@@ -418,8 +441,12 @@ async def delete_course(
     if not (is_owner or is_admin):
         raise HTTPException(status_code=403, detail="Not allowed")
 
+    await storage_service.release(db, course.video_url, course.thumbnail_url)
     await db.delete(course)
     await db.commit()
+    await invalidate_counts(Course)
+    await response_cache.invalidate("courses", course_id)
+    schedule_translation("courses", course_id)
 
 
 # ─── Admin-only endpoints ─────────────────────────────────────────────────────
@@ -434,18 +461,17 @@ async def list_pending_courses(
     """Admin view — all courses awaiting review."""
     query = (
         select(Course)
-        .options(selectinload(Course.uploaded_by))
+        .options(UserLoad.related(Course.uploaded_by, UserLoad.CARD))
         .where(Course.status == CourseStatus.pending)
     )
 
-    count_query = select(func.count()).select_from(query.subquery())
-    total = await db.scalar(count_query)
+    total, total_is_estimate = await count_rows(db, query, Course, {"status": CourseStatus.pending})
 
     query = query.order_by(Course.created_at.asc()).offset(skip).limit(limit)
     result = await db.execute(query)
     items = result.scalars().all()
 
-    return {"items": items, "total": total, "skip": skip, "limit": limit}
+    return {"items": items, "total": total, "skip": skip, "limit": limit, "total_is_estimate": total_is_estimate}
 
 
 @router.get("/admin/all", response_model=CoursesPage)
@@ -458,21 +484,22 @@ async def list_all_courses_admin(
     _:          User                 = Depends(require_admin_or_superuser()),
 ):
     """Admin view — all courses regardless of status, with optional filters."""
-    query = select(Course).options(selectinload(Course.uploaded_by))
+    query = select(Course).options(UserLoad.related(Course.uploaded_by, UserLoad.CARD))
 
     if status_:
         query = query.where(Course.status == status_)
     if sport_type:
         query = query.where(Course.sport_type == sport_type)
 
-    count_query = select(func.count()).select_from(query.subquery())
-    total = await db.scalar(count_query)
+    total, total_is_estimate = await count_rows(
+        db, query, Course, {"status": status_, "sport_type": sport_type}
+    )
 
     query = query.order_by(Course.created_at.desc()).offset(skip).limit(limit)
     result = await db.execute(query)
     items = result.scalars().all()
 
-    return {"items": items, "total": total, "skip": skip, "limit": limit}
+    return {"items": items, "total": total, "skip": skip, "limit": limit, "total_is_estimate": total_is_estimate}
 
 
 @router.post("/{course_id}/review", response_model=CourseResponse)
@@ -489,7 +516,7 @@ async def review_course(
     """
     result = await db.execute(
         select(Course)
-        .options(selectinload(Course.uploaded_by))
+        .options(UserLoad.related(Course.uploaded_by, UserLoad.CARD))
         .where(Course.id == course_id)
     )
     course = result.scalar_one_or_none()
@@ -509,12 +536,23 @@ async def review_course(
             detail="rejection_reason is required when rejecting a course.",
         )
 
+    # NULL: uploaded before transcoding, published as uploaded
+    if payload.status == CourseStatus.approved and course.transcode_status not in (TranscodeStatus.ready, None):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Course video transcoding is {course.transcode_status.value}. "
+                   "Only transcoded courses can be approved.",
+        )
+
     course.status           = payload.status
     course.rejection_reason = payload.rejection_reason
+    course.publish_when_ready = False   # reviewed by hand now
     course.reviewed_by_id   = current_user.id
     course.reviewed_at      = datetime.now(timezone.utc)
 
     await db.commit()
+    await invalidate_counts(Course)
+    await response_cache.invalidate("courses", course_id)
     # Narrow refresh to updated_at only, same reasoning as update_course above.
     await db.refresh(course, attribute_names=["updated_at"])
     return course
\ No newline at end of file
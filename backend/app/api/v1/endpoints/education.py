@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select
 from typing import Optional
 
 from app.db.session import get_db
@@ -10,25 +10,38 @@ from app.schemas.education import (
     EducationCreate,
     EducationUpdate,
     EducationResponse,
-    EducationList
+    EducationCardList
 )
 from app.core.security import get_current_active_user
+from app.core.pagination import paginate
+from app.core.search import apply_search
+from app.core.cards import EDUCATION_CARD_COLUMNS, card_select
+from app.core.counting import count_rows, invalidate_counts
+from app.core.cache import cached_response, response_cache
+from app.core.content_translation import ContentLanguage, apply_translations, schedule_translation
 from app.core.permissions import (
     Resource,
     Permission,
     require_permissions
 )
+from app.services.storage import storage_service
 
 router = APIRouter()
 
+EDUCATION_LIST_CACHE_TTL = 120
+EDUCATION_DETAIL_CACHE_TTL = 300
 
-@router.get("/", response_model=EducationList)
+
+@router.get("/", response_model=EducationCardList)
+@cached_response("education", EducationCardList, ttl=EDUCATION_LIST_CACHE_TTL, orm_model=Education)
 async def get_education_list(
         skip: int = Query(0, ge=0),
         limit: int = Query(10, ge=1, le=100),
         region: Optional[Region] = None,
         type: Optional[EducationType] = None,
         search: Optional[str] = None,
+        cursor: Optional[str] = Query(None, description="Keyset cursor from a previous page's next_cursor (skip is ignored)"),
+        lang: Optional[ContentLanguage] = Query(None, description="Response language (default: original Uzbek)"),
         db: AsyncSession = Depends(get_db)
 ):
     """
@@ -38,9 +51,13 @@ async def get_education_list(
     - **limit**: Maximum number of records to return
     - **region**: Filter by region
     - **type**: Filter by institution type (academy, federation, school, club)
-    - **search**: Search in name and description
+    - **search**: Full-text search in name, description and address, most relevant first
+    - **cursor**: Opaque keyset cursor (the previous page's `next_cursor`);
+      when given, `skip` is ignored and every page costs the same
+    - **lang**: Response language (uz, en, ru)
     """
-    query = select(Education)
+    # Cards only: description cut to an excerpt, plain rows instead of ORM objects
+    query = card_select(EDUCATION_CARD_COLUMNS)
 
     # Apply filters
     if region:
@@ -49,40 +66,44 @@ async def get_education_list(
     if type:
         query = query.where(Education.type == type)
 
+    # Full-text search, ranked by relevance
     if search:
-        query = query.where(
-            (Education.name.ilike(f"%{search}%")) |
-            (Education.description.ilike(f"%{search}%"))
-        )
+        query = apply_search(query, Education, search)
 
-    # Get total count
-    count_query = select(func.count()).select_from(query.subquery())
-    total = await db.scalar(count_query)
+    # Get total count (cached exact count, or a planner estimate when searching)
+    total, total_is_estimate = await count_rows(
+        db, query, Education,
+        None if search else {"region": region, "type": type}
+    )
 
     # Apply pagination and ordering
-    query = query.order_by(Education.created_at.desc()).offset(skip).limit(limit)
-
-    # Execute query
-    result = await db.execute(query)
-    education_list = result.scalars().all()
+    education_list, next_cursor = await paginate(db, query, Education, skip, limit, cursor, ordered=bool(search))
+    await apply_translations(db, "education", education_list, lang, excerpt_fields=("description",))
 
     return {
         "items": education_list,
         "total": total,
         "skip": skip,
-        "limit": limit
+        "limit": limit,
+        "next_cursor": next_cursor,
+        "total_is_estimate": total_is_estimate
     }
 
 
 @router.get("/{education_id}", response_model=EducationResponse)
+@cached_response(
+    "education", EducationResponse, ttl=EDUCATION_DETAIL_CACHE_TTL, object_param="education_id", orm_model=Education
+)
 async def get_education_detail(
         education_id: int,
+        lang: Optional[ContentLanguage] = Query(None, description="Response language (default: original Uzbek)"),
         db: AsyncSession = Depends(get_db)
 ):
     """
     Get education institution details (Public endpoint)
 
     - **education_id**: ID of the education institution
+    - **lang**: Response language (uz, en, ru)
     """
     result = await db.execute(
         select(Education).where(Education.id == education_id)
@@ -95,7 +116,9 @@ async def get_education_detail(
             detail="Education institution not found"
         )
 
-    return education
+    data = EducationResponse.model_validate(education).model_dump()
+    await apply_translations(db, "education", [data], lang)
+    return data
 
 
 @router.post(
@@ -126,7 +149,11 @@ async def create_education(
     new_education = Education(**education_data.dict())
 
     db.add(new_education)
+    await storage_service.acquire(db, new_education.image_url)
     await db.commit()
+    await invalidate_counts(Education)
+    await response_cache.invalidate("education")
+    schedule_translation("education", new_education.id)
     await db.refresh(new_education)
 
     return new_education
@@ -165,10 +192,15 @@ async def update_education(
 
     # Update fields
     update_data = education_data.dict(exclude_unset=True)
+    if "image_url" in update_data:
+        await storage_service.replace(db, education.image_url, update_data["image_url"])
     for field, value in update_data.items():
         setattr(education, field, value)
 
     await db.commit()
+    await invalidate_counts(Education)
+    await response_cache.invalidate("education", education_id)
+    schedule_translation("education", education_id)
     await db.refresh(education)
 
     return education
@@ -202,7 +234,11 @@ async def delete_education(
             detail="Education institution not found"
         )
 
+    await storage_service.release(db, education.image_url)
     await db.delete(education)
     await db.commit()
+    await invalidate_counts(Education)
+    await response_cache.invalidate("education", education_id)
+    schedule_translation("education", education_id)
 
     return None
\ No newline at end of file
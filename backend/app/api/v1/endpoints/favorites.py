@@ -5,8 +5,9 @@ from sqlalchemy.orm import selectinload
 from app.db.session import get_db
 from app.models.favorite import Favorite
 from app.models.merch import Merch
-from app.core.security import get_current_active_user
-from app.models.user import User
+from app.models.user import UserLoad
+from app.core.security import get_current_active_principal
+from app.core.principal import Principal
 
 router = APIRouter()
 
@@ -14,11 +15,11 @@ router = APIRouter()
 @router.get("/")
 async def get_my_favorites(
         db: AsyncSession = Depends(get_db),
-        current_user: User = Depends(get_current_active_user)
+        current_user: Principal = Depends(get_current_active_principal)
 ):
     result = await db.execute(
         select(Favorite)
-        .options(selectinload(Favorite.merch).selectinload(Merch.owner))
+        .options(UserLoad.related(Merch.owner, UserLoad.CARD, parent=selectinload(Favorite.merch)))
         .where(Favorite.user_id == current_user.id)
     )
     items = result.scalars().all()
@@ -53,7 +54,7 @@ async def get_my_favorites(
 async def toggle_favorite(
         merch_id: int,
         db: AsyncSession = Depends(get_db),
-        user=Depends(get_current_active_user)
+        user: Principal = Depends(get_current_active_principal)
 ):
     prod_res = await db.execute(select(Merch).where(Merch.id == merch_id))
     if not prod_res.scalar_one_or_none():
@@ -79,7 +80,7 @@ async def toggle_favorite(
 async def remove_favorite(
         favorite_id: int,
         db: AsyncSession = Depends(get_db),
-        current_user: User = Depends(get_current_active_user)
+        current_user: Principal = Depends(get_current_active_principal)
 ):
     fav_res = await db.execute(
         select(Favorite).where(
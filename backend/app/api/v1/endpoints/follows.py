@@ -5,7 +5,8 @@ from sqlalchemy import select, func
 from app.db.session import get_db
 from app.models.follow import Follow
 from app.models.user import User
-from app.core.security import get_current_active_user
+from app.core.security import get_current_active_principal
+from app.core.principal import Principal
 from app.schemas.follow import FollowToggleResponse, FollowStatusResponse
 
 router = APIRouter()
@@ -15,13 +16,13 @@ router = APIRouter()
 async def toggle_follow(
         user_id: int,
         db: AsyncSession = Depends(get_db),
-        current_user: User = Depends(get_current_active_user)
+        current_user: Principal = Depends(get_current_active_principal)
 ):
     if user_id == current_user.id:
         raise HTTPException(status_code=400, detail="You cannot follow yourself")
 
-    target_res = await db.execute(select(User).where(User.id == user_id))
-    if not target_res.scalar_one_or_none():
+    target_id = await db.scalar(select(User.id).where(User.id == user_id))
+    if target_id is None:
         raise HTTPException(status_code=404, detail="User not found")
 
     existing_res = await db.execute(
@@ -48,7 +49,7 @@ async def toggle_follow(
 async def get_follow_status(
         user_id: int,
         db: AsyncSession = Depends(get_db),
-        current_user: User = Depends(get_current_active_user)
+        current_user: Principal = Depends(get_current_active_principal)
 ):
     existing_res = await db.execute(
         select(Follow).where(Follow.follower_id == current_user.id, Follow.followed_id == user_id)
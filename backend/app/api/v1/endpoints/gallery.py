@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select
 from typing import Optional
 
 from app.db.session import get_db
@@ -8,7 +8,9 @@ from app.models.user import User
 from app.models.gallery_photo import GalleryPhoto
 from app.schemas.gallery import GalleryPhotoResponse, GalleryPhotoListResponse
 from app.core.security import get_current_active_user
-from app.api.v1.endpoints.course import _save_upload, ALLOWED_IMAGE_EXTENSIONS
+from app.api.v1.endpoints.course import ALLOWED_IMAGE_EXTENSIONS
+from app.services.images import schedule_image_processing
+from app.services.storage import storage_service
 
 router = APIRouter()
 
@@ -25,11 +27,10 @@ async def list_gallery_photos(
         raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="user_id query param is required")
 
     query = select(GalleryPhoto).where(GalleryPhoto.user_id == user_id).order_by(GalleryPhoto.created_at.desc())
-    count_query = select(func.count()).select_from(query.subquery())
-    total = await db.scalar(count_query)
     result = await db.execute(query)
     items = result.scalars().all()
-    return {"items": items, "total": total}
+    # The whole gallery is returned (no pagination), so the total is just its length
+    return {"items": items, "total": len(items)}
 
 
 @router.post("/", response_model=GalleryPhotoResponse, status_code=status.HTTP_201_CREATED)
@@ -39,11 +40,14 @@ async def upload_gallery_photo(
         db: AsyncSession = Depends(get_db)
 ):
     """Upload a photo to the current user's own gallery."""
-    image_url = _save_upload(photo, "gallery", ALLOWED_IMAGE_EXTENSIONS, MAX_GALLERY_IMAGE_SIZE_BYTES)
+    stored = await storage_service.save_upload(photo, "gallery", ALLOWED_IMAGE_EXTENSIONS, MAX_GALLERY_IMAGE_SIZE_BYTES)
 
-    entry = GalleryPhoto(user_id=current_user.id, image_url=image_url)
+    entry = GalleryPhoto(user_id=current_user.id, image_url=stored.url)
     db.add(entry)
+    await storage_service.acquire(db, stored.url)
     await db.commit()
+    # image_variants stays None until the task has made the WebP copies
+    schedule_image_processing(stored.url)
     await db.refresh(entry)
     return entry
 
@@ -62,6 +66,7 @@ async def delete_gallery_photo(
     if entry.user_id != current_user.id and not current_user.is_superuser:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not your photo")
 
+    await storage_service.release(db, entry.image_url)
     await db.delete(entry)
     await db.commit()
     return None
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select
 from typing import List, Optional
 
 from app.db.session import get_db
@@ -11,19 +11,30 @@ from app.schemas.job_vacancy import (
     JobVacancyCreate,
     JobVacancyUpdate,
     JobVacancyResponse,
-    JobVacancyList
+    JobVacancyCardList
 )
 from app.core.security import get_current_active_user
+from app.core.pagination import paginate
+from app.core.search import apply_search
+from app.core.cards import JOB_VACANCY_CARD_COLUMNS, card_select
+from app.core.counting import count_rows, invalidate_counts
+from app.core.cache import cached_response, response_cache
+from app.core.content_translation import ContentLanguage, apply_translations, schedule_translation
 from app.core.permissions import (
     Resource,
     Permission,
     require_permissions
 )
+from app.services.storage import storage_service
 
 router = APIRouter()
 
+JOB_VACANCY_LIST_CACHE_TTL = 120
+JOB_VACANCY_DETAIL_CACHE_TTL = 300
 
-@router.get("/", response_model=JobVacancyList)
+
+@router.get("/", response_model=JobVacancyCardList)
+@cached_response("job_vacancies", JobVacancyCardList, ttl=JOB_VACANCY_LIST_CACHE_TTL, orm_model=JobVacancy)
 async def get_job_vacancy_list(
         skip: int = Query(0, ge=0),
         limit: int = Query(10, ge=1, le=100),
@@ -32,6 +43,8 @@ async def get_job_vacancy_list(
         region: Optional[List[Region]] = Query(None),
         employment_type: Optional[List[EmploymentType]] = Query(None),
         sport_type: Optional[List[JobSportType]] = Query(None),
+        cursor: Optional[str] = Query(None, description="Keyset cursor from a previous page's next_cursor (skip is ignored)"),
+        lang: Optional[ContentLanguage] = Query(None, description="Response language (default: original Uzbek)"),
         db: AsyncSession = Depends(get_db)
 ):
     """
@@ -40,25 +53,26 @@ async def get_job_vacancy_list(
     - **skip**: Number of records to skip (pagination)
     - **limit**: Maximum number of records to return
     - **is_active**: Filter by active status
-    - **search**: Search in title, description, and company
+    - **search**: Full-text search in title, company and description, most relevant first
     - **region**: Filter by one or more regions — accepts repeated query params
       (e.g. ?region=andijan&region=bukhara), matching the frontend's checkbox
       multi-select. A single value still works fine too.
     - **employment_type**: Filter by one or more employment types (full_time/part_time/contract)
     - **sport_type**: Filter by one or more sport types (football/kurash/tennis/...)
+    - **cursor**: Opaque keyset cursor (the previous page's `next_cursor`);
+      when given, `skip` is ignored and every page costs the same
+    - **lang**: Response language (uz, en, ru)
     """
-    query = select(JobVacancy)
+    # Cards only: description cut to an excerpt, plain rows instead of ORM objects
+    query = card_select(JOB_VACANCY_CARD_COLUMNS)
 
     # Apply filters
     if is_active is not None:
         query = query.where(JobVacancy.is_active == is_active)
 
+    # Full-text search, ranked by relevance
     if search:
-        query = query.where(
-            (JobVacancy.title.ilike(f"%{search}%")) |
-            (JobVacancy.description.ilike(f"%{search}%")) |
-            (JobVacancy.company.ilike(f"%{search}%"))
-        )
+        query = apply_search(query, JobVacancy, search)
 
     # .in_() naturally handles both a single selected value and multiple —
     # no need to branch on len(region) == 1 vs > 1.
@@ -71,34 +85,40 @@ async def get_job_vacancy_list(
     if sport_type:
         query = query.where(JobVacancy.sport_type.in_(sport_type))
 
-    # Get total count
-    count_query = select(func.count()).select_from(query.subquery())
-    total = await db.scalar(count_query)
+    # Get total count (cached exact count, or a planner estimate when searching)
+    total, total_is_estimate = await count_rows(
+        db, query, JobVacancy,
+        None if search else {"is_active": is_active, "region": region, "employment_type": employment_type, "sport_type": sport_type}
+    )
 
     # Apply pagination and ordering
-    query = query.order_by(JobVacancy.created_at.desc()).offset(skip).limit(limit)
-
-    # Execute query
-    result = await db.execute(query)
-    job_list = result.scalars().all()
+    job_list, next_cursor = await paginate(db, query, JobVacancy, skip, limit, cursor, ordered=bool(search))
+    await apply_translations(db, "job_vacancies", job_list, lang, excerpt_fields=("description",))
 
     return {
         "items": job_list,
         "total": total,
         "skip": skip,
-        "limit": limit
+        "limit": limit,
+        "next_cursor": next_cursor,
+        "total_is_estimate": total_is_estimate
     }
 
 
 @router.get("/{job_id}", response_model=JobVacancyResponse)
+@cached_response(
+    "job_vacancies", JobVacancyResponse, ttl=JOB_VACANCY_DETAIL_CACHE_TTL, object_param="job_id", orm_model=JobVacancy
+)
 async def get_job_vacancy_detail(
         job_id: int,
+        lang: Optional[ContentLanguage] = Query(None, description="Response language (default: original Uzbek)"),
         db: AsyncSession = Depends(get_db)
 ):
     """
     Get job vacancy details (Public endpoint)
 
     - **job_id**: ID of the job vacancy
+    - **lang**: Response language (uz, en, ru)
     """
     result = await db.execute(
         select(JobVacancy).where(JobVacancy.id == job_id)
@@ -111,7 +131,9 @@ async def get_job_vacancy_detail(
             detail="Job vacancy not found"
         )
 
-    return job
+    data = JobVacancyResponse.model_validate(job).model_dump()
+    await apply_translations(db, "job_vacancies", [data], lang)
+    return data
 
 
 @router.post(
@@ -146,7 +168,11 @@ async def create_job_vacancy(
     new_job = JobVacancy(**job_data.dict())
 
     db.add(new_job)
+    await storage_service.acquire(db, new_job.image_url)
     await db.commit()
+    await invalidate_counts(JobVacancy)
+    await response_cache.invalidate("job_vacancies")
+    schedule_translation("job_vacancies", new_job.id)
     await db.refresh(new_job)
 
     return new_job
@@ -185,10 +211,15 @@ async def update_job_vacancy(
 
     # Update fields
     update_data = job_data.dict(exclude_unset=True)
+    if "image_url" in update_data:
+        await storage_service.replace(db, job.image_url, update_data["image_url"])
     for field, value in update_data.items():
         setattr(job, field, value)
 
     await db.commit()
+    await invalidate_counts(JobVacancy)
+    await response_cache.invalidate("job_vacancies", job_id)
+    schedule_translation("job_vacancies", job_id)
     await db.refresh(job)
 
     return job
@@ -222,7 +253,11 @@ async def delete_job_vacancy(
             detail="Job vacancy not found"
         )
 
+    await storage_service.release(db, job.image_url)
     await db.delete(job)
     await db.commit()
+    await invalidate_counts(JobVacancy)
+    await response_cache.invalidate("job_vacancies", job_id)
+    schedule_translation("job_vacancies", job_id)
 
     return None
\ No newline at end of file
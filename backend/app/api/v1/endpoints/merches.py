@@ -1,7 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select
 from typing import Optional
 
 from app.db.session import get_db
@@ -11,9 +10,16 @@ from app.schemas.merch import (
     MerchCreate,
     MerchUpdate,
     MerchResponse,
-    MerchList
+    MerchCardList
 )
+from app.schemas.suggest import SuggestionList
 from app.core.security import get_current_active_user
+from app.core.pagination import paginate
+from app.core.search import apply_search, search_rank
+from app.core.suggest import suggester
+from app.core.cards import MERCH_CARD_COLUMNS, card_select
+from app.core.counting import count_rows, invalidate_counts
+from app.core.cache import cached_response, response_cache
 from app.core.permissions import (
     Resource,
     Permission,
@@ -21,66 +27,91 @@ from app.core.permissions import (
     has_permission,
     verify_resource_ownership
 )
+from app.services.storage import storage_service
 
 router = APIRouter()
 
+MERCH_LIST_CACHE_TTL = 60
+MERCH_DETAIL_CACHE_TTL = 300
 
-@router.get("/", response_model=MerchList)
+
+@router.get("/", response_model=MerchCardList)
+@cached_response("merches", MerchCardList, ttl=MERCH_LIST_CACHE_TTL, orm_model=Merch)
 async def get_merches_list(
         skip: int = Query(0, ge=0),
         limit: int = Query(10, ge=1, le=100),
         search: Optional[str] = None,
         is_available: Optional[bool] = None,
         filter: Optional[str] = None,  # "discount" or "new"
+        cursor: Optional[str] = Query(None, description="Keyset cursor from a previous page's next_cursor (skip is ignored)"),
         db: AsyncSession = Depends(get_db)
 ):
-    query = select(Merch).options(selectinload(Merch.owner))
+    # Cards only: description cut to an excerpt, plain rows instead of ORM objects
+    query = card_select(MERCH_CARD_COLUMNS)
 
     # Apply filters
     if is_available is not None:
         query = query.where(Merch.is_available == is_available)
 
+    # Full-text search, ranked by relevance
     if search:
-        query = query.where(
-            (Merch.name.ilike(f"%{search}%")) |
-            (Merch.description.ilike(f"%{search}%")) |
-            (Merch.brand.ilike(f"%{search}%"))
-        )
+        query = apply_search(query, Merch, search)
 
     # NEW: filter for discount or new arrivals
+    # Discount listings are sorted by discount, so they only support offset
+    # pagination; everything else is newest-first and can use a cursor.
+    ordered = bool(search)
     if filter == "discount":
-        query = query.where(Merch.discount_percent > 0).order_by(Merch.discount_percent.desc())
+        # Biggest discount first, replacing the search's relevance order,
+        # which then only breaks ties
+        order = [Merch.discount_percent.desc()]
+        if search:
+            order += [search_rank(Merch, search).desc(), Merch.id.desc()]
+        query = query.where(Merch.discount_percent > 0).order_by(None).order_by(*order)
+        ordered = True
     elif filter == "new":
-        query = query.where(Merch.is_new == True).order_by(Merch.created_at.desc())
-    else:
-        query = query.order_by(Merch.created_at.desc())
+        query = query.where(Merch.is_new == True)
 
-    # Get total count
-    count_query = select(func.count()).select_from(query.subquery())
-    total = await db.scalar(count_query)
+    # Get total count (cached exact count, or a planner estimate when searching)
+    total, total_is_estimate = await count_rows(
+        db, query, Merch, None if search else {"is_available": is_available, "filter": filter}
+    )
 
     # Apply pagination
-    query = query.offset(skip).limit(limit)
-
-    result = await db.execute(query)
-    merches = result.scalars().all()
+    merches, next_cursor = await paginate(db, query, Merch, skip, limit, cursor, ordered=ordered)
 
     return {
         "items": merches,
         "total": total,
         "skip": skip,
-        "limit": limit
+        "limit": limit,
+        "next_cursor": next_cursor,
+        "total_is_estimate": total_is_estimate
     }
 
 
+@router.get("/suggest", response_model=SuggestionList)
+async def suggest_merches(
+        q: str = Query(..., min_length=1, max_length=100, description="Name or brand being typed"),
+        limit: int = Query(10, ge=1, le=20),
+        db: AsyncSession = Depends(get_db)
+):
+    """
+    Typeahead for merchandise names and brands: closest matches by trigram
+    similarity, prefix matches first. Tolerates typos.
+    """
+    items = await suggester.suggest(db, "merches", q, limit)
+    return {"query": q, "items": items}
+
+
 @router.get("/{merch_id}", response_model=MerchResponse)
+@cached_response("merches", MerchResponse, ttl=MERCH_DETAIL_CACHE_TTL, object_param="merch_id", orm_model=Merch)
 async def get_merch_detail(
         merch_id: int,
         db: AsyncSession = Depends(get_db)
 ):
     result = await db.execute(
         select(Merch)
-        .options(selectinload(Merch.owner))
         .where(Merch.id == merch_id)
     )
     merch = result.scalar_one_or_none()
@@ -125,7 +156,10 @@ async def create_merch(
     )
 
     db.add(new_merch)
+    await storage_service.acquire(db, new_merch.image_url)
     await db.commit()
+    await invalidate_counts(Merch)
+    await response_cache.invalidate("merches")
     await db.refresh(new_merch)
 
     # Load owner relationship
@@ -156,7 +190,6 @@ async def update_merch(
     # Get existing merch
     result = await db.execute(
         select(Merch)
-        .options(selectinload(Merch.owner))
         .where(Merch.id == merch_id)
     )
     merch = result.scalar_one_or_none()
@@ -177,10 +210,14 @@ async def update_merch(
 
     # Update fields
     update_data = merch_data.dict(exclude_unset=True)
+    if "image_url" in update_data:
+        await storage_service.replace(db, merch.image_url, update_data["image_url"])
     for field, value in update_data.items():
         setattr(merch, field, value)
 
     await db.commit()
+    await invalidate_counts(Merch)
+    await response_cache.invalidate("merches", merch_id)
     await db.refresh(merch)
 
     return merch
@@ -222,8 +259,11 @@ async def delete_merch(
                 detail="You can only delete your own merchandise"
             )
 
+    await storage_service.release(db, merch.image_url)
     await db.delete(merch)
     await db.commit()
+    await invalidate_counts(Merch)
+    await response_cache.invalidate("merches", merch_id)
 
     return None
 
@@ -246,15 +286,11 @@ async def get_my_merches(
     # Query user's merches
     query = (
         select(Merch)
-        .options(selectinload(Merch.owner))
         .where(Merch.owner_id == current_user.id)
     )
 
     # Get total count
-    count_query = select(func.count()).select_from(
-        select(Merch).where(Merch.owner_id == current_user.id).subquery()
-    )
-    total = await db.scalar(count_query)
+    total, total_is_estimate = await count_rows(db, query, Merch, {"owner_id": current_user.id})
 
     # Apply pagination
     query = query.order_by(Merch.created_at.desc()).offset(skip).limit(limit)
@@ -266,5 +302,6 @@ async def get_my_merches(
         "items": merches,
         "total": total,
         "skip": skip,
-        "limit": limit
+        "limit": limit,
+        "total_is_estimate": total_is_estimate
     }
@@ -1,93 +1,144 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, func, update
 from typing import List, Optional
 
 from app.db.session import get_db
-from app.models.user import User, UserRole
+from app.models.user import User, UserLoad, UserRole
 from app.models.news import News, NewsCategory
-from app.schemas.news import NewsCreate, NewsUpdate, NewsResponse, NewsList
+from app.schemas.news import NewsCreate, NewsUpdate, NewsResponse, NewsList, NewsCardList
 from app.core.security import get_current_active_user
+from app.core.pagination import paginate
+from app.core.search import apply_search
+from app.core.cards import NEWS_CARD_COLUMNS, attach_users, card_select
+from app.core.counting import count_rows, invalidate_counts
+from app.core.cache import cached_response, response_cache, json_response, overlay_fields, offset_field
+from app.core.http_cache import not_modified
+from app.core.view_counter import view_counter
+from app.core.content_translation import ContentLanguage, apply_translations, schedule_translation
 from app.core.permissions import (
     Resource,
     Permission,
     require_permissions,
     verify_resource_ownership
 )
+from app.services.storage import storage_service
 
 router = APIRouter()
 
+NEWS_LIST_CACHE_TTL = 60
+NEWS_DETAIL_CACHE_TTL = 300
 
-@router.get("/", response_model=NewsList)
+
+@router.get("/", response_model=NewsCardList)
+@cached_response("news", NewsCardList, ttl=NEWS_LIST_CACHE_TTL, orm_model=News)
 async def get_news_list(
         skip: int = Query(0, ge=0),
         limit: int = Query(10, ge=1, le=100),
         category: Optional[NewsCategory] = None,
         search: Optional[str] = None,
+        cursor: Optional[str] = Query(None, description="Keyset cursor from a previous page's next_cursor (skip is ignored)"),
+        lang: Optional[ContentLanguage] = Query(None, description="Response language (default: original Uzbek)"),
         db: AsyncSession = Depends(get_db)
 ):
-    query = select(News).options(selectinload(News.author))
+    # Cards only: no full content, plain rows instead of ORM objects
+    query = card_select(NEWS_CARD_COLUMNS)
 
     # Apply filters
     if category:
         query = query.where(News.category == category)
 
+    # Full-text search, ranked by relevance
     if search:
-        query = query.where(
-            (News.title.ilike(f"%{search}%")) |
-            (News.content.ilike(f"%{search}%"))
-        )
+        query = apply_search(query, News, search)
 
-    # Get total count
-    count_query = select(func.count()).select_from(query.subquery())
-    total = await db.scalar(count_query)
+    # Get total count (cached exact count, or a planner estimate when searching)
+    total, total_is_estimate = await count_rows(
+        db, query, News, None if search else {"category": category}
+    )
 
     # Apply pagination and ordering
-    query = query.order_by(News.created_at.desc()).offset(skip).limit(limit)
-
-    # Execute query
-    result = await db.execute(query)
-    news_list = result.scalars().all()
+    news_list, next_cursor = await paginate(db, query, News, skip, limit, cursor, ordered=bool(search))
+    await attach_users(db, news_list, "author_id", "author")
+    await apply_translations(db, "news", news_list, lang)
 
     return {
         "items": news_list,
         "total": total,
         "skip": skip,
-        "limit": limit
+        "limit": limit,
+        "next_cursor": next_cursor,
+        "total_is_estimate": total_is_estimate
     }
 
 
 @router.get("/{news_id}/", response_model=NewsResponse)
 async def get_news_detail(
+        request: Request,
         news_id: int,
+        lang: Optional[ContentLanguage] = Query(None, description="Response language (default: original Uzbek)"),
         db: AsyncSession = Depends(get_db)
 ):
-    result = await db.execute(
-        select(News)
-        .options(selectinload(News.author))
-        .where(News.id == news_id)
-    )
-    news = result.scalar_one_or_none()
-
-    if not news:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="News article not found"
+    # A revalidation of an unchanged article is still a view
+    validators = await response_cache.object_validators(db, "news", News, news_id, lang, NEWS_DETAIL_CACHE_TTL)
+    if validators is not None and validators.is_fresh(request):
+        await view_counter.record("news", news_id)
+        return not_modified(validators.headers)
+    headers = validators.headers if validators is not None else None
+
+    # The serialized article is cached (per language); only the view counter is live
+    cache_key = response_cache.object_key("news", news_id, lang)
+    payload = await response_cache.get(cache_key, local=True)
+    if payload is None:
+        # Read before the row, so a body loaded before a write isn't stored after it
+        generation = await response_cache.generation("news")
+        result = await db.execute(
+            select(News)
+            .options(UserLoad.related(News.author, UserLoad.CARD))
+            .where(News.id == news_id)
         )
+        news = result.scalar_one_or_none()
+
+        if not news:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="News article not found"
+            )
+
+        data = NewsResponse.model_validate(news).model_dump()
+        await apply_translations(db, "news", [data], lang)
+        payload = NewsResponse.model_validate(data).model_dump_json().encode("utf-8")
+        await response_cache.set_if_current("news", generation, cache_key, payload, NEWS_DETAIL_CACHE_TTL, local=True)
 
-    # Increment views count safely (handle legacy NULL values)
+    # Views are buffered in Redis and flushed to Postgres by a beat task;
+    # report the stored count plus the views not written yet
+    pending_views = await view_counter.record("news", news_id)
+    if pending_views is not None:
+        return json_response(offset_field(payload, "views_count", pending_views), headers=headers)
+
+    # Redis unavailable: increment the row directly (handle legacy NULL values)
     try:
-        news.views_count = (news.views_count or 0) + 1
+        views_count = await db.scalar(
+            update(News)
+            .where(News.id == news_id)
+            .values(
+                views_count=func.coalesce(News.views_count, 0) + 1,
+                updated_at=News.updated_at,
+            )
+            .returning(News.views_count)
+        )
         await db.commit()
-        # Ensure fresh scalar columns (including updated_at) are loaded to avoid async lazy-load during serialization
-        await db.refresh(news)
-        # Ensure relationships are loaded for response serialization
-        await db.refresh(news, ["author"])
     except Exception:
         # If increment fails for any reason, don't break the endpoint
         await db.rollback()
-    return news
+        return json_response(payload, headers=headers)
+
+    if views_count is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="News article not found"
+        )
+    return json_response(overlay_fields(payload, views_count=views_count), headers=headers)
 
 
 @router.post(
@@ -136,7 +187,11 @@ async def create_news(
     )
 
     db.add(new_news)
+    await storage_service.acquire(db, new_news.image_url)
     await db.commit()
+    await invalidate_counts(News)
+    await response_cache.invalidate("news")
+    schedule_translation("news", new_news.id)
     await db.refresh(new_news)
 
     # Load author relationship
@@ -167,7 +222,7 @@ async def update_news(
     # Get existing news article
     result = await db.execute(
         select(News)
-        .options(selectinload(News.author))
+        .options(UserLoad.related(News.author, UserLoad.CARD))
         .where(News.id == news_id)
     )
     news = result.scalar_one_or_none()
@@ -188,6 +243,8 @@ async def update_news(
 
     # Update fields
     update_data = news_data.dict(exclude_unset=True)
+    if "image_url" in update_data:
+        await storage_service.replace(db, news.image_url, update_data["image_url"])
 
     for field, value in update_data.items():
         setattr(news, field, value)
@@ -198,6 +255,9 @@ async def update_news(
         news.slug = slugify(update_data["title"])
 
     await db.commit()
+    await invalidate_counts(News)
+    await response_cache.invalidate("news", news_id)
+    schedule_translation("news", news_id)
     await db.refresh(news)
 
     return news
@@ -239,8 +299,12 @@ async def delete_news(
                 detail="You can only delete your own news articles"
             )
 
+    await storage_service.release(db, news.image_url)
     await db.delete(news)
     await db.commit()
+    await invalidate_counts(News)
+    await response_cache.invalidate("news", news_id)
+    schedule_translation("news", news_id)
 
     return None
 
@@ -263,15 +327,12 @@ async def get_my_news(
     # Query user's news
     query = (
         select(News)
-        .options(selectinload(News.author))
+        .options(UserLoad.related(News.author, UserLoad.CARD))
         .where(News.author_id == current_user.id)
     )
 
     # Get total count
-    count_query = select(func.count()).select_from(
-        select(News).where(News.author_id == current_user.id).subquery()
-    )
-    total = await db.scalar(count_query)
+    total, total_is_estimate = await count_rows(db, query, News, {"author_id": current_user.id})
 
     # Apply pagination
     query = query.order_by(News.created_at.desc()).offset(skip).limit(limit)
@@ -283,5 +344,6 @@ async def get_my_news(
         "items": news_list,
         "total": total,
         "skip": skip,
-        "limit": limit
+        "limit": limit,
+        "total_is_estimate": total_is_estimate
     }
\ No newline at end of file
@@ -0,0 +1,33 @@
+"""
+Unified search endpoint
+"""
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+
+from app.db.session import get_db
+from app.schemas.search import SearchResultType, SearchResults
+from app.services.search_service import SearchService
+
+router = APIRouter()
+
+
+@router.get("/", response_model=SearchResults)
+async def search(
+        q: str = Query(..., min_length=1, max_length=200, description="Search query"),
+        types: Optional[List[SearchResultType]] = Query(None, description="Resource types to search (default: all)"),
+        limit: int = Query(20, ge=1, le=100),
+        db: AsyncSession = Depends(get_db)
+):
+    """
+    Full-text search across news, courses, job vacancies, education and merchandise
+
+    - **q**: Search text; supports "quoted phrases", OR and -exclusions
+    - **types**: Repeat to restrict, e.g. `?types=news&types=course`
+    - **limit**: Maximum number of results
+
+    Results are ranked by relevance; each hit's `type` and `id` point to the
+    resource's own detail endpoint.
+    """
+    items = await SearchService(db).search(q, types, limit)
+    return SearchResults(query=q, items=items)
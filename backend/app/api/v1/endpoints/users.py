@@ -5,17 +5,25 @@ from typing import Optional
 import bcrypt
 
 from app.db.session import get_db
-from app.models.user import User, UserRole, VerificationStatus
+from app.models.user import User, UserLoad, UserRole, VerificationStatus
 from app.models.follow import Follow
 from app.schemas.user import UserCreate, UserUpdate, UserResponse, UserListResponse, VerificationUpdate
+from app.schemas.suggest import SuggestionList
 from app.core.security import get_current_active_user
+from app.core.pagination import paginate
+from app.core.counting import count_rows, invalidate_counts
+from app.core.principal import principal_cache
+from app.core.suggest import suggester
 from app.core.permissions import (
     Resource,
     Permission,
     require_permissions,
     require_superuser
 )
-from app.api.v1.endpoints.course import _save_upload, ALLOWED_IMAGE_EXTENSIONS
+from app.api.v1.endpoints.course import ALLOWED_IMAGE_EXTENSIONS
+from app.services.images import schedule_image_processing
+from app.services.storage import storage_service
+from app.services.user_service import invalidate_deleted_user, release_user_files
 
 router = APIRouter()
 
@@ -64,10 +72,18 @@ async def update_user_me(
         current_user.hashed_password = hashed_password
         del update_data['password']
 
+    # avatar_url may be pointed at another (stored) image
+    new_avatar = 'avatar_url' in update_data and update_data['avatar_url'] != current_user.avatar_url
+    if new_avatar:
+        await storage_service.replace(db, current_user.avatar_url, update_data['avatar_url'])
+        current_user.avatar_variants = None
+
     for field, value in update_data.items():
         setattr(current_user, field, value)
 
     await db.commit()
+    if new_avatar:
+        schedule_image_processing(current_user.avatar_url)
     await db.refresh(current_user)
     return await _attach_follow_counts(db, current_user)
 
@@ -82,9 +98,12 @@ async def upload_avatar(
     Upload/replace the current user's profile picture. Used both right after
     registration and later from the profile edit form.
     """
-    avatar_url = _save_upload(avatar, "avatars", ALLOWED_IMAGE_EXTENSIONS, MAX_AVATAR_SIZE_BYTES)
-    current_user.avatar_url = avatar_url
+    stored = await storage_service.save_upload(avatar, "avatars", ALLOWED_IMAGE_EXTENSIONS, MAX_AVATAR_SIZE_BYTES)
+    await storage_service.replace(db, current_user.avatar_url, stored.url)
+    current_user.avatar_url = stored.url
+    current_user.avatar_variants = None  # Filled in by the image processing task
     await db.commit()
+    schedule_image_processing(stored.url)
     await db.refresh(current_user)
     return await _attach_follow_counts(db, current_user)
 
@@ -96,9 +115,12 @@ async def upload_cover(
         db: AsyncSession = Depends(get_db)
 ):
     """Upload/replace the current user's cover/banner photo (profile page backdrop)."""
-    cover_url = _save_upload(cover, "covers", ALLOWED_IMAGE_EXTENSIONS, MAX_COVER_SIZE_BYTES)
-    current_user.cover_url = cover_url
+    stored = await storage_service.save_upload(cover, "covers", ALLOWED_IMAGE_EXTENSIONS, MAX_COVER_SIZE_BYTES)
+    await storage_service.replace(db, current_user.cover_url, stored.url)
+    current_user.cover_url = stored.url
+    current_user.cover_variants = None  # Filled in by the image processing task
     await db.commit()
+    schedule_image_processing(stored.url)
     await db.refresh(current_user)
     return await _attach_follow_counts(db, current_user)
 
@@ -119,8 +141,10 @@ async def delete_own_account(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Superuser accounts can't be self-deleted; ask another admin.",
         )
+    content = await release_user_files(db, current_user)
     await db.delete(current_user)
     await db.commit()
+    await invalidate_deleted_user(current_user.id, content)
     return {"message": "Account deleted"}
 
 
@@ -141,8 +165,11 @@ async def upload_verification_document(
             detail="Only athletes and trainers can request profile verification",
         )
 
-    passport_url = _save_upload(document, "verification", ALLOWED_IMAGE_EXTENSIONS, MAX_VERIFICATION_DOC_SIZE_BYTES)
-    current_user.passport_url = passport_url
+    stored = await storage_service.save_upload(
+        document, "verification", ALLOWED_IMAGE_EXTENSIONS, MAX_VERIFICATION_DOC_SIZE_BYTES
+    )
+    await storage_service.replace(db, current_user.passport_url, stored.url)
+    current_user.passport_url = stored.url
     current_user.verification_status = VerificationStatus.PENDING
     await db.commit()
     await db.refresh(current_user)
@@ -186,6 +213,7 @@ async def get_users_list(
         role: Optional[UserRole] = None,
         is_active: Optional[bool] = None,
         search: Optional[str] = None,
+        cursor: Optional[str] = Query(None, description="Keyset cursor from a previous page's next_cursor (skip is ignored)"),
         db: AsyncSession = Depends(get_db)
 ):
     """Get list of users"""
@@ -195,19 +223,36 @@ async def get_users_list(
         query = query.where(User.role == role)
     if is_active is not None:
         query = query.where(User.is_active == is_active)
+    # Served by the trigram indexes on full_name/email
     if search:
         query = query.where(
             (User.full_name.ilike(f"%{search}%")) |
             (User.email.ilike(f"%{search}%"))
         )
 
-    count_query = select(func.count()).select_from(query.subquery())
-    total = await db.scalar(count_query)
-    query = query.order_by(User.created_at.desc()).offset(skip).limit(limit)
-    result = await db.execute(query)
-    users = result.scalars().all()
+    total, total_is_estimate = await count_rows(
+        db, query, User, None if search else {"role": role, "is_active": is_active}
+    )
+    users, next_cursor = await paginate(db, query, User, skip, limit, cursor)
+
+    return {
+        "items": users, "total": total, "skip": skip, "limit": limit,
+        "next_cursor": next_cursor, "total_is_estimate": total_is_estimate,
+    }
+
+@router.get("/suggest", response_model=SuggestionList)
+async def suggest_users(
+        q: str = Query(..., min_length=1, max_length=100, description="Name or email being typed"),
+        limit: int = Query(10, ge=1, le=20),
+        db: AsyncSession = Depends(get_db)
+):
+    """
+    Typeahead for user/athlete names: closest matches by trigram similarity,
+    prefix matches first. Tolerates typos.
+    """
+    items = await suggester.suggest(db, "users", q, limit)
+    return {"query": q, "items": items}
 
-    return {"items": users, "total": total, "skip": skip, "limit": limit}
 
 @router.get("/{user_id}/", response_model=UserResponse)
 async def get_user_detail(
@@ -235,7 +280,7 @@ async def create_user(
     """
     try:
         # Check if email exists
-        result = await db.execute(select(User).where(User.email == user_data.email))
+        result = await db.execute(select(User).options(*UserLoad.options(UserLoad.AUTH)).where(User.email == user_data.email))
         if result.scalar_one_or_none():
             raise HTTPException(status_code=400, detail="User with this email already exists")
 
@@ -271,6 +316,7 @@ async def create_user(
 
         db.add(new_user)
         await db.commit()
+        await invalidate_counts(User)
         await db.refresh(new_user)
         return new_user
 
@@ -312,10 +358,19 @@ async def update_user(
         user.hashed_password = hashed_password
         del update_data['password']
 
+    new_avatar = 'avatar_url' in update_data and update_data['avatar_url'] != user.avatar_url
+    if new_avatar:
+        await storage_service.replace(db, user.avatar_url, update_data['avatar_url'])
+        user.avatar_variants = None
+
     for field, value in update_data.items():
         setattr(user, field, value)
 
     await db.commit()
+    if new_avatar:
+        schedule_image_processing(user.avatar_url)
+    await invalidate_counts(User)
+    await principal_cache.invalidate(user_id)
     await db.refresh(user)
     return user
 
@@ -338,6 +393,8 @@ async def delete_user(
     if user.is_superuser:
         raise HTTPException(status_code=400, detail="Cannot delete a superuser account")
 
+    content = await release_user_files(db, user)
     await db.delete(user)
     await db.commit()
+    await invalidate_deleted_user(user_id, content)
     return None
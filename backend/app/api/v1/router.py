@@ -12,7 +12,8 @@ from app.api.v1.endpoints import (
     ai_buddy,
     achievements,
     gallery,
-    follows
+    follows,
+    search
 )
 
 api_router = APIRouter()
@@ -37,3 +38,6 @@ api_router.include_router(course.router, prefix="/courses", tags=["Courses"])
 api_router.include_router(achievements.router, prefix="/achievements", tags=["Achievements"])
 api_router.include_router(gallery.router, prefix="/gallery", tags=["Gallery"])
 api_router.include_router(follows.router, prefix="/follows", tags=["Follows"])
+
+# Search
+api_router.include_router(search.router, prefix="/search", tags=["Search"])
@@ -0,0 +1,471 @@
+"""
+Response cache for public read endpoints
+
+Anonymous GETs (news, merch, education, job vacancies, courses) return the
+same JSON to everyone, so the serialized body is stored in Redis and written
+back verbatim - no Postgres query and no Pydantic pass on a hit.
+
+Keys:
+    cache:{resource}:gen                          generation counter
+    cache:{resource}:{gen}:{endpoint}:{digest}    list pages
+    cache:{resource}:obj:{id}[:{lang}]            single objects (per language)
+    {list or object key}:v                        validators (ETag/Last-Modified)
+
+Every create/update/delete of a resource bumps its generation, which orphans
+all cached list pages at once (they simply age out via their TTL), and
+deletes the object keys of the rows it touched. Related data embedded in a
+payload (e.g. the author card inside a news item) is only bounded by the TTL.
+
+Object keys carry no generation, so a read that loaded a row before a write
+committed could store its old body after the write deleted the key. Object
+bodies and validators are therefore stored with set_if_current(): the
+generation is read before the query, and the body is only written (checked
+and set atomically in Redis) if no invalidation has happened since.
+
+Single objects are additionally kept in each worker's memory (LocalCache).
+Invalidations are published on CACHE_INVALIDATION_CHANNEL so every worker
+drops its copy; a worker only serves from memory while its subscription is
+live, otherwise it could miss an invalidation and serve a stale object.
+
+Endpoints given an ORM model also answer conditional GETs. Their validators
+come from row versions - (id, updated_at) plus the translation's timestamp
+for single objects, the resource generation plus the table's count and
+max(updated_at) for lists - and are cached next to the bodies under the same
+invalidation, so a 304 usually costs one cache read and no serialization.
+"""
+import asyncio
+import functools
+import hashlib
+import inspect
+import json
+import logging
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional, Sequence, Type
+from uuid import UUID
+
+from fastapi import Request, Response
+from pydantic import BaseModel
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.http_cache import Validators, not_modified
+from app.core.local_cache import LocalCache
+from app.core.redis import get_redis, get_sync_redis
+from app.models.content_translation import ContentTranslation
+
+logger = logging.getLogger(__name__)
+
+CACHE_PREFIX = "cache:"
+CACHE_INVALIDATION_CHANNEL = "cache:invalidate"
+
+# Extra endpoint param through which cached_response receives the request
+_REQUEST_PARAM = "_http_request"
+
+_CACHEABLE_SCALARS = (str, int, float, bool, UUID, Enum)
+
+# SET KEYS[2] = ARGV[2] (EX ARGV[3]) only while generation KEYS[1] is ARGV[1];
+# atomic, so an invalidation either precedes it (skipped) or deletes its result
+_SET_IF_CURRENT_SCRIPT = """
+if (redis.call('GET', KEYS[1]) or '0') ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[2], ARGV[2], 'EX', ARGV[3])
+return 1
+"""
+
+
+def _normalise(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, (list, tuple, set)):
+        return sorted(_normalise(v) for v in value)
+    return value
+
+
+def _is_query_param(value: Any) -> bool:
+    """Endpoint kwargs that are plain query/path values (not db sessions, users...)."""
+    if isinstance(value, (list, tuple, set)):
+        return all(isinstance(v, _CACHEABLE_SCALARS) for v in value)
+    return isinstance(value, _CACHEABLE_SCALARS)
+
+
+def json_response(payload: bytes, status_code: int = 200, headers: Optional[Dict[str, str]] = None) -> Response:
+    """Wrap already-serialized JSON bytes without re-encoding them."""
+    return Response(content=payload, status_code=status_code, media_type="application/json", headers=headers)
+
+
+def overlay_fields(payload: bytes, **fields: Any) -> bytes:
+    """Return `payload` with a few top-level fields replaced (e.g. a live counter)."""
+    data = json.loads(payload)
+    data.update(fields)
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def offset_field(payload: bytes, field: str, delta: int) -> bytes:
+    """Return `payload` with an integer top-level field increased by `delta`."""
+    data = json.loads(payload)
+    data[field] = (data.get(field) or 0) + delta
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+class ResponseCache:
+    """
+    Redis-backed store for serialized responses.
+
+    Every method fails open: a Redis error is logged and treated as a miss,
+    so an outage only costs the Postgres queries the cache normally saves.
+    """
+
+    def __init__(self):
+        self.prefix = CACHE_PREFIX
+        self.local = LocalCache(max_bytes=settings.LOCAL_CACHE_MAX_BYTES)
+        self._local_enabled = False
+        self._listener: Optional[asyncio.Task] = None
+
+    def _generation_key(self, resource: str) -> str:
+        return f"{self.prefix}{resource}:gen"
+
+    async def generation(self, resource: str) -> Optional[int]:
+        """
+        Current generation of `resource`; read it before querying the rows a
+        body is built from and pass it to set_if_current().
+
+        Returns:
+            None if Redis is unavailable
+        """
+        try:
+            generation = await get_redis().get(self._generation_key(resource))
+        except Exception as e:
+            logger.warning(f"Response cache unavailable: {e}")
+            return None
+        return int(generation or 0)
+
+    def object_key(self, resource: str, object_id: Any, lang: Any = None) -> str:
+        """Key of a single object's body; `lang` selects a translated variant."""
+        key = f"{self.prefix}{resource}:obj:{object_id}"
+        lang = _normalise(lang)
+        return f"{key}:{lang}" if lang in settings.CONTENT_TRANSLATION_LANGUAGES else key
+
+    def object_keys(self, resource: str, object_id: Any) -> List[str]:
+        """Keys of every language variant of a single object, and of their validators."""
+        keys = [self.object_key(resource, object_id)] + [
+            self.object_key(resource, object_id, lang) for lang in settings.CONTENT_TRANSLATION_LANGUAGES
+        ]
+        return keys + [self.validators_key(key) for key in keys]
+
+    @staticmethod
+    def validators_key(key: str) -> str:
+        """Key of the validators of the body stored at `key`."""
+        return f"{key}:v"
+
+    async def object_validators(
+            self,
+            db: AsyncSession,
+            resource: str,
+            model: type,
+            object_id: Any,
+            lang: Any = None,
+            ttl: int = 300,
+            criteria: Sequence[Any] = (),
+    ) -> Optional[Validators]:
+        """
+        Validators of a single object from its updated_at (and, for a
+        translated variant, the translation's), cached like the object.
+
+        Args:
+            criteria: Extra conditions the row must meet to be served
+                (e.g. approved status)
+
+        Returns:
+            None if there is no such row (the endpoint then 404s)
+        """
+        key = self.validators_key(self.object_key(resource, object_id, lang))
+        cached = await self.get(key, local=True)
+        if cached is not None:
+            return Validators.loads(cached)
+
+        generation = await self.generation(resource)
+        columns = [model.updated_at]
+        lang = _normalise(lang)
+        if lang in settings.CONTENT_TRANSLATION_LANGUAGES:
+            columns.append(
+                select(func.max(ContentTranslation.updated_at))
+                .where(
+                    ContentTranslation.resource == resource,
+                    ContentTranslation.resource_id == str(object_id),
+                    ContentTranslation.lang == lang,
+                )
+                .scalar_subquery()
+            )
+        row = (await db.execute(select(*columns).where(model.id == object_id, *criteria))).one_or_none()
+        if row is None:
+            return None
+
+        validators = Validators.of(
+            resource, object_id, lang, *row,
+            last_modified=max(value for value in row if value is not None),
+        )
+        await self.set_if_current(resource, generation, key, validators.dumps(), ttl, local=True)
+        return validators
+
+    async def list_validators(self, db: AsyncSession, model: type, key: str, ttl: int) -> Validators:
+        """
+        Validators of a list page stored at `key` (which embeds the resource
+        generation and the query params).
+
+        count(*) and max(updated_at) are taken over the whole table, which is
+        conservative - any row can enter or leave a filtered page - and run
+        once per generation and page, since the result is cached under the key.
+        """
+        validators_key = self.validators_key(key)
+        cached = await self.get(validators_key)
+        if cached is not None:
+            return Validators.loads(cached)
+
+        count, last_modified = (
+            await db.execute(select(func.count(), func.max(model.updated_at)).select_from(model))
+        ).one()
+        validators = Validators.of(key, count, last_modified, last_modified=last_modified)
+        await self.set(validators_key, validators.dumps(), ttl)
+        return validators
+
+    async def list_key(self, resource: str, endpoint: str, params: Dict[str, Any]) -> Optional[str]:
+        """
+        Build the key for a list page under the resource's current generation.
+
+        Query params are normalised (None dropped, enums by value, multi-value
+        params sorted) so equivalent URLs share one entry.
+        """
+        generation = await self.generation(resource)
+        if generation is None:
+            return None
+        normalised = {k: _normalise(v) for k, v in params.items() if v is not None}
+        digest = hashlib.blake2b(
+            json.dumps(normalised, sort_keys=True).encode("utf-8"), digest_size=16
+        ).hexdigest()
+        return f"{self.prefix}{resource}:{generation}:{endpoint}:{digest}"
+
+    async def get(self, key: str, local: bool = False) -> Optional[bytes]:
+        """
+        Args:
+            local: Also consult/fill the in-process cache (single objects only)
+        """
+        if local and self._local_enabled:
+            payload = self.local.get(key)
+            if payload is not None:
+                return payload
+        try:
+            payload = await get_redis().get(key)
+        except Exception as e:
+            logger.warning(f"Response cache read failed: {e}")
+            return None
+        if payload is not None and local and self._local_enabled:
+            self.local.set(key, payload, settings.LOCAL_CACHE_TTL)
+        return payload
+
+    async def set(self, key: str, payload: bytes, ttl: int, local: bool = False) -> None:
+        if local and self._local_enabled:
+            self.local.set(key, payload, min(ttl, settings.LOCAL_CACHE_TTL))
+        try:
+            await get_redis().set(key, payload, ex=ttl)
+        except Exception as e:
+            logger.warning(f"Response cache write failed: {e}")
+
+    async def set_if_current(
+            self,
+            resource: str,
+            generation: Optional[int],
+            key: str,
+            payload: bytes,
+            ttl: int,
+            local: bool = False,
+    ) -> bool:
+        """
+        set() that is skipped if `resource` was invalidated after
+        `generation` was read, i.e. the payload may predate a write.
+
+        Returns:
+            Whether the payload was stored
+        """
+        if generation is None:
+            return False
+        try:
+            stored = await get_redis().eval(
+                _SET_IF_CURRENT_SCRIPT, 2, self._generation_key(resource), key, generation, payload, ttl
+            )
+        except Exception as e:
+            logger.warning(f"Response cache write failed: {e}")
+            return False
+        if stored and local and self._local_enabled:
+            self.local.set(key, payload, min(ttl, settings.LOCAL_CACHE_TTL))
+        return bool(stored)
+
+    async def invalidate(self, resource: str, *object_ids: Any) -> None:
+        """
+        Call after committing a create/update/delete of `resource`.
+
+        Bumps the generation (retiring every cached list page) and drops the
+        cached copies of the given objects, in Redis and in every worker.
+        """
+        keys = [key for object_id in object_ids for key in self.object_keys(resource, object_id)]
+        for key in keys:
+            self.local.delete(key)
+        try:
+            async with get_redis().pipeline(transaction=False) as pipe:
+                pipe.incr(self._generation_key(resource))
+                if keys:
+                    pipe.delete(*keys)
+                    pipe.publish(CACHE_INVALIDATION_CHANNEL, json.dumps(keys))
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Response cache invalidation failed for {resource}: {e}")
+
+    def invalidate_sync(self, resource: str, *object_ids: Any) -> None:
+        """Blocking invalidate() for Celery tasks."""
+        keys = [key for object_id in object_ids for key in self.object_keys(resource, object_id)]
+        try:
+            with get_sync_redis().pipeline(transaction=False) as pipe:
+                pipe.incr(self._generation_key(resource))
+                if keys:
+                    pipe.delete(*keys)
+                    pipe.publish(CACHE_INVALIDATION_CHANNEL, json.dumps(keys))
+                pipe.execute()
+        except Exception as e:
+            logger.warning(f"Response cache invalidation failed for {resource}: {e}")
+
+    def start_listener(self) -> None:
+        """Start consuming invalidation messages (call once per worker at startup)."""
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop_listener(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        self._local_enabled = False
+        self.local.clear()
+
+    async def _listen(self) -> None:
+        """
+        Evict keys published by other workers.
+
+        While disconnected the in-process cache is switched off and emptied,
+        since invalidations sent in the meantime are lost.
+        """
+        backoff = 1
+        while True:
+            pubsub = get_redis().pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(CACHE_INVALIDATION_CHANNEL)
+                self._local_enabled = True
+                backoff = 1
+                while True:
+                    message = await pubsub.get_message(timeout=1.0)
+                    if message is None:
+                        continue
+                    for key in json.loads(message["data"]):
+                        self.local.delete(key)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Cache invalidation listener disconnected: {e}")
+            finally:
+                self._local_enabled = False
+                self.local.clear()
+                try:
+                    await pubsub.reset()
+                except Exception:
+                    pass
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30)
+
+
+response_cache = ResponseCache()
+
+
+def cached_response(
+        resource: str,
+        model: Type[BaseModel],
+        ttl: int,
+        object_param: Optional[str] = None,
+        orm_model: Optional[type] = None,
+) -> Callable:
+    """
+    Cache a public GET endpoint's serialized response in Redis.
+
+    Usage:
+        @router.get("/", response_model=NewsList)
+        @cached_response("news", NewsList, ttl=60)
+        async def get_news_list(...):
+            ...
+
+    Args:
+        resource: Generation/invalidation namespace (e.g. "news")
+        model: Response schema used to serialize the endpoint's return value
+        ttl: Seconds a cached body may be served
+        object_param: For single-object routes, the path param holding the id;
+            the body is then stored under the object key so writes to that
+            row can drop it directly, and is also kept in worker memory.
+            A `lang` param, if the endpoint has one, selects the language variant.
+        orm_model: Table the response is built from; enables ETag/Last-Modified
+            headers and 304 answers to conditional GETs. The endpoint must
+            take its session as `db`.
+
+    Only decorate endpoints whose response is identical for every caller.
+    """
+    def decorator(endpoint: Callable) -> Callable:
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            request = kwargs.pop(_REQUEST_PARAM, None)
+            if object_param is not None:
+                key = response_cache.object_key(resource, kwargs[object_param], kwargs.get("lang"))
+            else:
+                params = {k: v for k, v in kwargs.items() if v is None or _is_query_param(v)}
+                key = await response_cache.list_key(resource, endpoint.__name__, params)
+
+            # Validators first: a client with a current copy gets a 304 without a body
+            validators = None
+            if request is not None:
+                if object_param is not None:
+                    validators = await response_cache.object_validators(
+                        kwargs["db"], resource, orm_model, kwargs[object_param], kwargs.get("lang"), ttl
+                    )
+                elif key is not None:
+                    validators = await response_cache.list_validators(kwargs["db"], orm_model, key, ttl)
+                if validators is not None and validators.is_fresh(request):
+                    return not_modified(validators.headers)
+
+            local = object_param is not None
+            payload = await response_cache.get(key, local=local) if key is not None else None
+            if payload is None:
+                generation = await response_cache.generation(resource) if local else None
+                result = await endpoint(*args, **kwargs)
+                if isinstance(result, Response):
+                    return result
+                payload = model.model_validate(result, from_attributes=True).model_dump_json(by_alias=True).encode("utf-8")
+                if local:
+                    await response_cache.set_if_current(resource, generation, key, payload, ttl, local=True)
+                elif key is not None:
+                    # The key embeds the generation the page was built under
+                    await response_cache.set(key, payload, ttl)
+
+            return json_response(payload, headers=validators.headers if validators is not None else None)
+
+        if orm_model is not None:
+            # Have FastAPI pass the request in as well
+            signature = inspect.signature(endpoint)
+            wrapper.__signature__ = signature.replace(parameters=[
+                *signature.parameters.values(),
+                inspect.Parameter(_REQUEST_PARAM, inspect.Parameter.KEYWORD_ONLY, annotation=Request),
+            ])
+
+        return wrapper
+
+    return decorator
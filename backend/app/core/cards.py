@@ -0,0 +1,96 @@
+"""
+Card projections for the public list endpoints
+
+A list page only renders cards, but `select(Model)` reads and hydrates every
+column - including long Text bodies like News.content - into ORM objects that
+Pydantic then walks attribute by attribute. The selects built here fetch only
+the card columns as plain rows, with long text cut to a short excerpt in
+Postgres, and paginate() returns them as dicts.
+
+Nested users (news author, course uploader) are attached with one extra
+`WHERE id IN (...)` query per page, mirroring what selectinload did.
+"""
+from typing import Any, Dict, List
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+from app.models.course import Course
+from app.models.education import Education
+from app.models.job_vacancy import JobVacancy
+from app.models.merch import Merch
+from app.models.news import News
+from app.models.user import User, UserLoad
+
+# Enough for a two/three line preview on a card
+EXCERPT_LENGTH = 300
+
+
+def excerpt(column, length: int = EXCERPT_LENGTH):
+    """The first `length` characters of a text column, under the column's own name."""
+    return func.left(column, length).label(column.key)
+
+
+NEWS_CARD_COLUMNS = (
+    News.id, News.title, News.slug,
+    func.coalesce(News.snippet, func.left(News.content, EXCERPT_LENGTH)).label("snippet"),
+    News.image_url, News.category, News.views_count, News.author_id,
+    News.created_at, News.updated_at,
+)
+
+MERCH_CARD_COLUMNS = (
+    Merch.id, Merch.name, Merch.brand, excerpt(Merch.description), Merch.price, Merch.stock,
+    Merch.image_url, Merch.category, Merch.discount_percent, Merch.is_new, Merch.owner_id,
+    Merch.is_available, Merch.created_at, Merch.updated_at,
+)
+
+COURSE_CARD_COLUMNS = (
+    Course.id, Course.title, Course.sport_type, Course.difficulty_level, Course.video_url,
+    Course.thumbnail_url, Course.duration_seconds, Course.hls_manifest_url,
+    Course.qr_code_url, Course.qr_code_image_url,
+    Course.status, Course.view_count, Course.rating, Course.uploaded_by_id,
+    Course.created_at, Course.updated_at,
+)
+
+JOB_VACANCY_CARD_COLUMNS = (
+    JobVacancy.id, JobVacancy.title, excerpt(JobVacancy.description), JobVacancy.company,
+    JobVacancy.image_url, JobVacancy.location, JobVacancy.region, JobVacancy.employment_type,
+    JobVacancy.sport_type, JobVacancy.salary_range, JobVacancy.contact, JobVacancy.is_active,
+    JobVacancy.created_at, JobVacancy.updated_at,
+)
+
+EDUCATION_CARD_COLUMNS = (
+    Education.id, Education.name, excerpt(Education.description), Education.region,
+    Education.type, Education.address, Education.working_hours, Education.image_url,
+    Education.phone, Education.rating, Education.maps_link,
+    Education.created_at, Education.updated_at,
+)
+
+
+def card_select(columns) -> Select:
+    """Start a list query that returns card rows instead of ORM entities."""
+    return select(*columns)
+
+
+async def attach_users(
+        db: AsyncSession,
+        rows: List[Dict[str, Any]],
+        id_field: str,
+        target_field: str,
+) -> None:
+    """
+    Fill `row[target_field]` with the CARD columns of the user in `row[id_field]`.
+
+    Args:
+        rows: Card rows as returned by paginate()
+        id_field: Foreign key column in the rows (e.g. "author_id")
+        target_field: Key to store the nested user under (e.g. "author")
+    """
+    user_ids = {row[id_field] for row in rows if row[id_field] is not None}
+    users = {}
+    if user_ids:
+        result = await db.execute(select(*UserLoad.CARD).where(User.id.in_(user_ids)))
+        users = {user.id: dict(user._mapping) for user in result}
+    for row in rows:
+        row[target_field] = users.get(row[id_field])
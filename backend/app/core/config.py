@@ -3,7 +3,7 @@ Application Configuration using Pydantic Settings
 """
 from pydantic_settings import BaseSettings
 from pydantic import PostgresDsn, validator
-from typing import List, Optional, Union, Any
+from typing import Dict, List, Optional, Tuple, Union, Any
 import secrets
 
 class Settings(BaseSettings):
@@ -37,6 +37,13 @@ class Settings(BaseSettings):
     REDIS_HOST: str = "127.0.0.1"
     REDIS_PORT: int = 6379
 
+    # In-process (per worker) cache in front of Redis for single-object reads
+    LOCAL_CACHE_MAX_BYTES: int = 32 * 1024 * 1024  # 32MB per worker
+    LOCAL_CACHE_TTL: int = 30  # seconds; backstop if an invalidation message is lost
+
+    # How often buffered news/course view counts are written to Postgres
+    VIEW_COUNT_FLUSH_INTERVAL: int = 30  # seconds
+
     # Frontend
     FRONTEND_URL: str = "http://127.0.0.1:3000"
 
@@ -74,10 +81,16 @@ class Settings(BaseSettings):
         return v
     
     # Translation Service
-    TRANSLATION_SERVICE: str = "google"  # google, deepl, libretranslate
+    TRANSLATION_SERVICE: str = "google"  # google, libretranslate, offline, passthrough
     GOOGLE_TRANSLATE_API_KEY: Optional[str] = None
     DEEPL_API_KEY: Optional[str] = None
     LIBRETRANSLATE_URL: Optional[str] = None
+    LIBRETRANSLATE_API_KEY: Optional[str] = None
+    TRANSLATION_OFFLINE_LATENCY_MS: float = 0  # simulated per-call latency of the offline backend
+    TRANSLATION_BATCH_SIZE: int = 10  # texts per backend call
+    TRANSLATION_MAX_CONCURRENCY: int = 4  # backend calls in flight per worker
+    # Languages content is pre-translated into (source content is Uzbek)
+    CONTENT_TRANSLATION_LANGUAGES: List[str] = ["en", "ru"]
     
     # Payment Gateways
     CLICK_MERCHANT_ID: Optional[str] = None
@@ -99,7 +112,33 @@ class Settings(BaseSettings):
     
     # File Upload
     UPLOAD_DIR: str = "/app/uploads"
+    UPLOAD_TMP_DIR: Optional[str] = None  # where uploads are streamed first (default: UPLOAD_DIR/.incoming)
+    STORAGE_BACKEND: str = "local"
+    STORAGE_GC_INTERVAL: int = 3600  # seconds between garbage collections of unreferenced files
+    STORAGE_GC_GRACE_PERIOD: int = 3600  # seconds a file stays after its last reference is dropped
+    MEDIA_CACHE_MAX_AGE: int = 3600  # seconds, for /uploads files that aren't content-addressed
+    # Let nginx send /uploads files: the backend answers with an X-Accel-Redirect
+    # to this internal location (see docker/nginx/nginx.conf)
+    MEDIA_ACCEL_REDIRECT: bool = False
+    MEDIA_ACCEL_REDIRECT_PREFIX: str = "/_media/"
     MAX_UPLOAD_SIZE: int = 10485760  # 10MB
+    MAX_VIDEO_UPLOAD_SIZE: int = 500 * 1024 * 1024  # course videos
+    # HLS transcoding of course videos (app.services.video)
+    FFMPEG_BINARY: str = "ffmpeg"
+    FFPROBE_BINARY: str = "ffprobe"
+    # (short side in px, video kbit/s, audio kbit/s) per rendition; those
+    # above the source's resolution are skipped
+    VIDEO_HLS_RENDITIONS: List[Tuple[int, int, int]] = [(360, 800, 96), (720, 2800, 128), (1080, 5000, 160)]
+    VIDEO_HLS_SEGMENT_SECONDS: int = 6
+    VIDEO_TRANSCODE_TIMEOUT: int = 2 * 3600  # seconds ffmpeg may run per video
+    # Courses pending/processing this long (more than a transcode can run)
+    # are queued again, checked every VIDEO_TRANSCODE_SWEEP_INTERVAL seconds
+    VIDEO_TRANSCODE_STALL_AFTER: int = 3 * 3600
+    VIDEO_TRANSCODE_SWEEP_INTERVAL: int = 900
+    MAX_REQUEST_BODY_SIZE: int = 16 * 1024 * 1024  # any request, except the routes in BODY_SIZE_LIMITS
+    # Responsive WebP copies of uploaded images: variant name -> width in px
+    IMAGE_VARIANT_WIDTHS: Dict[str, int] = {"thumb": 160, "card": 480, "full": 1280}
+    IMAGE_VARIANT_QUALITY: int = 80  # WebP quality (0-100)
     ALLOWED_EXTENSIONS: List[str] = ["jpg", "jpeg", "png", "gif", "pdf", "doc", "docx"]
     ALLOWED_IMAGE_EXTENSIONS: List[str] = ["jpg", "jpeg", "png", "gif", "webp"]
     ALLOWED_DOCUMENT_EXTENSIONS: List[str] = ["pdf", "doc", "docx"]
@@ -107,6 +146,9 @@ class Settings(BaseSettings):
     # Rate Limiting
     RATE_LIMIT_PER_MINUTE: int = 60
     RATE_LIMIT_PER_HOUR: int = 1000
+    RATE_LIMIT_SYNC_INTERVAL: float = 1.0  # seconds between flushes of locally admitted hits
+    RATE_LIMIT_LOCAL_ENTRIES: int = 10000  # identities remembered per worker
+    RATE_LIMIT_LOCAL_HEADROOM: float = 0.2  # fraction of a limit always checked against Redis
     
     # Admin
     FIRST_SUPERUSER_EMAIL: str = "admin@sportmilliyportali.uz"
@@ -0,0 +1,203 @@
+"""
+Write-time translation of news, courses, education and job vacancies
+
+Content is written rarely and read constantly, so instead of translating on
+every read, create/update handlers call schedule_translation() and a Celery
+task (translate_content_task) stores en/ru variants of the text fields in
+`content_translations`. Read endpoints take a `lang` param and overlay the
+stored variants with apply_translations(), one indexed query per page.
+
+Each stored field carries the md5 of the source text it was translated from.
+The task only re-translates fields whose source changed, and readers only
+use variants whose hash still matches the current source (compared in SQL),
+so an edit is never shown with the previous text's translation - the field
+falls back to the original until the task has caught up.
+"""
+import logging
+from enum import Enum
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import String, case, cast, delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import response_cache
+from app.core.cards import EXCERPT_LENGTH
+from app.core.config import settings
+from app.core.translation import translation_service
+from app.db.session import SyncSessionLocal
+from app.models.content_translation import ContentTranslation
+from app.models.course import Course
+from app.models.education import Education
+from app.models.job_vacancy import JobVacancy
+from app.models.news import News
+
+logger = logging.getLogger(__name__)
+
+
+class ContentLanguage(str, Enum):
+    """Languages content can be read in (`lang` query param)"""
+    UZ = "uz"
+    EN = "en"
+    RU = "ru"
+
+
+# resource name (shared with the response cache) -> (model, {field: source expression})
+TRANSLATABLE_CONTENT: Dict[str, Tuple[type, Dict[str, Any]]] = {
+    "news": (News, {
+        "title": News.title,
+        # Same expression as the news card, so cards get a matching translation
+        "snippet": func.coalesce(News.snippet, func.left(News.content, EXCERPT_LENGTH)),
+        "content": News.content,
+    }),
+    "courses": (Course, {
+        "title": Course.title,
+        "description": Course.description,
+    }),
+    "education": (Education, {
+        "name": Education.name,
+        "description": Education.description,
+    }),
+    "job_vacancies": (JobVacancy, {
+        "title": JobVacancy.title,
+        "description": JobVacancy.description,
+    }),
+}
+
+
+def schedule_translation(resource: str, object_id: Any) -> None:
+    """
+    Queue (re-)translation of a row; call after committing a create, update
+    or delete. A broker outage only delays translations, so it is logged.
+    """
+    from app.workers.tasks import translate_content_task
+
+    try:
+        translate_content_task.delay(resource, str(object_id))
+    except Exception as e:
+        logger.warning(f"Could not queue translation of {resource} {object_id}: {e}")
+
+
+async def apply_translations(
+        db: AsyncSession,
+        resource: str,
+        rows: List[Dict[str, Any]],
+        lang: Optional[ContentLanguage],
+        excerpt_fields: Iterable[str] = (),
+) -> None:
+    """
+    Replace translatable fields of `rows` with their `lang` variants, in place.
+
+    Args:
+        rows: Serialized items with an "id" key (cards or full objects)
+        lang: Requested language; None or the source language is a no-op
+        excerpt_fields: Fields the rows hold as excerpts; their translations
+            are cut to the same length
+    """
+    lang = lang.value if isinstance(lang, ContentLanguage) else lang
+    if not rows or lang not in settings.CONTENT_TRANSLATION_LANGUAGES:
+        return
+
+    model, sources = TRANSLATABLE_CONTENT[resource]
+    current_hash = case(
+        {field: func.md5(source) for field, source in sources.items()},
+        value=ContentTranslation.field,
+    )
+    result = await db.execute(
+        select(ContentTranslation.resource_id, ContentTranslation.field, ContentTranslation.text)
+        .join(model, cast(model.id, String) == ContentTranslation.resource_id)
+        .where(
+            ContentTranslation.resource == resource,
+            ContentTranslation.lang == lang,
+            ContentTranslation.resource_id.in_({str(row["id"]) for row in rows}),
+            model.id.in_({row["id"] for row in rows}),
+            ContentTranslation.source_hash == current_hash,
+        )
+    )
+    translations = {(row.resource_id, row.field): row.text for row in result}
+
+    excerpt_fields = set(excerpt_fields)
+    for row in rows:
+        for field in sources:
+            text = translations.get((str(row["id"]), field))
+            if text is not None and field in row:
+                row[field] = text[:EXCERPT_LENGTH] if field in excerpt_fields else text
+
+
+def translate_content(resource: str, object_id: str) -> int:
+    """
+    Bring the stored translations of one row up to date (blocking; runs in Celery).
+
+    Returns:
+        Number of fields (re-)translated
+    """
+    model, sources = TRANSLATABLE_CONTENT[resource]
+    row_id = model.__table__.c.id.type.python_type(object_id)
+    scope = (ContentTranslation.resource == resource, ContentTranslation.resource_id == object_id)
+
+    with SyncSessionLocal() as session:
+        row = session.execute(
+            select(
+                *[source.label(field) for field, source in sources.items()],
+                *[func.md5(source).label(f"{field}_hash") for field, source in sources.items()],
+            ).where(model.id == row_id)
+        ).one_or_none()
+
+        # Deleted: drop its translations
+        if row is None:
+            session.execute(delete(ContentTranslation).where(*scope))
+            session.commit()
+            return 0
+
+        existing = {
+            (t.field, t.lang): t.source_hash
+            for t in session.execute(
+                select(ContentTranslation.field, ContentTranslation.lang, ContentTranslation.source_hash)
+                .where(*scope)
+            )
+        }
+        current = {field: (getattr(row, field), getattr(row, f"{field}_hash")) for field in sources}
+
+        translated = []
+        for lang in settings.CONTENT_TRANSLATION_LANGUAGES:
+            stale = [
+                field for field, (text, source_hash) in current.items()
+                if text and text.strip() and existing.get((field, lang)) != source_hash
+            ]
+            if not stale:
+                continue
+            # Through the translation caches, so text shared with other rows
+            # (or translated before a retry) isn't sent to the backend again
+            found = translation_service.translations_sync([current[field][0] for field in stale], lang)
+            translated.extend(
+                {
+                    "resource": resource,
+                    "resource_id": object_id,
+                    "field": field,
+                    "lang": lang,
+                    "text": found[current[field][0]],
+                    "source_hash": current[field][1],
+                }
+                for field in stale if current[field][0] in found
+            )
+
+        if translated:
+            stmt = insert(ContentTranslation).values(translated)
+            session.execute(stmt.on_conflict_do_update(
+                constraint="uq_content_translation",
+                set_={
+                    "text": stmt.excluded.text,
+                    "source_hash": stmt.excluded.source_hash,
+                    "updated_at": func.now(),
+                },
+            ))
+
+        # Fields that were cleared have nothing to translate any more
+        emptied = [field for field, (text, _) in current.items() if not (text and text.strip())]
+        if emptied:
+            session.execute(delete(ContentTranslation).where(*scope, ContentTranslation.field.in_(emptied)))
+        session.commit()
+
+    if translated:
+        response_cache.invalidate_sync(resource, object_id)
+    return len(translated)
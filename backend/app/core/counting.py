@@ -0,0 +1,137 @@
+"""
+Total-count layer for paginated list endpoints
+
+`SELECT count(*) FROM (<list query>)` roughly doubles the work of every list
+request. Instead:
+
+- Lists filtered only by cheap equality filters (category, region, status...)
+  get an exact count cached in Redis per (table, filter signature). The cache
+  is dropped whenever a row of that table is created, updated or deleted.
+- Lists with a free-text search fall back to the Postgres planner's row
+  estimate (EXPLAIN), and only pay for an exact count when the estimate says
+  the result is small anyway.
+
+count_rows() reports which of the two the caller got, so responses can flag
+`total_is_estimate`.
+"""
+import json
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from app.core.redis import get_redis, get_sync_redis
+
+logger = logging.getLogger(__name__)
+
+COUNT_CACHE_PREFIX = "count:"
+COUNT_CACHE_TTL = 300  # seconds; bounds staleness if an invalidation is ever missed
+# Below this planner estimate an exact count is cheap, and planner estimates
+# for ILIKE filters are too rough to show for small result sets.
+EXACT_COUNT_THRESHOLD = 1000
+
+
+class _Explain(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) wrapper that keeps the inner statement's bind processing."""
+    inherit_cache = False
+
+    def __init__(self, statement: Select):
+        self.statement = statement
+
+
+@compiles(_Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+def _cache_key(model) -> str:
+    return f"{COUNT_CACHE_PREFIX}{model.__tablename__}"
+
+
+def _signature_field(signature: Dict[str, Any]) -> str:
+    """Normalise filter values (enums, lists, None) into a stable hash field."""
+    def _norm(value):
+        if isinstance(value, (list, tuple, set)):
+            return sorted(_norm(v) for v in value)
+        return getattr(value, "value", value)
+
+    normalised = {k: _norm(v) for k, v in signature.items() if v is not None}
+    return json.dumps(normalised, sort_keys=True, default=str)
+
+
+async def _exact_count(db: AsyncSession, query: Select) -> int:
+    return await db.scalar(select(func.count()).select_from(query.order_by(None).subquery())) or 0
+
+
+async def _planner_estimate(db: AsyncSession, query: Select) -> int:
+    plan = await db.scalar(_Explain(query.order_by(None)))
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def count_rows(
+        db: AsyncSession,
+        query: Select,
+        model,
+        signature: Optional[Dict[str, Any]] = None,
+) -> Tuple[int, bool]:
+    """
+    Count the rows matched by a list query.
+
+    Args:
+        query: The filtered list query (before pagination)
+        model: Model class the query selects; its table names the cache entry
+        signature: The equality filters applied to `query`, for cacheable
+            lists. Pass None when the query has a free-text search - those
+            are estimated instead of cached.
+
+    Returns:
+        (total, is_estimate)
+    """
+    if signature is None:
+        estimate = await _planner_estimate(db, query)
+        if estimate >= EXACT_COUNT_THRESHOLD:
+            return estimate, True
+        return await _exact_count(db, query), False
+
+    key = _cache_key(model)
+    field = _signature_field(signature)
+    redis = get_redis()
+    try:
+        cached = await redis.hget(key, field)
+        if cached is not None:
+            return int(cached), False
+    except Exception as e:
+        logger.warning(f"Count cache read failed: {e}")
+        return await _exact_count(db, query), False
+
+    total = await _exact_count(db, query)
+    try:
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.hset(key, field, total)
+            pipe.expire(key, COUNT_CACHE_TTL)
+            await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Count cache write failed: {e}")
+    return total, False
+
+
+async def invalidate_counts(model) -> None:
+    """Drop every cached count for `model`'s table (call after create/update/delete)."""
+    try:
+        await get_redis().delete(_cache_key(model))
+    except Exception as e:
+        logger.warning(f"Count cache invalidation failed: {e}")
+
+
+def invalidate_counts_sync(model) -> None:
+    """Blocking invalidate_counts() for Celery tasks."""
+    try:
+        get_sync_redis().delete(_cache_key(model))
+    except Exception as e:
+        logger.warning(f"Count cache invalidation failed: {e}")
@@ -0,0 +1,163 @@
+"""
+HTTP validators and pre-compressed payloads
+
+Helpers for answering conditional GETs (If-None-Match / If-Modified-Since)
+with 304 Not Modified:
+
+    Validators            ETag + Last-Modified derived from row versions
+                          (id, updated_at), so they can be checked without
+                          building the body (see ResponseCache for storage)
+    PrecompressedPayload  large, rarely changing documents (the OpenAPI
+                          schema), serialized and compressed once; each
+                          request picks the stored gzip/brotli/identity bytes
+"""
+import gzip
+import hashlib
+import json
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+import brotli
+from fastapi import Request, Response
+
+
+def make_etag(data: bytes) -> str:
+    """Strong ETag (quoted) for a payload."""
+    return f'"{hashlib.blake2b(data, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    If-None-Match comparison (weak, as RFC 9110 requires for GET): "*" or
+    any listed tag equal to `etag` once W/ prefixes are dropped.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    wanted = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == wanted for tag in if_none_match.split(","))
+
+
+def not_modified(headers: Dict[str, str]) -> Response:
+    """304 carrying the validators/caching headers of the full response."""
+    return Response(status_code=304, headers=headers)
+
+
+@dataclass(frozen=True)
+class Validators:
+    """
+    Weak ETag and Last-Modified of a response.
+
+    Weak, because they describe the row versions a body was built from, not
+    its bytes (live counters such as views_count may differ between two
+    bodies with the same validators).
+    """
+    etag: str
+    last_modified: Optional[datetime] = None
+
+    @classmethod
+    def of(cls, *parts: Any, last_modified: Optional[datetime] = None) -> "Validators":
+        """Validators whose ETag changes whenever any of `parts` does."""
+        digest = hashlib.blake2b("|".join(map(str, parts)).encode("utf-8"), digest_size=16).hexdigest()
+        return cls(f'W/"{digest}"', last_modified)
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        # no-cache: clients may store the body but must revalidate it first
+        headers = {"ETag": self.etag, "Cache-Control": "no-cache"}
+        if self.last_modified is not None:
+            headers["Last-Modified"] = format_datetime(self.last_modified.astimezone(timezone.utc), usegmt=True)
+        return headers
+
+    def is_fresh(self, request: Request) -> bool:
+        """
+        Whether the client's copy is current, i.e. the answer is a 304.
+        If-None-Match takes precedence over If-Modified-Since (RFC 9110).
+        """
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            return etag_matches(if_none_match, self.etag)
+
+        if_modified_since = request.headers.get("if-modified-since")
+        if not if_modified_since or self.last_modified is None:
+            return False
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        # HTTP dates have whole-second precision
+        return self.last_modified.replace(microsecond=0) <= since
+
+    def dumps(self) -> bytes:
+        last_modified = self.last_modified.isoformat() if self.last_modified else None
+        return json.dumps({"etag": self.etag, "last_modified": last_modified}).encode("utf-8")
+
+    @classmethod
+    def loads(cls, data: bytes) -> "Validators":
+        stored = json.loads(data)
+        last_modified = stored.get("last_modified")
+        return cls(stored["etag"], datetime.fromisoformat(last_modified) if last_modified else None)
+
+
+def _accepts(accept_encoding: str, coding: str) -> bool:
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        if name.strip().lower() == coding:
+            q = params.strip()
+            if not q.startswith("q="):
+                return True
+            try:
+                return float(q[2:]) > 0
+            except ValueError:
+                return True
+    return False
+
+
+@dataclass(frozen=True)
+class PrecompressedPayload:
+    """A body stored as identity, gzip and brotli bytes, with its ETag (of the identity bytes)."""
+    media_type: str
+    identity: bytes
+    gzip: bytes
+    br: bytes
+    etag: str
+
+    @classmethod
+    def build(cls, data: bytes, media_type: str) -> "PrecompressedPayload":
+        """Compress `data` once at maximum ratio (it is served many times)."""
+        return cls(
+            media_type=media_type,
+            identity=data,
+            gzip=gzip.compress(data, compresslevel=9, mtime=0),
+            br=brotli.compress(data, quality=11),
+            etag=make_etag(data),
+        )
+
+    def response(self, request: Request, cache_control: str = "no-cache") -> Response:
+        """
+        304 if the client holds the current document in any encoding,
+        otherwise the smallest encoding the client accepts. Each encoding
+        gets its own ETag ("<digest>-br"), as the bytes differ.
+        """
+        accept_encoding = request.headers.get("accept-encoding", "")
+        if _accepts(accept_encoding, "br"):
+            coding, body = "br", self.br
+        elif _accepts(accept_encoding, "gzip"):
+            coding, body = "gzip", self.gzip
+        else:
+            coding, body = None, self.identity
+
+        etag = f'{self.etag[:-1]}-{coding}"' if coding else self.etag
+        headers = {"ETag": etag, "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+        if_none_match = request.headers.get("if-none-match")
+        if any(etag_matches(if_none_match, f'{self.etag[:-1]}{suffix}"') for suffix in ("", "-br", "-gzip")):
+            return not_modified(headers)
+
+        if coding:
+            headers["Content-Encoding"] = coding
+        return Response(content=body, media_type=self.media_type, headers=headers)
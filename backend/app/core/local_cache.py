@@ -0,0 +1,68 @@
+"""
+In-process LRU/TTL cache for hot serialized objects
+
+Sits in front of the Redis response cache for single-object reads, so a
+trending article is served from worker memory instead of costing a Redis
+round-trip per request in each gunicorn worker. Memory is bounded by the
+total size of the stored payloads, not by entry count, since a course with a
+long description is much larger than a job vacancy.
+
+Entries are dropped across workers through Redis pub/sub (see cache.py); the
+TTL only bounds staleness if an invalidation message is ever lost.
+"""
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+
+class LocalCache:
+    """
+    Byte-bounded LRU cache with per-entry expiry.
+
+    Not thread-safe: it is only touched from the worker's event loop.
+    """
+
+    def __init__(self, max_bytes: int, max_entry_bytes: Optional[int] = None):
+        self.max_bytes = max_bytes
+        # A single huge payload would otherwise evict everything else
+        self.max_entry_bytes = max_entry_bytes or max_bytes // 16
+        self._entries: "OrderedDict[str, Tuple[bytes, float]]" = OrderedDict()
+        self.size_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        payload, expires_at = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return payload
+
+    def set(self, key: str, payload: bytes, ttl: float) -> None:
+        size = len(payload)
+        if size > self.max_entry_bytes or ttl <= 0:
+            self.delete(key)
+            return
+        self._remove(key)
+        self._entries[key] = (payload, time.monotonic() + ttl)
+        self.size_bytes += size
+        while self.size_bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+
+    def delete(self, key: str) -> None:
+        self._remove(key)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.size_bytes = 0
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size_bytes -= len(entry[0])
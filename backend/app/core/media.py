@@ -0,0 +1,263 @@
+"""
+Uploaded media serving
+
+MediaFiles serves UPLOAD_DIR at /uploads in place of StaticFiles, which in
+Starlette 0.35 ignores Range: every seek in a course video (up to 500MB)
+re-sent the file from its first byte through Python. MediaFiles:
+
+    - answers a single-range Range request with 206 (honouring If-Range)
+      and one past the end with 416; multi-range requests get the whole
+      file, as RFC 9110 allows
+    - sends a strong ETag and Last-Modified, and 304 for conditional GETs
+    - caches content-addressed files ("<sha[:2]>/<sha>...", which never
+      change) for a year as immutable, anything else for MEDIA_CACHE_MAX_AGE
+    - sends the bytes with the ASGI zero-copy extension
+      (http.response.zerocopysend) when the server offers it, otherwise in
+      1MB chunks read in a worker thread
+    - refuses paths with a dot segment (".incoming" holds uploads being
+      received)
+
+With MEDIA_ACCEL_REDIRECT, Python only checks the request: the response is
+an empty X-Accel-Redirect to MEDIA_ACCEL_REDIRECT_PREFIX + path, and nginx
+sends the file from the shared uploads volume with sendfile, handling Range
+and validators itself (see docker/nginx/nginx.conf).
+"""
+import asyncio
+import mimetypes
+import os
+import re
+import stat
+from datetime import datetime, timezone
+from email.utils import formatdate
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+from starlette.requests import Request
+from starlette.types import Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.http_cache import Validators
+
+CHUNK_SIZE = 1024 * 1024
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# ".../3f/3fa9<62 more hex>..." - keys from StorageService.save_upload() and
+# the files derived from them (image variants, "<sha>_hls/..." renditions)
+_CONTENT_ADDRESSED_RE = re.compile(r"(?:^|/)([0-9a-f]{2})/\1[0-9a-f]{62}[^/]*(?:/.+)?$")
+
+# Missing from (or wrong in) the mimetypes tables
+_MEDIA_TYPES = {
+    ".m3u8": "application/vnd.apple.mpegurl",
+    ".ts": "video/mp2t",
+}
+
+
+class RangeNotSatisfiable(Exception):
+    """The Range starts past the end of the file."""
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    The (first, last) byte positions, inclusive, of a single-range
+    "bytes=" Range header.
+
+    Returns:
+        None to send the whole file: no header, or one that is malformed,
+        in another unit or asks for several ranges
+
+    Raises:
+        RangeNotSatisfiable: The range starts past the end of the file
+    """
+    if not header or not header.startswith("bytes="):
+        return None
+    spec = header[len("bytes="):].strip()
+    if "," in spec:
+        return None
+    first, sep, last = (part.strip() for part in spec.partition("-"))
+    if not sep:
+        return None
+
+    if not first:
+        # "bytes=-500": the last 500 bytes
+        if not last.isdigit():
+            return None
+        length = int(last)
+        if length == 0 or size == 0:
+            raise RangeNotSatisfiable
+        return max(0, size - length), size - 1
+
+    if not first.isdigit() or (last and not last.isdigit()):
+        return None
+    start = int(first)
+    if start >= size:
+        raise RangeNotSatisfiable
+    end = int(last) if last else size - 1
+    if end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+def _encode(headers: Dict[str, str]) -> List[Tuple[bytes, bytes]]:
+    return [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers.items()]
+
+
+class MediaFiles:
+    """
+    ASGI app serving the files under `directory` (mount it like StaticFiles).
+
+    Args:
+        directory: Root of the served files (UPLOAD_DIR)
+        accel_redirect: Delegate sending to nginx (default: MEDIA_ACCEL_REDIRECT)
+        accel_prefix: nginx internal location the paths are redirected to
+            (default: MEDIA_ACCEL_REDIRECT_PREFIX)
+        max_age: Cache lifetime of files that aren't content-addressed, in
+            seconds (default: MEDIA_CACHE_MAX_AGE)
+    """
+
+    def __init__(
+            self,
+            directory: str,
+            accel_redirect: Optional[bool] = None,
+            accel_prefix: Optional[str] = None,
+            max_age: Optional[int] = None,
+    ):
+        self.directory = os.path.realpath(directory)
+        self.accel_redirect = settings.MEDIA_ACCEL_REDIRECT if accel_redirect is None else accel_redirect
+        self.accel_prefix = accel_prefix or settings.MEDIA_ACCEL_REDIRECT_PREFIX
+        self.max_age = settings.MEDIA_CACHE_MAX_AGE if max_age is None else max_age
+
+    def _relative_path(self, scope: Scope) -> Optional[str]:
+        """The requested path below the mount, or None if it may not be served."""
+        path = scope["path"]
+        root_path = scope.get("root_path", "")
+        if root_path and path.startswith(root_path):
+            path = path[len(root_path):]
+        segments = path.strip("/").split("/")
+        if not segments or any(not segment or segment.startswith(".") or "\\" in segment for segment in segments):
+            return None
+        return "/".join(segments)
+
+    def _cache_control(self, relative_path: str) -> str:
+        if _CONTENT_ADDRESSED_RE.search(relative_path):
+            return IMMUTABLE_CACHE_CONTROL
+        return f"public, max-age={self.max_age}"
+
+    def _stat(self, full_path: str) -> Optional[os.stat_result]:
+        """stat() of a regular file inside the directory, else None (blocking)."""
+        # Symlinks must not lead out of the upload directory
+        if not os.path.realpath(full_path).startswith(self.directory + os.sep):
+            return None
+        try:
+            st = os.stat(full_path)
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        return st if stat.S_ISREG(st.st_mode) else None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        assert scope["type"] == "http"
+
+        if scope["method"] not in ("GET", "HEAD"):
+            await self._respond(send, 405, {"Allow": "GET, HEAD"})
+            return
+
+        relative_path = self._relative_path(scope)
+        if relative_path is None:
+            await self._respond(send, 404)
+            return
+
+        media_type = (
+            _MEDIA_TYPES.get(os.path.splitext(relative_path)[1].lower())
+            or mimetypes.guess_type(relative_path)[0]
+            or "application/octet-stream"
+        )
+        cache_control = self._cache_control(relative_path)
+
+        if self.accel_redirect:
+            # nginx 404s missing files itself and keeps Content-Type/Cache-Control
+            await self._respond(send, 200, {
+                "X-Accel-Redirect": self.accel_prefix + quote(relative_path),
+                "Content-Type": media_type,
+                "Cache-Control": cache_control,
+            })
+            return
+
+        full_path = os.path.join(self.directory, *relative_path.split("/"))
+        st = await asyncio.to_thread(self._stat, full_path)
+        if st is None:
+            await self._respond(send, 404)
+            return
+
+        validators = Validators(
+            etag=f'"{st.st_mtime_ns:x}-{st.st_size:x}"',
+            last_modified=datetime.fromtimestamp(st.st_mtime, timezone.utc),
+        )
+        headers = {
+            "ETag": validators.etag,
+            "Last-Modified": formatdate(st.st_mtime, usegmt=True),
+            "Cache-Control": cache_control,
+            "Accept-Ranges": "bytes",
+        }
+        request = Request(scope)
+        if validators.is_fresh(request):
+            await self._respond(send, 304, headers)
+            return
+
+        size = st.st_size
+        if_range = request.headers.get("if-range")
+        # A Range only applies to the version the client already has part of
+        if if_range is None or if_range in (validators.etag, headers["Last-Modified"]):
+            try:
+                byte_range = parse_range(request.headers.get("range"), size)
+            except RangeNotSatisfiable:
+                await self._respond(send, 416, {**headers, "Content-Range": f"bytes */{size}"})
+                return
+        else:
+            byte_range = None
+
+        if byte_range is None:
+            status_code, start, length = 200, 0, size
+        else:
+            start, end = byte_range
+            status_code, length = 206, end - start + 1
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        headers["Content-Type"] = media_type
+        headers["Content-Length"] = str(length)
+
+        await send({"type": "http.response.start", "status": status_code, "headers": _encode(headers)})
+        if scope["method"] == "HEAD" or length == 0:
+            await send({"type": "http.response.body", "body": b""})
+            return
+        await self._send_file(scope, send, full_path, start, length)
+
+    @staticmethod
+    async def _send_file(scope: Scope, send: Send, path: str, start: int, length: int) -> None:
+        f = await asyncio.to_thread(open, path, "rb")
+        try:
+            if "http.response.zerocopysend" in scope.get("extensions", {}):
+                # The server sendfile()s from the descriptor
+                await send({"type": "http.response.zerocopysend", "file": f, "offset": start, "count": length})
+                return
+
+            await asyncio.to_thread(f.seek, start)
+            remaining = length
+            while remaining > 0:
+                chunk = await asyncio.to_thread(f.read, min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break  # Truncated since stat(); the client sees a short body
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            if remaining > 0:
+                await send({"type": "http.response.body", "body": b""})
+        finally:
+            await asyncio.to_thread(f.close)
+
+    @staticmethod
+    async def _respond(send: Send, status_code: int, headers: Optional[Dict[str, str]] = None) -> None:
+        """A response without a body."""
+        headers = dict(headers or {})
+        if status_code != 304:
+            headers["Content-Length"] = "0"
+            headers.setdefault("Content-Type", "text/plain")
+        await send({"type": "http.response.start", "status": status_code, "headers": _encode(headers)})
+        await send({"type": "http.response.body", "body": b""})
@@ -0,0 +1,214 @@
+"""
+Request middleware
+
+BodySizeLimitMiddleware refuses request bodies over the route's limit with
+413: up front when Content-Length says so, otherwise as soon as the bytes
+received pass it - before the multipart parser has spooled the rest.
+
+RequestContextMiddleware does the per-request work every route shares, in
+one raw ASGI pass:
+
+    - request id: taken from a sane incoming X-Request-ID or generated,
+      exposed as request.state.request_id and echoed in the response
+    - rate limiting: rate_limiter.check() for the identity and route, with
+      the X-RateLimit-*/Retry-After headers added to the response
+    - timing: X-Process-Time, seconds until the response headers were sent
+
+Unlike @app.middleware("http") (BaseHTTPMiddleware), it doesn't run the
+route in a separate task or re-wrap the response body in a memory stream:
+headers are added to the http.response.start message on the way out and
+body chunks are passed through untouched, so streamed responses (video
+downloads, large files) keep streaming.
+
+SelectiveGZipMiddleware is GZipMiddleware minus GZIP_SKIP_PATHS: uploaded
+media is mostly compressed already (images, video), and its 206 partial
+responses must be sent byte for byte.
+"""
+import json
+import re
+import time
+import uuid
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.rate_limiter import RateLimiter, limits_for_path, rate_limit_identity
+
+# Not rate limited
+RATE_LIMIT_SKIP_PATHS = ("/health", "/admin", "/docs")
+
+_REQUEST_ID_RE = re.compile(r"^[A-Za-z0-9._-]{1,128}$")
+
+_RATE_LIMITED_BODY = json.dumps({"detail": "Rate limit exceeded. Please try again later."}).encode("utf-8")
+
+
+# Not gzipped (see SelectiveGZipMiddleware)
+GZIP_SKIP_PATHS = ("/uploads",)
+
+
+# Path prefix -> body size limit, for routes taking bigger uploads than
+# MAX_REQUEST_BODY_SIZE (the file limit plus room for the other form parts)
+BODY_SIZE_LIMITS: Dict[str, int] = {
+    "/api/v1/courses": settings.MAX_VIDEO_UPLOAD_SIZE + 16 * 1024 * 1024,
+}
+
+
+def _request_id(incoming: str) -> str:
+    """Keep a proxy-assigned id if it's safe to log and echo, else make one."""
+    if incoming and _REQUEST_ID_RE.match(incoming):
+        return incoming
+    return uuid.uuid4().hex
+
+
+def _encode(headers) -> List[Tuple[bytes, bytes]]:
+    return [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers.items()]
+
+
+class RequestContextMiddleware:
+    """
+    Request id, rate limiting and timing for HTTP requests.
+
+    Args:
+        rate_limiter: Limiter shared by the worker (its sync task must be
+            started separately)
+        skip_paths: Path prefixes that are not rate limited
+    """
+
+    def __init__(
+            self,
+            app: ASGIApp,
+            rate_limiter: RateLimiter,
+            skip_paths: Sequence[str] = RATE_LIMIT_SKIP_PATHS,
+    ):
+        self.app = app
+        self.rate_limiter = rate_limiter
+        self.skip_paths = tuple(skip_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        headers = Headers(scope=scope)
+        request_id = _request_id(headers.get("x-request-id", ""))
+        scope.setdefault("state", {})["request_id"] = request_id
+        extra_headers = [(b"x-request-id", request_id.encode("latin-1"))]
+
+        path = scope["path"]
+        if not path.startswith(self.skip_paths):
+            client = scope.get("client")
+            identity = rate_limit_identity(headers.get("authorization"), client[0] if client else None)
+            # None: Redis is down, fail open
+            result = await self.rate_limiter.check(identity, limits_for_path(path))
+            if result is not None:
+                extra_headers.extend(_encode(result.headers))
+                if not result.allowed:
+                    await self._reject(send, extra_headers, started)
+                    return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [
+                    *message.get("headers", ()),
+                    *extra_headers,
+                    (b"x-process-time", str(time.perf_counter() - started).encode("latin-1")),
+                ]
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+    @staticmethod
+    async def _reject(send: Send, extra_headers: List[Tuple[bytes, bytes]], started: float) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(_RATE_LIMITED_BODY)).encode("latin-1")),
+                *extra_headers,
+                (b"x-process-time", str(time.perf_counter() - started).encode("latin-1")),
+            ],
+        })
+        await send({"type": "http.response.body", "body": _RATE_LIMITED_BODY})
+
+
+class BodySizeLimitMiddleware:
+    """
+    413 for request bodies over MAX_REQUEST_BODY_SIZE, or the limit of the
+    longest matching BODY_SIZE_LIMITS prefix.
+    """
+
+    def __init__(
+            self,
+            app: ASGIApp,
+            default_limit: Optional[int] = None,
+            limits: Optional[Dict[str, int]] = None,
+    ):
+        self.app = app
+        self.default_limit = default_limit or settings.MAX_REQUEST_BODY_SIZE
+        # Longest prefix first
+        self.limits = sorted((limits or BODY_SIZE_LIMITS).items(), key=lambda item: -len(item[0]))
+
+    def _limit(self, path: str) -> int:
+        for prefix, limit in self.limits:
+            if path.startswith(prefix):
+                return limit
+        return self.default_limit
+
+    @staticmethod
+    def _detail(limit: int) -> str:
+        return f"Request body exceeds the maximum allowed size of {limit // (1024 * 1024)}MB."
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        limit = self._limit(scope["path"])
+        content_length = Headers(scope=scope).get("content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > limit:
+            response = JSONResponse({"detail": self._detail(limit)}, status_code=413)
+            await response(scope, receive, send)
+            return
+
+        # Chunked bodies (or a lying Content-Length): count as they arrive
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # Raised into whatever is reading the body; FastAPI
+                    # passes its own HTTPException through form parsing
+                    raise HTTPException(status_code=413, detail=self._detail(limit))
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+class SelectiveGZipMiddleware(GZipMiddleware):
+    """GZipMiddleware for every path except the `skip_paths` prefixes."""
+
+    def __init__(
+            self,
+            app: ASGIApp,
+            minimum_size: int = 500,
+            compresslevel: int = 9,
+            skip_paths: Sequence[str] = GZIP_SKIP_PATHS,
+    ):
+        super().__init__(app, minimum_size=minimum_size, compresslevel=compresslevel)
+        self.skip_paths = tuple(skip_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and scope["path"].startswith(self.skip_paths):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
@@ -0,0 +1,125 @@
+"""
+Keyset (cursor) pagination helpers shared by the list endpoints.
+
+Offset pagination makes Postgres walk and discard every skipped row, so deep
+pages get slower the further a client scrolls. Keyset pagination instead
+filters on the last row already seen - `(created_at, id) < (:created_at, :id)`
+- which the planner can answer from an index at the same cost for every page.
+
+The cursor handed to clients is opaque: urlsafe base64 of a small JSON payload
+holding the last row's created_at and id.
+"""
+import base64
+import binascii
+import json
+import uuid
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+
+def encode_cursor(created_at: datetime, row_id: Any) -> str:
+    """Build an opaque cursor pointing just past the given row."""
+    payload = {"c": created_at.isoformat(), "i": str(row_id)}
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, model) -> Tuple[datetime, Any]:
+    """
+    Decode a cursor produced by encode_cursor back into (created_at, id).
+
+    The id is converted back to the python type of `model.id` (int for
+    BaseModel tables, uuid.UUID for courses) so it binds correctly.
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        created_at = datetime.fromisoformat(payload["c"])
+        id_type = model.id.type.python_type
+        row_id = uuid.UUID(payload["i"]) if id_type is uuid.UUID else id_type(payload["i"])
+    except (binascii.Error, ValueError, KeyError, TypeError, UnicodeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor",
+        )
+    return created_at, row_id
+
+
+def order_newest_first(query: Select, model) -> Select:
+    """Stable newest-first ordering; id breaks ties between equal timestamps."""
+    return query.order_by(model.created_at.desc(), model.id.desc())
+
+
+def _selects_entity(query: Select) -> bool:
+    """True for `select(Model)`, False for a select of individual columns."""
+    columns = query.column_descriptions
+    return len(columns) == 1 and columns[0]["expr"] is columns[0]["entity"]
+
+
+async def paginate(
+        db: AsyncSession,
+        query: Select,
+        model,
+        skip: int,
+        limit: int,
+        cursor: Optional[str] = None,
+        ordered: bool = False,
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Fetch one page of `query` and the cursor for the page after it.
+
+    - Without a cursor this is plain offset pagination (skip/limit), kept for
+      existing clients.
+    - With a cursor, `skip` is ignored and rows older than the cursor are
+      returned, so every page costs the same.
+
+    One extra row is fetched to know whether another page exists; next_cursor
+    is None on the last page.
+
+    Rows are ORM entities for `select(model)`, or plain dicts for column
+    selects (see core/cards.py); those must include created_at and id.
+
+    Args:
+        query: Filtered select of `model`, without ordering/offset/limit
+        ordered: True when the caller already applied its own ordering (e.g.
+            merch discount sort). Such queries only support offset pagination.
+    """
+    if cursor is not None:
+        if ordered:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cursor pagination is only available for newest-first listings",
+            )
+        created_at, row_id = decode_cursor(cursor, model)
+        query = query.where(tuple_(model.created_at, model.id) < tuple_(created_at, row_id))
+    else:
+        query = query.offset(skip)
+
+    if not ordered:
+        query = order_newest_first(query, model)
+
+    result = await db.execute(query.limit(limit + 1))
+    if _selects_entity(query):
+        rows = list(result.scalars().all())
+    else:
+        rows = [dict(row._mapping) for row in result]
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        if not ordered:
+            if isinstance(last, dict):
+                next_cursor = encode_cursor(last["created_at"], last["id"])
+            else:
+                next_cursor = encode_cursor(last.created_at, last.id)
+
+    return rows, next_cursor
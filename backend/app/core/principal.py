@@ -0,0 +1,98 @@
+"""
+Cached authentication principal
+
+Most authenticated endpoints (cart, favorites, follows...) only need to know
+who the caller is and what they may do, yet loading the full User row costs a
+query - plus a second one for the user's courses - on every request. The
+Principal holds just the fields auth and permission checks read, and is
+cached in Redis for a short TTL keyed by user id.
+
+Anything that changes a user's role/active/superuser flags or deletes the user
+must call principal_cache.invalidate(user_id) after committing; the TTL only
+bounds staleness if that is missed.
+"""
+import json
+import logging
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.redis import get_redis
+from app.models.user import User, UserRole
+
+logger = logging.getLogger(__name__)
+
+PRINCIPAL_CACHE_PREFIX = "principal:"
+PRINCIPAL_CACHE_TTL = 60  # seconds
+
+
+@dataclass(frozen=True)
+class Principal:
+    """
+    The authenticated caller, as far as permissions are concerned.
+
+    Duck-types the User attributes used by has_permission()/check_permissions(),
+    so it can be passed to them directly.
+    """
+    id: int
+    role: UserRole
+    is_active: bool
+    is_superuser: bool
+
+
+class PrincipalCache:
+    """Redis cache of Principals; fails open to the database."""
+
+    def _key(self, user_id: int) -> str:
+        return f"{PRINCIPAL_CACHE_PREFIX}{user_id}"
+
+    async def get(self, db: AsyncSession, user_id: int) -> Optional[Principal]:
+        """
+        Return the principal for `user_id`, or None if the user doesn't exist.
+        """
+        try:
+            cached = await get_redis().get(self._key(user_id))
+        except Exception as e:
+            logger.warning(f"Principal cache read failed: {e}")
+            cached = None
+        if cached is not None:
+            data = json.loads(cached)
+            return Principal(
+                id=data["id"],
+                role=UserRole(data["role"]),
+                is_active=data["is_active"],
+                is_superuser=data["is_superuser"],
+            )
+
+        result = await db.execute(
+            select(User.id, User.role, User.is_active, User.is_superuser).where(User.id == user_id)
+        )
+        row = result.one_or_none()
+        if row is None:
+            return None
+
+        principal = Principal(
+            id=row.id,
+            role=row.role,
+            is_active=bool(row.is_active),
+            is_superuser=bool(row.is_superuser),
+        )
+        data = asdict(principal)
+        data["role"] = principal.role.value
+        try:
+            await get_redis().set(self._key(user_id), json.dumps(data), ex=PRINCIPAL_CACHE_TTL)
+        except Exception as e:
+            logger.warning(f"Principal cache write failed: {e}")
+        return principal
+
+    async def invalidate(self, user_id: int) -> None:
+        """Call after committing a change to a user's role/status or deleting them."""
+        try:
+            await get_redis().delete(self._key(user_id))
+        except Exception as e:
+            logger.warning(f"Principal cache invalidation failed: {e}")
+
+
+principal_cache = PrincipalCache()
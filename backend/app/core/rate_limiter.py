@@ -1,31 +1,408 @@
+"""
+Sliding-window rate limiter
+
+Every request is checked against several windows at once (per minute and per
+hour by default) in a single Lua script, so a check is one Redis round-trip
+and either every window is charged or none is.
+
+Each window is a sliding-window counter: a hash holding the count of the
+current fixed bucket and of the previous one. The previous bucket's count is
+weighted by how much of it still overlaps the sliding window, which removes
+the 2x burst a fixed window allows across its edge while storing two numbers
+per window instead of a log of timestamps.
+
+Limits are tracked per identity - the authenticated user id when the request
+carries a valid bearer token, otherwise the client IP - and routes listed in
+ROUTE_RATE_LIMITS get their own, stricter counters on top of the global ones.
+
+Each worker also keeps the last verdict per identity in a small LRU
+(LocalRateLimiter), so most requests never reach Redis:
+
+    - an identity Redis has rejected is rejected locally until its
+      Retry-After runs out, so a scraper hammering a blocked IP costs no I/O
+    - an identity well under its limit is admitted locally; those hits are
+      counted in memory and charged to Redis in one pipeline every
+      RATE_LIMIT_SYNC_INTERVAL seconds
+    - only identities within RATE_LIMIT_LOCAL_HEADROOM of a limit, or whose
+      verdict is older than two sync intervals, are checked against Redis
+
+Local admissions are not yet visible to other workers, so a client can
+overshoot a limit by at most its headroom per worker per sync interval.
+
+Uses the shared client from core/redis.py, built from REDIS_URL: that is the
+setting configured with the right hostname and password in every environment
+(the REDIS_HOST/REDIS_PORT settings are unused defaults).
+"""
+import asyncio
+import logging
+import math
 import time
-from typing import Optional
-import redis.asyncio as aioredis  # Ensure you use the async version
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
 from app.core.config import settings
+from app.core.redis import get_redis
+from app.core.security import decode_token
+
+logger = logging.getLogger(__name__)
+
+# KEYS: one hash per window
+# ARGV: cost, force (charge even when over the limit), then (window seconds,
+# limit) per key
+# Returns: {allowed, limit, remaining, reset} of the tightest window, and the
+# longest wait any window imposes (0 when allowed)
+_SLIDING_WINDOW_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local cost = tonumber(ARGV[1])
+local force = ARGV[2] == '1'
+
+local states = {}
+local allowed = 1
+local tightest = nil
+local longest_wait = 0
+
+for i, key in ipairs(KEYS) do
+    local window = tonumber(ARGV[i * 2 + 1])
+    local limit = tonumber(ARGV[i * 2 + 2])
+    local bucket = math.floor(now / window)
+    local elapsed = now - bucket * window
+
+    local stored = redis.call('HMGET', key, 'b', 'cur', 'prev')
+    local b = tonumber(stored[1])
+    local cur = tonumber(stored[2]) or 0
+    local prev = tonumber(stored[3]) or 0
+    if b == nil or b < bucket - 1 then
+        cur, prev = 0, 0
+    elseif b == bucket - 1 then
+        cur, prev = 0, cur
+    end
+
+    local weight = 1 - elapsed / window
+    local used = prev * weight + cur
+    local remaining = math.floor(limit - used - cost)
+    local retry_after = 0
+
+    if remaining < 0 then
+        allowed = 0
+        if cur + cost <= limit and prev > 0 then
+            -- fits once enough of the previous bucket has slid out
+            retry_after = window * (1 - (limit - cur - cost) / prev) - elapsed
+        else
+            -- the current bucket alone is over; wait for it to become "previous"
+            retry_after = window - elapsed
+            if cur > 0 and cost <= limit then
+                retry_after = retry_after + window * math.max(0, 1 - (limit - cost) / cur)
+            end
+        end
+    end
+
+    states[i] = {key, bucket, cur, prev, window}
+    if tightest == nil or remaining < tightest[2] then
+        tightest = {limit, remaining, window - elapsed}
+    end
+    longest_wait = math.max(longest_wait, retry_after)
+end
+
+if allowed == 1 or force then
+    for _, s in ipairs(states) do
+        redis.call('HSET', s[1], 'b', s[2], 'cur', s[3] + cost, 'prev', s[4])
+        redis.call('EXPIRE', s[1], s[5] * 2)
+    end
+end
+
+return {allowed, tightest[1], math.max(tightest[2], 0), tostring(tightest[3]), tostring(longest_wait)}
+"""
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """
+    At most `limit` units per `window` seconds. Limits with different scopes
+    count separately, so a route's limit doesn't eat into the global one.
+    """
+    limit: int
+    window: int
+    scope: str = "global"
+
+
+@dataclass(frozen=True)
+class RateLimitResult:
+    """Outcome of a check, reported to clients as X-RateLimit-* headers."""
+    allowed: bool
+    limit: int
+    remaining: int
+    reset: int  # seconds until the tightest window's current bucket ends
+    retry_after: int  # seconds to wait before retrying; 0 when allowed
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        headers = {
+            "X-RateLimit-Limit": str(self.limit),
+            "X-RateLimit-Remaining": str(self.remaining),
+            "X-RateLimit-Reset": str(self.reset),
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(self.retry_after)
+        return headers
+
+
+def default_limits() -> Tuple[RateLimit, ...]:
+    """The global per-identity limits (RATE_LIMIT_PER_MINUTE / RATE_LIMIT_PER_HOUR)."""
+    return (
+        RateLimit(settings.RATE_LIMIT_PER_MINUTE, 60),
+        RateLimit(settings.RATE_LIMIT_PER_HOUR, 3600),
+    )
+
+
+# Path prefix -> extra limits for that route, counted separately from the
+# global ones (credential stuffing, account spam, expensive AI calls)
+ROUTE_RATE_LIMITS: Dict[str, Tuple[RateLimit, ...]] = {
+    "/api/v1/auth/login": (RateLimit(10, 60, "login"), RateLimit(50, 3600, "login")),
+    "/api/v1/auth/register": (RateLimit(5, 60, "register"), RateLimit(20, 3600, "register")),
+    "/api/v1/auth/password-reset": (RateLimit(5, 60, "password-reset"), RateLimit(20, 3600, "password-reset")),
+    "/api/v1/ai-buddy": (RateLimit(10, 60, "ai-buddy"), RateLimit(100, 3600, "ai-buddy")),
+}
+
+
+def limits_for_path(path: str) -> Tuple[RateLimit, ...]:
+    """Global limits plus those of the ROUTE_RATE_LIMITS entry covering `path`."""
+    for prefix, limits in ROUTE_RATE_LIMITS.items():
+        if path.startswith(prefix):
+            return default_limits() + limits
+    return default_limits()
+
+
+def rate_limit_identity(authorization: Optional[str], client_ip: Optional[str]) -> str:
+    """
+    Who a request is counted against: "user:<id>" for a valid bearer token
+    (so users behind one NAT don't share a budget), otherwise "ip:<address>".
+    """
+    if authorization and authorization[:7].lower() == "bearer ":
+        payload = decode_token(authorization[7:].strip())
+        if payload and payload.get("sub") is not None:
+            return f"user:{payload['sub']}"
+    return f"ip:{client_ip or 'unknown'}"
+
+
+LocalKey = Tuple[str, Tuple[RateLimit, ...]]
+
+
+@dataclass
+class _LocalState:
+    limit: int
+    remaining: int  # of the tightest window, as of the last Redis answer
+    reset_at: float  # monotonic time the tightest window's bucket ends
+    synced_at: float
+    blocked_until: float = 0.0
+    pending: int = 0  # hits admitted locally, not yet charged in Redis
+
+
+class LocalRateLimiter:
+    """
+    Per-worker LRU of the last Redis verdict for each (identity, limits).
+
+    Not thread-safe: it is only touched from the worker's event loop.
+    """
+
+    def __init__(self, max_entries: int, headroom: float, max_age: float):
+        self.max_entries = max_entries
+        self.headroom = headroom
+        self.max_age = max_age
+        self._entries: "OrderedDict[LocalKey, _LocalState]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def check(self, key: LocalKey) -> Optional[RateLimitResult]:
+        """
+        Decide a request without Redis if the last verdict allows it.
+
+        Returns:
+            The local result, or None if Redis has to be asked
+        """
+        state = self._entries.get(key)
+        if state is None:
+            return None
+        now = time.monotonic()
+        reset = max(0, math.ceil(state.reset_at - now))
+
+        if state.blocked_until > now:
+            self._entries.move_to_end(key)
+            return RateLimitResult(False, state.limit, 0, reset, math.ceil(state.blocked_until - now))
+
+        reserve = max(1, math.ceil(state.limit * self.headroom))
+        if now - state.synced_at > self.max_age or state.remaining - state.pending - 1 < reserve:
+            return None
+
+        state.pending += 1
+        self._entries.move_to_end(key)
+        return RateLimitResult(True, state.limit, state.remaining - state.pending, reset, 0)
+
+    def record(self, key: LocalKey, result: RateLimitResult) -> None:
+        """Store a verdict from Redis (pending local hits are kept)."""
+        now = time.monotonic()
+        state = self._entries.get(key)
+        if state is None:
+            state = self._entries[key] = _LocalState(result.limit, result.remaining, 0.0, now)
+        state.limit = result.limit
+        state.remaining = result.remaining
+        state.reset_at = now + result.reset
+        state.synced_at = now
+        state.blocked_until = 0.0 if result.allowed else now + result.retry_after
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            # Pending hits of an evicted entry are never charged; it's the
+            # least recently seen identity, so that's at most a few requests
+            self._entries.popitem(last=False)
+
+    def take_pending(self) -> Dict[LocalKey, int]:
+        """Hand over all locally admitted hits for charging in Redis."""
+        pending = {}
+        for key, state in self._entries.items():
+            if state.pending:
+                pending[key] = state.pending
+                state.pending = 0
+        return pending
+
+    def clear(self) -> None:
+        self._entries.clear()
+
 
 class RateLimiter:
     def __init__(self):
-        # 1. Added the missing 'prefix' attribute to fix the first error
-        self.prefix = "rl:" 
-        self.redis_client = None
-        self.redis_available = False
-        
-        # Initial check to see if Redis is up
+        self.prefix = "rl:"
+        self._script = None
+        self.sync_interval = settings.RATE_LIMIT_SYNC_INTERVAL
+        self.local = LocalRateLimiter(
+            max_entries=settings.RATE_LIMIT_LOCAL_ENTRIES,
+            headroom=settings.RATE_LIMIT_LOCAL_HEADROOM,
+            max_age=self.sync_interval * 2,
+        )
+        self._sync_task: Optional[asyncio.Task] = None
+
+    def _key(self, identifier: str, limit: RateLimit) -> str:
+        return f"{self.prefix}{identifier}:{limit.scope}:{limit.window}"
+
+    def _get_script(self):
+        if self._script is None:
+            self._script = get_redis().register_script(_SLIDING_WINDOW_SCRIPT)
+        return self._script
+
+    def _script_args(
+        self,
+        identifier: str,
+        limits: Sequence[RateLimit],
+        cost: int,
+        force: bool = False,
+    ) -> Tuple[List[str], List[int]]:
+        keys = [self._key(identifier, rl) for rl in limits]
+        args: List[int] = [cost, int(force)]
+        for rl in limits:
+            args.extend((rl.window, rl.limit))
+        return keys, args
+
+    @staticmethod
+    def _result(reply) -> RateLimitResult:
+        allowed, limit, remaining, reset, retry_after = reply
+        return RateLimitResult(
+            allowed=bool(allowed),
+            limit=int(limit),
+            remaining=int(remaining),
+            reset=math.ceil(float(reset)),
+            retry_after=math.ceil(float(retry_after)),
+        )
+
+    async def hit(
+        self,
+        identifier: str,
+        limits: Optional[Sequence[RateLimit]] = None,
+        cost: int = 1,
+    ) -> Optional[RateLimitResult]:
+        """
+        Charge `cost` units to `identifier` against all `limits` atomically.
+
+        Args:
+            identifier: Who is being limited (e.g. "user:42", "ip:1.2.3.4")
+            limits: Windows to enforce (default: the global minute/hour limits)
+            cost: Units this request consumes
+
+        Returns:
+            The result for the tightest window, or None if Redis is
+            unavailable (callers fail open)
+        """
+        keys, args = self._script_args(identifier, limits or default_limits(), cost)
+        try:
+            reply = await self._get_script()(keys=keys, args=args)
+        except Exception as e:
+            logger.warning(f"Rate limiter error: {e}")
+            return None
+        return self._result(reply)
+
+    async def check(self, identifier: str, limits: Sequence[RateLimit]) -> Optional[RateLimitResult]:
+        """
+        hit() for one request, answered from the local pre-filter when possible.
+
+        The pre-filter is only used while the sync task is running; without
+        it every check goes to Redis.
+
+        Returns:
+            The result, or None if Redis is unavailable (callers fail open)
+        """
+        if self._sync_task is None:
+            return await self.hit(identifier, limits)
+
+        key = (identifier, tuple(limits))
+        result = self.local.check(key)
+        if result is None:
+            result = await self.hit(identifier, limits)
+            if result is not None:
+                self.local.record(key, result)
+        return result
+
+    async def sync(self) -> None:
+        """Charge locally admitted hits to Redis in one pipeline and refresh their verdicts."""
+        pending = self.local.take_pending()
+        if not pending:
+            return
+        script = self._get_script()
         try:
-            # Note: We don't await in __init__, we just setup the client.
-            # Built from REDIS_URL (not REDIS_HOST/REDIS_PORT) because that's
-            # the setting actually configured with the right hostname and
-            # password in every environment (see translation.py for the same
-            # pattern) - the host/port settings are unused defaults nothing
-            # sets, which silently pointed this at the wrong Redis instance.
-            self.redis_client = aioredis.Redis.from_url(
-                settings.REDIS_URL,
-                decode_responses=True
-            )
-            self.redis_available = True
+            async with get_redis().pipeline(transaction=False) as pipe:
+                for (identifier, limits), cost in pending.items():
+                    # Already served, so charged even if that puts them over
+                    keys, args = self._script_args(identifier, limits, cost, force=True)
+                    await script(keys=keys, args=args, client=pipe)
+                replies = await pipe.execute()
         except Exception as e:
-            print(f"⚠️ Redis not available: {e}")
-            self.redis_available = False
+            logger.warning(f"Rate limiter sync failed, dropping {sum(pending.values())} local hits: {e}")
+            return
+        for key, reply in zip(pending, replies):
+            self.local.record(key, self._result(reply))
+
+    def start_sync(self) -> None:
+        """Enable the local pre-filter (call once per worker at startup)."""
+        if self._sync_task is None:
+            self._sync_task = asyncio.create_task(self._sync_loop())
+
+    async def stop_sync(self) -> None:
+        if self._sync_task is not None:
+            self._sync_task.cancel()
+            try:
+                await self._sync_task
+            except asyncio.CancelledError:
+                pass
+            self._sync_task = None
+        await self.sync()
+        self.local.clear()
+
+    async def _sync_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            try:
+                await self.sync()
+            except Exception as e:
+                logger.warning(f"Rate limiter sync error: {e}")
 
     async def check_rate_limit(
         self,
@@ -33,25 +410,8 @@ class RateLimiter:
         limit_per_minute: Optional[int] = None
     ) -> bool:
         """Checks if request is within limit. Returns True if OK."""
-        if not self.redis_available or self.redis_client is None:
-            return True # Fail open if Redis is down
-            
-        if limit_per_minute is None:
-            limit_per_minute = settings.RATE_LIMIT_PER_MINUTE
-        
-        try:
-            # 2. Fixed 'await' error: self.redis_client is now an async client
-            current_minute = int(time.time() / 60)
-            key = f"{self.prefix}{identifier}:{current_minute}"
-            
-            # Use async context/calls
-            count = await self.redis_client.incr(key)
-            
-            if count == 1:
-                await self.redis_client.expire(key, 60)
-            
-            return count <= limit_per_minute
-        
-        except Exception as e:
-            print(f"Rate limiter error: {e}")
-            return True
\ No newline at end of file
+        limits = None
+        if limit_per_minute is not None:
+            limits = (RateLimit(limit_per_minute, 60), RateLimit(settings.RATE_LIMIT_PER_HOUR, 3600))
+        result = await self.hit(identifier, limits)
+        return result is None or result.allowed
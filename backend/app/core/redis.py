@@ -0,0 +1,47 @@
+"""
+Shared async Redis client
+
+Built from REDIS_URL (see rate_limiter.py for why not REDIS_HOST/REDIS_PORT).
+The client is created lazily and reused by every caller in the worker, so
+all caching layers share one connection pool instead of each opening its own.
+"""
+from typing import Optional
+
+import redis
+import redis.asyncio as aioredis
+
+from app.core.config import settings
+
+_redis_client: Optional[aioredis.Redis] = None
+_sync_redis_client: Optional[redis.Redis] = None
+
+
+def get_redis() -> aioredis.Redis:
+    """
+    Return the process-wide async Redis client.
+
+    Responses are raw bytes (decode_responses=False) so cached payloads can be
+    written straight to the socket; callers decode small values themselves.
+    Short timeouts keep a Redis outage from stalling requests - every caller
+    treats Redis errors as a cache miss and falls back to Postgres.
+    """
+    global _redis_client
+    if _redis_client is None:
+        _redis_client = aioredis.Redis.from_url(
+            settings.REDIS_URL,
+            socket_connect_timeout=1,
+            socket_timeout=1,
+        )
+    return _redis_client
+
+
+def get_sync_redis() -> redis.Redis:
+    """Blocking counterpart of get_redis() for Celery tasks."""
+    global _sync_redis_client
+    if _sync_redis_client is None:
+        _sync_redis_client = redis.Redis.from_url(
+            settings.REDIS_URL,
+            socket_connect_timeout=5,
+            socket_timeout=5,
+        )
+    return _sync_redis_client
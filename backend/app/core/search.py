@@ -0,0 +1,74 @@
+"""
+Postgres full-text search helpers
+
+Searchable tables (news, courses, job_vacancies, education, merches) carry a
+stored generated `search_vector` tsvector column with a GIN index, so a search
+is an index lookup instead of `ILIKE '%term%'` scanning every row.
+
+Content is a mix of Uzbek (Latin and Cyrillic), Russian and English, so no
+language-specific stemmer fits; the `simple_unaccent` configuration (created
+by migration) lowercases and strips diacritics (o‘/oʻ, ё...) without stemming.
+Queries go through websearch_to_tsquery, so user input never needs escaping
+and supports "quoted phrases", OR and -exclusions.
+"""
+from typing import Sequence, Tuple
+
+from sqlalchemy import Column, Computed, func, literal_column
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred
+from sqlalchemy.sql import Select
+
+SEARCH_CONFIG = "simple_unaccent"
+
+
+def search_vector_expression(weighted_columns: Sequence[Tuple[str, str]]) -> str:
+    """
+    SQL for a weighted tsvector over text columns.
+
+    Args:
+        weighted_columns: (column name, weight "A"-"D") pairs, most relevant first
+
+    The same string is used by the model's Computed() and the migration that
+    adds the column.
+    """
+    parts = [
+        f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce({name}, '')), '{weight}')"
+        for name, weight in weighted_columns
+    ]
+    return " || ".join(parts)
+
+
+def search_vector_column(*weighted_columns: Tuple[str, str]):
+    """
+    Declare a model's generated `search_vector` column.
+
+    Deferred, so loading the entity doesn't drag the (large) vector along.
+    """
+    return deferred(Column(
+        TSVECTOR,
+        Computed(search_vector_expression(weighted_columns), persisted=True),
+    ))
+
+
+def to_tsquery(text: str):
+    """Parse user input into a tsquery (config inlined as a regconfig constant)."""
+    return func.websearch_to_tsquery(literal_column(f"'{SEARCH_CONFIG}'::regconfig"), text)
+
+
+def search_rank(model, text: str):
+    """Relevance of `model`'s row for `text` (higher is better)."""
+    return func.ts_rank(model.search_vector, to_tsquery(text))
+
+
+def apply_search(query: Select, model, text: str) -> Select:
+    """
+    Restrict `query` to rows matching `text`, most relevant first.
+
+    The result has its own ordering, so paginate it with ordered=True.
+    """
+    tsquery = to_tsquery(text)
+    return query.where(model.search_vector.op("@@")(tsquery)).order_by(
+        func.ts_rank(model.search_vector, tsquery).desc(),
+        model.created_at.desc(),
+        model.id.desc(),
+    )
@@ -11,6 +11,7 @@ from app.core.password import pwd_context
 from app.db.session import get_db
 from app.models.user import User
 from app.services.user_service import UserService
+from app.core.principal import Principal, principal_cache
 
 # OAuth2 scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
@@ -56,16 +57,17 @@ def decode_token(token: str) -> Optional[dict]:
         return None
 
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: AsyncSession = Depends(get_db)
-) -> User:
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    
+
+
+def _user_id_from_token(token: str) -> int:
+    credentials_exception = _credentials_exception()
+
     payload = decode_token(token)
     if payload is None:
         raise credentials_exception
@@ -75,20 +77,43 @@ async def get_current_user(
         raise credentials_exception
 
     try:
-        user_id_int = int(sub)
+        return int(sub)
     except (TypeError, ValueError):
         # Invalid token subject type
         raise credentials_exception
 
+
+async def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db)
+) -> User:
+    user_id_int = _user_id_from_token(token)
+
     user_service = UserService(db)
     user = await user_service.get_user_by_id(user_id_int)
     
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
     
     return user
 
 
+async def get_current_principal(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db)
+) -> Principal:
+    """
+    Lightweight alternative to get_current_user for endpoints that only need
+    the caller's id/role/flags; served from the principal cache.
+    """
+    principal = await principal_cache.get(db, _user_id_from_token(token))
+
+    if principal is None:
+        raise _credentials_exception()
+
+    return principal
+
+
 async def get_current_active_user(
     current_user: User = Depends(get_current_user)
 ) -> User:
@@ -100,6 +125,17 @@ async def get_current_active_user(
     return current_user
 
 
+async def get_current_active_principal(
+    current_principal: Principal = Depends(get_current_principal)
+) -> Principal:
+    if not current_principal.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Inactive user"
+        )
+    return current_principal
+
+
 async def get_current_superuser(
     current_user: User = Depends(get_current_active_user)
 ) -> User:
@@ -0,0 +1,158 @@
+"""
+Typeahead suggestions backed by pg_trgm
+
+Name lookups (athletes, merch names and brands) are short and often
+misspelled, which neither ILIKE nor full-text search handles well. The
+suggested columns carry trigram GIN indexes, and a lookup is
+
+    col %> :q          -- word similarity above the threshold (typo tolerant)
+    OR col ILIKE :q%   -- plain prefix, for the first few keystrokes
+
+ranked prefix matches first, then by similarity.
+
+Most typeahead traffic is the same few prefixes, so queries are counted in
+an hourly Redis sorted set (the "prefix table") and only those seen at least
+SUGGEST_HOT_MIN_HITS times in the current hour have their results cached.
+Suggestions are not invalidated on writes; SUGGEST_CACHE_TTL bounds staleness.
+"""
+import json
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy import case, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.redis import get_redis
+from app.models.merch import Merch
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+SUGGEST_CACHE_PREFIX = "suggest:"
+SUGGEST_CACHE_TTL = 120  # seconds
+SUGGEST_HOT_MIN_HITS = 3  # per hour before a query's results are cached
+SUGGEST_HOT_SIZE = 1000  # queries tracked per resource and hour
+SUGGEST_HOT_WINDOW = 3600  # seconds
+# pg_trgm word similarity needed to count as a match (extension default 0.6
+# is too strict for typos in short names)
+SUGGEST_SIMILARITY_THRESHOLD = 0.3
+
+
+@dataclass(frozen=True)
+class SuggestSource:
+    """How to suggest one resource: what to match on and what to return."""
+    model: type
+    label: Any
+    detail: Any
+    image_url: Any
+    match_columns: Tuple[Any, ...]
+    filters: Tuple[Any, ...] = ()
+
+
+SUGGEST_SOURCES: Dict[str, SuggestSource] = {
+    "users": SuggestSource(
+        model=User,
+        label=User.full_name,
+        detail=User.sport_type,
+        image_url=User.avatar_url,
+        match_columns=(User.full_name, User.email),
+        filters=(User.is_active == True,),
+    ),
+    "merches": SuggestSource(
+        model=Merch,
+        label=Merch.name,
+        detail=Merch.brand,
+        image_url=Merch.image_url,
+        match_columns=(Merch.name, Merch.brand),
+    ),
+}
+
+
+def normalize_query(text: str) -> str:
+    """Case and whitespace don't change the matches, so they don't split the cache."""
+    return " ".join(text.lower().split())
+
+
+class Suggester:
+    """Trigram-ranked suggestions with a Redis cache for frequent prefixes."""
+
+    def _result_key(self, resource: str, limit: int, text: str) -> str:
+        return f"{SUGGEST_CACHE_PREFIX}{resource}:{limit}:{text}"
+
+    def _hits_key(self, resource: str) -> str:
+        return f"{SUGGEST_CACHE_PREFIX}{resource}:hits:{int(time.time()) // SUGGEST_HOT_WINDOW}"
+
+    async def suggest(self, db: AsyncSession, resource: str, text: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Top `limit` matches for `text` in `resource` (a SUGGEST_SOURCES key).
+
+        Returns:
+            Dicts with id, label, detail, image_url and score
+        """
+        text = normalize_query(text)
+        if not text:
+            return []
+
+        key = self._result_key(resource, limit, text)
+        try:
+            cached = await get_redis().get(key)
+        except Exception as e:
+            logger.warning(f"Suggestion cache read failed: {e}")
+            cached = None
+        if cached is not None:
+            return json.loads(cached)
+
+        items = await self._query(db, SUGGEST_SOURCES[resource], text, limit)
+
+        try:
+            await self._remember(resource, key, text, items)
+        except Exception as e:
+            logger.warning(f"Suggestion cache write failed: {e}")
+        return items
+
+    async def _query(self, db: AsyncSession, source: SuggestSource, text: str, limit: int) -> List[Dict[str, Any]]:
+        # Threshold for the %> operator, scoped to this transaction
+        await db.execute(
+            select(func.set_config("pg_trgm.word_similarity_threshold", str(SUGGEST_SIMILARITY_THRESHOLD), True))
+        )
+
+        similar = [column.op("%>")(text) for column in source.match_columns]
+        prefixed = [column.istartswith(text, autoescape=True) for column in source.match_columns]
+        score = func.greatest(*[func.word_similarity(text, column) for column in source.match_columns])
+        is_prefix = case((or_(*prefixed), 1), else_=0)
+
+        query = (
+            select(
+                source.model.id.label("id"),
+                source.label.label("label"),
+                source.detail.label("detail"),
+                source.image_url.label("image_url"),
+                score.label("score"),
+            )
+            .where(or_(*similar, *prefixed), *source.filters)
+            .order_by(is_prefix.desc(), score.desc(), source.label)
+            .limit(limit)
+        )
+        result = await db.execute(query)
+        return [
+            {**row._mapping, "score": round(float(row.score), 4)}
+            for row in result
+        ]
+
+    async def _remember(self, resource: str, key: str, text: str, items: List[Dict[str, Any]]) -> None:
+        """Count the query and cache its results once it is frequent enough."""
+        hits_key = self._hits_key(resource)
+        async with get_redis().pipeline(transaction=False) as pipe:
+            pipe.zincrby(hits_key, 1, text)
+            pipe.expire(hits_key, SUGGEST_HOT_WINDOW * 2)
+            # Keep only the most frequent queries of the hour
+            pipe.zremrangebyrank(hits_key, 0, -(SUGGEST_HOT_SIZE + 1))
+            hits, _, _ = await pipe.execute()
+
+        if hits >= SUGGEST_HOT_MIN_HITS:
+            await get_redis().set(key, json.dumps(items), ex=SUGGEST_CACHE_TTL)
+
+
+suggester = Suggester()
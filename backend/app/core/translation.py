@@ -1,14 +1,37 @@
 """
 Translation Service for automatic multilingual support
 Supports Uzbek (default), English, and Russian
+
+Translating a page of items is done in one pass: every translatable string
+is collected and deduplicated, cached translations are fetched with a single
+MGET, the misses go to the translation backend in batches - in worker
+threads, since the backends are blocking HTTP clients - and the new
+translations are written back in one pipeline.
+
+Translations live in two tiers, keyed by a stable digest of the languages
+and normalized source text: Redis (24h TTL, may be evicted under the LRU
+memory policy) and the `translations` table, which is only consulted on a
+Redis miss and refills Redis, so an eviction never costs a backend call.
+Celery tasks use translations_sync(), a blocking lookup through the same
+two tiers.
 """
-from typing import Dict, Optional
-from functools import lru_cache
 import asyncio
-from deep_translator import GoogleTranslator
+import hashlib
+import logging
+import unicodedata
+from typing import Dict, List, Optional, Sequence
+
 import redis.asyncio as aioredis
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
 
 from app.core.config import settings
+from app.core.redis import get_sync_redis
+from app.core.translation_backends import TranslationBackend, get_backend
+from app.db.session import AsyncSessionLocal, SyncSessionLocal
+from app.models.translation import Translation
+
+logger = logging.getLogger(__name__)
 
 
 class TranslationService:
@@ -16,20 +39,31 @@ class TranslationService:
     Service for translating text between languages
     Uses caching to improve performance
     """
-    
+
     SUPPORTED_LANGUAGES = {
         'uz': 'uzbek',
         'en': 'english',
         'ru': 'russian'
     }
-    
+
     DEFAULT_LANGUAGE = 'uz'
-    
-    def __init__(self):
+
+    DEFAULT_FIELDS = ['title', 'description', 'content', 'name']
+
+    def __init__(self, backend: Optional[TranslationBackend] = None, persist: bool = True):
+        """
+        Args:
+            backend: Translation backend (default: the TRANSLATION_SERVICE one)
+            persist: Use the `translations` table as a second cache tier
+        """
         self.redis_client = None
         self.cache_prefix = "translation:"
         self.cache_ttl = 86400  # 24 hours
-    
+        self.backend = backend or get_backend()
+        self.persist = persist
+        self.batch_size = settings.TRANSLATION_BATCH_SIZE
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
     async def _get_redis(self):
         """Get Redis client for caching"""
         if self.redis_client is None:
@@ -39,42 +73,261 @@ class TranslationService:
                 decode_responses=True
             )
         return self.redis_client
-    
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """Caps concurrent backend calls (created lazily, inside the running loop)"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(settings.TRANSLATION_MAX_CONCURRENCY)
+        return self._semaphore
+
+    @staticmethod
+    def _digest(text: str, source_lang: str, target_lang: str) -> str:
+        """
+        Stable key for a translation, the same in every worker and across
+        restarts (unlike the builtin hash(), which is randomized per process)
+        """
+        normalized = unicodedata.normalize("NFC", text).strip()
+        payload = f"{source_lang}:{target_lang}:{normalized}".encode("utf-8")
+        return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
     def _get_cache_key(self, text: str, source_lang: str, target_lang: str) -> str:
         """Generate cache key for translation"""
-        return f"{self.cache_prefix}{source_lang}:{target_lang}:{hash(text)}"
-    
-    async def _get_cached_translation(
+        return f"{self.cache_prefix}{source_lang}:{target_lang}:{self._digest(text, source_lang, target_lang)}"
+
+    async def _get_cached_translations(
         self,
-        text: str,
+        texts: Sequence[str],
         source_lang: str,
         target_lang: str
-    ) -> Optional[str]:
-        """Get translation from cache"""
+    ) -> Dict[str, str]:
+        """Get the cached translations of `texts` with one MGET"""
         try:
             redis = await self._get_redis()
-            cache_key = self._get_cache_key(text, source_lang, target_lang)
-            cached = await redis.get(cache_key)
-            return cached
+            keys = [self._get_cache_key(text, source_lang, target_lang) for text in texts]
+            cached = await redis.mget(keys)
         except Exception as e:
-            print(f"Cache get error: {e}")
-            return None
-    
-    async def _cache_translation(
+            logger.warning(f"Translation cache read failed: {e}")
+            return {}
+        return {text: value for text, value in zip(texts, cached) if value is not None}
+
+    async def _cache_translations(
         self,
-        text: str,
+        translations: Dict[str, str],
         source_lang: str,
-        target_lang: str,
-        translation: str
+        target_lang: str
     ):
-        """Cache translation"""
+        """Write new translations back in one pipeline"""
+        if not translations:
+            return
         try:
             redis = await self._get_redis()
-            cache_key = self._get_cache_key(text, source_lang, target_lang)
-            await redis.setex(cache_key, self.cache_ttl, translation)
+            async with redis.pipeline(transaction=False) as pipe:
+                for text, translation in translations.items():
+                    pipe.setex(self._get_cache_key(text, source_lang, target_lang), self.cache_ttl, translation)
+                await pipe.execute()
         except Exception as e:
-            print(f"Cache set error: {e}")
-    
+            logger.warning(f"Translation cache write failed: {e}")
+
+    async def _get_stored_translations(
+        self,
+        texts: Sequence[str],
+        source_lang: str,
+        target_lang: str
+    ) -> Dict[str, str]:
+        """Look up `texts` in the translations table"""
+        if not self.persist:
+            return {}
+        digests = {self._digest(text, source_lang, target_lang): text for text in texts}
+        try:
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    select(Translation.text_hash, Translation.translated_text)
+                    .where(Translation.text_hash.in_(digests.keys()))
+                )
+                rows = result.all()
+        except Exception as e:
+            logger.warning(f"Translation store read failed: {e}")
+            return {}
+        return {digests[row.text_hash]: row.translated_text for row in rows}
+
+    async def _store_translations(
+        self,
+        translations: Dict[str, str],
+        source_lang: str,
+        target_lang: str
+    ):
+        """Persist new translations (concurrent duplicates are ignored)"""
+        if not translations or not self.persist:
+            return
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(self._store_statement(translations, source_lang, target_lang))
+                await db.commit()
+        except Exception as e:
+            logger.warning(f"Translation store write failed: {e}")
+
+    def _store_statement(self, translations: Dict[str, str], source_lang: str, target_lang: str):
+        rows = [
+            {
+                "text_hash": self._digest(text, source_lang, target_lang),
+                "source_lang": source_lang,
+                "target_lang": target_lang,
+                "source_text": text,
+                "translated_text": translation,
+            }
+            for text, translation in translations.items()
+        ]
+        return insert(Translation).values(rows).on_conflict_do_nothing(index_elements=["text_hash"])
+
+    async def _translate_batch(self, texts: List[str], source_lang: str, target_lang: str) -> Dict[str, str]:
+        """Send one batch to the backend in a worker thread; empty on failure"""
+        async with self._get_semaphore():
+            try:
+                translations = await asyncio.to_thread(
+                    self.backend.translate_batch,
+                    texts,
+                    source_lang,
+                    target_lang,
+                )
+            except Exception as e:
+                logger.warning(f"Translation error ({self.backend.name}): {e}")
+                return {}
+        # A None/empty result means the backend had nothing for that text
+        return {text: translation for text, translation in zip(texts, translations) if translation}
+
+    async def translate_many(
+        self,
+        texts: Sequence[str],
+        target_lang: str,
+        source_lang: str = DEFAULT_LANGUAGE
+    ) -> List[str]:
+        """
+        Translate several texts at once
+
+        Args:
+            texts: Texts to translate (duplicates are translated once)
+            target_lang: Target language code (uz, en, ru)
+            source_lang: Source language code (default: uz)
+
+        Returns:
+            Translations in the same order as `texts`; a text that couldn't
+            be translated is returned unchanged
+        """
+        # Validate languages
+        if source_lang not in self.SUPPORTED_LANGUAGES:
+            source_lang = self.DEFAULT_LANGUAGE
+
+        if source_lang == target_lang or target_lang not in self.SUPPORTED_LANGUAGES:
+            return list(texts)
+
+        unique = list(dict.fromkeys(text for text in texts if text and text.strip()))
+        if not unique:
+            return list(texts)
+
+        translations = await self._get_cached_translations(unique, source_lang, target_lang)
+
+        misses = [text for text in unique if text not in translations]
+        if misses:
+            stored = await self._get_stored_translations(misses, source_lang, target_lang)
+            misses = [text for text in misses if text not in stored]
+
+            fresh = {}
+            if misses:
+                batches = [misses[i:i + self.batch_size] for i in range(0, len(misses), self.batch_size)]
+                results = await asyncio.gather(
+                    *(self._translate_batch(batch, source_lang, target_lang) for batch in batches)
+                )
+                for result in results:
+                    fresh.update(result)
+                await self._store_translations(fresh, source_lang, target_lang)
+
+            await self._cache_translations({**stored, **fresh}, source_lang, target_lang)
+            translations.update(stored)
+            translations.update(fresh)
+
+        return [translations.get(text, text) for text in texts]
+
+    def _get_cached_translations_sync(self, texts: Sequence[str], source_lang: str, target_lang: str) -> Dict[str, str]:
+        try:
+            cached = get_sync_redis().mget([self._get_cache_key(text, source_lang, target_lang) for text in texts])
+        except Exception as e:
+            logger.warning(f"Translation cache read failed: {e}")
+            return {}
+        return {text: value.decode("utf-8") for text, value in zip(texts, cached) if value is not None}
+
+    def _cache_translations_sync(self, translations: Dict[str, str], source_lang: str, target_lang: str):
+        if not translations:
+            return
+        try:
+            with get_sync_redis().pipeline(transaction=False) as pipe:
+                for text, translation in translations.items():
+                    pipe.setex(self._get_cache_key(text, source_lang, target_lang), self.cache_ttl, translation)
+                pipe.execute()
+        except Exception as e:
+            logger.warning(f"Translation cache write failed: {e}")
+
+    def _get_stored_translations_sync(self, texts: Sequence[str], source_lang: str, target_lang: str) -> Dict[str, str]:
+        if not self.persist:
+            return {}
+        digests = {self._digest(text, source_lang, target_lang): text for text in texts}
+        with SyncSessionLocal() as db:
+            rows = db.execute(
+                select(Translation.text_hash, Translation.translated_text)
+                .where(Translation.text_hash.in_(digests.keys()))
+            ).all()
+        return {digests[row.text_hash]: row.translated_text for row in rows}
+
+    def _store_translations_sync(self, translations: Dict[str, str], source_lang: str, target_lang: str):
+        if not translations or not self.persist:
+            return
+        with SyncSessionLocal() as db:
+            db.execute(self._store_statement(translations, source_lang, target_lang))
+            db.commit()
+
+    def translations_sync(
+        self,
+        texts: Sequence[str],
+        target_lang: str,
+        source_lang: str = DEFAULT_LANGUAGE
+    ) -> Dict[str, str]:
+        """
+        Blocking counterpart of translate_many() for Celery tasks, through
+        the same Redis and `translations` tiers. New translations are kept
+        after each backend batch, so a retry after a failed batch only
+        sends what is still missing.
+
+        Returns:
+            Text -> translation; texts the backend had nothing for are left
+            out. Backend and database errors are raised (the task retries).
+        """
+        if source_lang not in self.SUPPORTED_LANGUAGES:
+            source_lang = self.DEFAULT_LANGUAGE
+        if source_lang == target_lang or target_lang not in self.SUPPORTED_LANGUAGES:
+            return {}
+
+        unique = list(dict.fromkeys(text for text in texts if text and text.strip()))
+        if not unique:
+            return {}
+
+        translations = self._get_cached_translations_sync(unique, source_lang, target_lang)
+
+        misses = [text for text in unique if text not in translations]
+        if misses:
+            stored = self._get_stored_translations_sync(misses, source_lang, target_lang)
+            self._cache_translations_sync(stored, source_lang, target_lang)
+            translations.update(stored)
+            misses = [text for text in misses if text not in stored]
+
+        for start in range(0, len(misses), self.batch_size):
+            batch = misses[start:start + self.batch_size]
+            results = self.backend.translate_batch(batch, source_lang, target_lang)
+            fresh = {text: translation for text, translation in zip(batch, results) if translation}
+            self._store_translations_sync(fresh, source_lang, target_lang)
+            self._cache_translations_sync(fresh, source_lang, target_lang)
+            translations.update(fresh)
+
+        return translations
+
     async def translate(
         self,
         text: str,
@@ -83,53 +336,17 @@ class TranslationService:
     ) -> str:
         """
         Translate text from source language to target language
-        
+
         Args:
             text: Text to translate
             target_lang: Target language code (uz, en, ru)
             source_lang: Source language code (default: uz)
-        
+
         Returns:
             Translated text
         """
-        # Skip if same language
-        if source_lang == target_lang:
-            return text
-        
-        # Validate languages
-        if source_lang not in self.SUPPORTED_LANGUAGES:
-            source_lang = self.DEFAULT_LANGUAGE
-        
-        if target_lang not in self.SUPPORTED_LANGUAGES:
-            return text
-        
-        # Check cache first
-        cached = await self._get_cached_translation(text, source_lang, target_lang)
-        if cached:
-            return cached
-        
-        # Perform translation
-        try:
-            # Use Google Translator as default
-            if settings.TRANSLATION_SERVICE == "google":
-                translator = GoogleTranslator(
-                    source=self.SUPPORTED_LANGUAGES[source_lang],
-                    target=self.SUPPORTED_LANGUAGES[target_lang]
-                )
-                translation = translator.translate(text)
-            else:
-                # Fallback to original text if service not available
-                translation = text
-            
-            # Cache the translation
-            await self._cache_translation(text, source_lang, target_lang, translation)
-            
-            return translation
-        
-        except Exception as e:
-            print(f"Translation error: {e}")
-            return text  # Return original text on error
-    
+        return (await self.translate_many([text], target_lang, source_lang))[0]
+
     async def translate_dict(
         self,
         data: Dict,
@@ -139,32 +356,18 @@ class TranslationService:
     ) -> Dict:
         """
         Translate specific fields in a dictionary
-        
+
         Args:
             data: Dictionary with text fields
             target_lang: Target language code
             source_lang: Source language code
             fields_to_translate: List of field names to translate
-        
+
         Returns:
             Dictionary with translated fields
         """
-        if not fields_to_translate:
-            # Default fields to translate
-            fields_to_translate = ['title', 'description', 'content', 'name']
-        
-        translated_data = data.copy()
-        
-        for field in fields_to_translate:
-            if field in data and isinstance(data[field], str):
-                translated_data[field] = await self.translate(
-                    data[field],
-                    target_lang,
-                    source_lang
-                )
-        
-        return translated_data
-    
+        return (await self.translate_list([data], target_lang, source_lang, fields_to_translate))[0]
+
     async def translate_list(
         self,
         items: list,
@@ -174,32 +377,35 @@ class TranslationService:
     ) -> list:
         """
         Translate multiple items
-        
+
+        All fields of all items go through a single translate_many() call.
+
         Args:
             items: List of dictionaries
             target_lang: Target language code
             source_lang: Source language code
             fields_to_translate: List of field names to translate
-        
+
         Returns:
             List of dictionaries with translated fields
         """
-        translated_items = []
-        
-        for item in items:
-            if isinstance(item, dict):
-                translated_item = await self.translate_dict(
-                    item,
-                    target_lang,
-                    source_lang,
-                    fields_to_translate
-                )
-                translated_items.append(translated_item)
-            else:
-                translated_items.append(item)
-        
+        fields = fields_to_translate or self.DEFAULT_FIELDS
+
+        # (item index, field) of every string to translate, in order
+        slots = [
+            (index, field)
+            for index, item in enumerate(items) if isinstance(item, dict)
+            for field in fields if isinstance(item.get(field), str)
+        ]
+        translations = await self.translate_many(
+            [items[index][field] for index, field in slots], target_lang, source_lang
+        )
+
+        translated_items = [item.copy() if isinstance(item, dict) else item for item in items]
+        for (index, field), translation in zip(slots, translations):
+            translated_items[index][field] = translation
         return translated_items
-    
+
     @staticmethod
     def get_supported_languages() -> Dict[str, str]:
         """Get list of supported languages"""
@@ -0,0 +1,135 @@
+"""
+Translation backends
+
+TRANSLATION_SERVICE picks one by name from TRANSLATION_BACKENDS:
+
+    google          Google Translate through deep_translator (network)
+    libretranslate  Self-hosted LibreTranslate at LIBRETRANSLATE_URL (network)
+    offline         Dictionary/echo stand-in with optional simulated latency,
+                    for tests, CI and benchmarks (no network)
+    passthrough     Returns texts unchanged
+
+Backends are blocking; TranslationService always calls them from a worker
+thread. New backends register themselves with @register_backend("name").
+"""
+import logging
+import time
+from typing import Callable, Dict, List, Optional, Type
+
+import httpx
+from deep_translator import GoogleTranslator
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+TRANSLATION_BACKENDS: Dict[str, Type["TranslationBackend"]] = {}
+
+
+def register_backend(name: str) -> Callable[[Type["TranslationBackend"]], Type["TranslationBackend"]]:
+    """Class decorator adding a backend to TRANSLATION_BACKENDS under `name`."""
+    def decorator(cls: Type["TranslationBackend"]) -> Type["TranslationBackend"]:
+        cls.name = name
+        TRANSLATION_BACKENDS[name] = cls
+        return cls
+    return decorator
+
+
+class TranslationBackend:
+    """A translation provider."""
+
+    name = "base"
+
+    def translate_batch(self, texts: List[str], source_lang: str, target_lang: str) -> List[str]:
+        """
+        Translate `texts` between language codes (uz, en, ru).
+
+        Returns:
+            Translations in the same order as `texts`
+        """
+        raise NotImplementedError
+
+
+@register_backend("google")
+class GoogleBackend(TranslationBackend):
+    """Google Translate through deep_translator"""
+
+    def translate_batch(self, texts: List[str], source_lang: str, target_lang: str) -> List[str]:
+        translator = GoogleTranslator(source=source_lang, target=target_lang)
+        return translator.translate_batch(texts)
+
+
+@register_backend("libretranslate")
+class LibreTranslateBackend(TranslationBackend):
+    """LibreTranslate server; a whole batch is one HTTP request"""
+
+    def __init__(self, url: Optional[str] = None, api_key: Optional[str] = None, timeout: float = 30.0):
+        self.url = (url or settings.LIBRETRANSLATE_URL or "").rstrip("/")
+        if not self.url:
+            raise ValueError("LIBRETRANSLATE_URL is not set")
+        self.api_key = api_key or settings.LIBRETRANSLATE_API_KEY
+        self.client = httpx.Client(timeout=timeout)
+
+    def translate_batch(self, texts: List[str], source_lang: str, target_lang: str) -> List[str]:
+        body = {"q": texts, "source": source_lang, "target": target_lang, "format": "text"}
+        if self.api_key:
+            body["api_key"] = self.api_key
+        response = self.client.post(f"{self.url}/translate", json=body)
+        response.raise_for_status()
+        return response.json()["translatedText"]
+
+
+@register_backend("offline")
+class OfflineBackend(TranslationBackend):
+    """
+    Deterministic stand-in: looks texts up in `dictionary` ({target_lang:
+    {text: translation}}) and otherwise echoes them as "[en] text".
+
+    Args:
+        latency: Seconds slept per call, simulating a request round-trip
+        per_text_latency: Additional seconds slept per text in the batch
+    """
+
+    def __init__(
+            self,
+            dictionary: Optional[Dict[str, Dict[str, str]]] = None,
+            latency: Optional[float] = None,
+            per_text_latency: float = 0.0,
+    ):
+        self.dictionary = dictionary or {}
+        self.latency = settings.TRANSLATION_OFFLINE_LATENCY_MS / 1000 if latency is None else latency
+        self.per_text_latency = per_text_latency
+
+    def translate_batch(self, texts: List[str], source_lang: str, target_lang: str) -> List[str]:
+        delay = self.latency + self.per_text_latency * len(texts)
+        if delay:
+            time.sleep(delay)
+        known = self.dictionary.get(target_lang, {})
+        return [known.get(text, f"[{target_lang}] {text}") for text in texts]
+
+
+@register_backend("passthrough")
+class PassthroughBackend(TranslationBackend):
+    """Returns texts unchanged (no translation service configured)"""
+
+    def translate_batch(self, texts: List[str], source_lang: str, target_lang: str) -> List[str]:
+        return list(texts)
+
+
+def get_backend(name: Optional[str] = None) -> TranslationBackend:
+    """
+    Instantiate the backend registered as `name` (default: TRANSLATION_SERVICE).
+
+    An unknown or misconfigured backend falls back to passthrough, so a bad
+    setting degrades to untranslated text instead of failing at import.
+    """
+    name = name or settings.TRANSLATION_SERVICE
+    backend_class = TRANSLATION_BACKENDS.get(name)
+    if backend_class is None:
+        logger.warning(f"Unknown translation backend {name!r}, translations disabled")
+        return PassthroughBackend()
+    try:
+        return backend_class()
+    except Exception as e:
+        logger.warning(f"Translation backend {name!r} unavailable ({e}), translations disabled")
+        return PassthroughBackend()
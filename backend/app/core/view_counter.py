@@ -0,0 +1,173 @@
+"""
+Buffered view counters for news and course detail pages
+
+Incrementing views_count with an UPDATE + COMMIT on every page view makes
+concurrent readers of a trending article queue on its row lock. Instead each
+view is an HINCRBY on a Redis hash, and a Celery beat task
+(flush_view_counts_task) periodically writes the accumulated deltas to
+Postgres in one batched `UPDATE ... FROM (VALUES ...)` per table.
+
+Keys:
+    views:{resource}            pending deltas, field = object id
+    views:{resource}:flushing   deltas taken by the running flush
+
+A flush RENAMEs the pending hash out of the way, so new views start a fresh
+hash while it works, and only deletes the renamed hash after the UPDATE has
+committed. Until then readers count both hashes, and a failed flush is
+retried from the leftover hash on the next run.
+
+That retry must not add the deltas twice when the UPDATE did commit and only
+the DEL of the hash was lost (Redis blip, worker killed in between). Each
+flushing hash therefore carries a random flush id (field "_flush_id"), which
+is inserted into view_count_flushes in the same transaction as the UPDATE; a
+retry whose id is already there skips the UPDATE and just deletes the hash.
+"""
+import json
+import logging
+import uuid
+from datetime import timedelta
+from typing import Dict, Optional, Tuple
+
+import redis
+from sqlalchemy import Integer, column, delete, func, update, values
+from sqlalchemy.dialects.postgresql import insert
+
+from app.core.cache import CACHE_INVALIDATION_CHANNEL, response_cache
+from app.core.redis import get_redis, get_sync_redis
+from app.db.session import SyncSessionLocal
+from app.models.course import Course
+from app.models.news import News
+from app.models.view_count_flush import ViewCountFlush
+
+logger = logging.getLogger(__name__)
+
+VIEWS_PREFIX = "views:"
+FLUSH_BATCH_SIZE = 1000
+# Field of a flushing hash holding its flush id (never an object id)
+FLUSH_ID_FIELD = "_flush_id"
+# Applied flush ids are kept this long; a leftover hash is retried within minutes
+FLUSH_RECORD_RETENTION = timedelta(days=7)
+
+# resource name (shared with the response cache) -> (model, counter column name)
+COUNTED_RESOURCES: Dict[str, Tuple[type, str]] = {
+    "news": (News, "views_count"),
+    "courses": (Course, "view_count"),
+}
+
+
+class ViewCounter:
+    """Redis-buffered view counts, flushed to Postgres by a beat task."""
+
+    def _key(self, resource: str) -> str:
+        return f"{VIEWS_PREFIX}{resource}"
+
+    def _flushing_key(self, resource: str) -> str:
+        return f"{VIEWS_PREFIX}{resource}:flushing"
+
+    async def record(self, resource: str, object_id) -> Optional[int]:
+        """
+        Count one view.
+
+        Returns:
+            Views not yet written to Postgres (including this one), to be
+            added to the row's stored counter; None if Redis is unavailable,
+            in which case the caller should update the row directly.
+        """
+        field = str(object_id)
+        try:
+            async with get_redis().pipeline(transaction=False) as pipe:
+                pipe.hincrby(self._key(resource), field, 1)
+                pipe.hget(self._flushing_key(resource), field)
+                pending, flushing = await pipe.execute()
+        except Exception as e:
+            logger.warning(f"View counter unavailable: {e}")
+            return None
+        return int(pending) + int(flushing or 0)
+
+    def flush(self) -> Dict[str, int]:
+        """
+        Write all pending deltas to Postgres (blocking; runs in Celery).
+
+        Returns:
+            Number of rows updated per resource
+        """
+        client = get_sync_redis()
+        return {resource: self._flush_resource(client, resource) for resource in COUNTED_RESOURCES}
+
+    def _flush_resource(self, client: redis.Redis, resource: str) -> int:
+        key = self._key(resource)
+        flushing_key = self._flushing_key(resource)
+
+        # A leftover hash means the previous flush failed; retry it first
+        if not client.exists(flushing_key):
+            try:
+                client.rename(key, flushing_key)
+            except redis.ResponseError:
+                return 0  # nothing pending
+
+        # Kept by a retry, so a flush that did commit is recognised
+        client.hsetnx(flushing_key, FLUSH_ID_FIELD, uuid.uuid4().hex)
+        pending_deltas = client.hgetall(flushing_key)
+        flush_id = pending_deltas.pop(FLUSH_ID_FIELD.encode()).decode()
+
+        model, counter_name = COUNTED_RESOURCES[resource]
+        table = model.__table__
+        id_type = table.c.id.type
+        to_id = id_type.python_type
+
+        deltas = []
+        for object_id, delta in pending_deltas.items():
+            if int(delta):
+                deltas.append((to_id(object_id.decode()), int(delta)))
+
+        applied = 0
+        if deltas:
+            counter = table.c[counter_name]
+            with SyncSessionLocal() as session:
+                recorded = session.execute(
+                    insert(ViewCountFlush)
+                    .values(flush_id=flush_id, resource=resource)
+                    .on_conflict_do_nothing(index_elements=[ViewCountFlush.flush_id])
+                    .returning(ViewCountFlush.id)
+                ).scalar_one_or_none()
+                if recorded is None:
+                    # Applied by an earlier run that failed to delete the hash
+                    logger.warning(f"View count flush {flush_id} of {resource} was already applied")
+                else:
+                    applied = len(deltas)
+                for start in range(0, applied, FLUSH_BATCH_SIZE):
+                    pending = values(
+                        column("id", id_type), column("delta", Integer), name="pending_views"
+                    ).data(deltas[start:start + FLUSH_BATCH_SIZE])
+                    session.execute(
+                        update(table)
+                        .where(table.c.id == pending.c.id)
+                        # updated_at is left alone: a page view is not an edit
+                        .values({
+                            counter: func.coalesce(counter, 0) + pending.c.delta,
+                            table.c.updated_at: table.c.updated_at,
+                        })
+                    )
+                session.execute(
+                    delete(ViewCountFlush)
+                    .where(ViewCountFlush.created_at < func.now() - FLUSH_RECORD_RETENTION)
+                )
+                session.commit()
+
+        # Cached detail bodies still hold the old counter. Drop them together
+        # with the flushed deltas so readers never count a view twice (lists
+        # keep theirs until their TTL expires).
+        object_keys = [
+            key for object_id, _ in deltas for key in response_cache.object_keys(resource, object_id)
+        ]
+        with client.pipeline(transaction=True) as pipe:
+            pipe.delete(flushing_key)
+            for start in range(0, len(object_keys), FLUSH_BATCH_SIZE):
+                batch = object_keys[start:start + FLUSH_BATCH_SIZE]
+                pipe.delete(*batch)
+                pipe.publish(CACHE_INVALIDATION_CHANNEL, json.dumps(batch))
+            pipe.execute()
+        return applied
+
+
+view_counter = ViewCounter()
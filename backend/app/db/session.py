@@ -1,8 +1,9 @@
 """
 Database session management
 """
+from sqlalchemy import create_engine
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.orm import declarative_base
+from sqlalchemy.orm import declarative_base, sessionmaker
 from typing import AsyncGenerator
 
 from app.core.config import settings
@@ -34,6 +35,23 @@ AsyncSessionLocal = async_sessionmaker(
 # Backwards-compatible alias for code importing SessionLocal
 SessionLocal = AsyncSessionLocal
 
+# Synchronous engine (psycopg2) for Celery tasks, which run outside an event
+# loop. Nothing connects until a task first uses it.
+sync_engine = create_engine(
+    str(settings.DATABASE_URL),
+    echo=settings.DB_ECHO,
+    pool_pre_ping=True,
+    pool_size=2,
+    max_overflow=2
+)
+
+SyncSessionLocal = sessionmaker(
+    sync_engine,
+    expire_on_commit=False,
+    autocommit=False,
+    autoflush=False
+)
+
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """
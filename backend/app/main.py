@@ -1,7 +1,6 @@
 from dotenv import load_dotenv
 from fastapi import FastAPI, Request, Depends, HTTPException, status, Form
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.openapi.docs import get_swagger_ui_html
 from fastapi.responses import JSONResponse, HTMLResponse, RedirectResponse
 from fastapi.exceptions import RequestValidationError, ResponseValidationError
@@ -12,9 +11,10 @@ from fastapi.openapi.utils import get_openapi
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, text
 
+import asyncio
 import time
 import json
-from typing import Callable
+from typing import Optional
 import logging
 import traceback
 from datetime import datetime
@@ -22,12 +22,15 @@ from enum import Enum as _Enum
 
 
 from app.core.config import settings
+from app.core.http_cache import PrecompressedPayload
+from app.core.media import MediaFiles
+from app.core.middleware import BodySizeLimitMiddleware, RequestContextMiddleware, SelectiveGZipMiddleware
 from app.core.rate_limiter import RateLimiter
+from app.core.cache import response_cache
 from app.core.security import verify_password
 from app.api.v1.router import api_router
 from app.db.session import engine, get_db
-from app.models.user import User, UserRole
-from starlette.staticfiles import StaticFiles
+from app.models.user import User, UserLoad, UserRole
 
 # Admin panel imports
 from sqladmin import Admin
@@ -64,12 +67,9 @@ app = FastAPI(
     openapi_url=None,  # Disable default openapi.json
 )
 
-# Serve uploaded files from settings.UPLOAD_DIR at /uploads
-try:
-    app.mount("/uploads", StaticFiles(directory=settings.UPLOAD_DIR), name="uploads")
-except Exception:
-    # ignore if mount fails (e.g., directory missing at runtime)
-    pass
+# Serve uploaded files from settings.UPLOAD_DIR at /uploads (Range requests,
+# validators; sent by nginx with MEDIA_ACCEL_REDIRECT)
+app.mount("/uploads", MediaFiles(directory=settings.UPLOAD_DIR), name="uploads")
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login", auto_error=False)
 
@@ -107,16 +107,28 @@ def custom_openapi():
 
 app.openapi = custom_openapi
 
+_openapi_payload: Optional[PrecompressedPayload] = None
+
+
+def openapi_payload() -> PrecompressedPayload:
+    """The OpenAPI schema serialized and compressed once (routes don't change at runtime)"""
+    global _openapi_payload
+    if _openapi_payload is None:
+        data = json.dumps(app.openapi(), separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        _openapi_payload = PrecompressedPayload.build(data, "application/json")
+    return _openapi_payload
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.CORS_ORIGINS,
     allow_credentials=settings.CORS_ALLOW_CREDENTIALS,
     allow_methods=settings.CORS_ALLOW_METHODS,
     allow_headers=settings.CORS_ALLOW_HEADERS,
+    expose_headers=["X-Request-ID", "X-RateLimit-Limit", "X-RateLimit-Remaining", "X-RateLimit-Reset", "Retry-After"],
 )
 
-# GZip Middleware
-app.add_middleware(GZipMiddleware, minimum_size=1000)
+# GZip Middleware (not for /uploads)
+app.add_middleware(SelectiveGZipMiddleware, minimum_size=1000)
 
 # Session Middleware (REQUIRED for docs login and admin panel)
 app.add_middleware(
@@ -131,6 +143,12 @@ app.add_middleware(
 # Rate Limiter
 rate_limiter = RateLimiter()
 
+# Refuse oversized bodies before they are parsed (inside rate limiting)
+app.add_middleware(BodySizeLimitMiddleware)
+
+# Request id, rate limiting and X-Process-Time (outermost, added last)
+app.add_middleware(RequestContextMiddleware, rate_limiter=rate_limiter)
+
 print("🔧 Setting up admin panel...")
 
 try:
@@ -175,7 +193,7 @@ async def is_superuser_authenticated(request: Request) -> bool:
 
     try:
         async for db in get_db():
-            result = await db.execute(select(User).where(User.id == user_id))
+            result = await db.execute(select(User).options(*UserLoad.options(UserLoad.AUTH)).where(User.id == user_id))
             user = result.scalar_one_or_none()
 
             # User not found
@@ -266,7 +284,7 @@ async def docs_login(
     # 2. STANDARD: If not the fallback, check the database
     try:
         # Query user by email
-        result = await db.execute(select(User).where(User.email == email))
+        result = await db.execute(select(User).options(*UserLoad.options(UserLoad.AUTH)).where(User.email == email))
         user = result.scalar_one_or_none()
 
         # User doesn't exist
@@ -327,9 +345,6 @@ async def custom_swagger_ui(request: Request):
     # Get user info for display
     user_email = request.session.get("docs_email", "Unknown")
 
-    schema = app.openapi()
-    schema_json = json.dumps(schema)
-
     return f"""
     <!DOCTYPE html>
     <html>
@@ -351,7 +366,7 @@ async def custom_swagger_ui(request: Request):
         <script src="https://cdn.jsdelivr.net/npm/swagger-ui-dist@5/swagger-ui-bundle.js"></script>
         <script>
             SwaggerUIBundle({{
-                spec: {schema_json},
+                url: '/openapi.json',
                 dom_id: '#swagger-ui',
                 presets: [SwaggerUIBundle.presets.apis],
                 layout: 'BaseLayout'
@@ -370,34 +385,7 @@ async def get_openapi_json(request: Request):
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Superuser access required"
         )
-    return app.openapi()
-
-
-@app.middleware("http")
-async def add_process_time_header(request: Request, call_next: Callable):
-    start_time = time.time()
-    response = await call_next(request)
-    process_time = time.time() - start_time
-    response.headers["X-Process-Time"] = str(process_time)
-    return response
-
-
-@app.middleware("http")
-async def rate_limit_middleware(request: Request, call_next: Callable):
-    client_ip = request.client.host
-
-    skip_paths = ["/health", "/admin", "/docs"]
-    if any(request.url.path.startswith(path) for path in skip_paths):
-        return await call_next(request)
-
-    if not await rate_limiter.check_rate_limit(client_ip):
-        return JSONResponse(
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            content={"detail": "Rate limit exceeded. Please try again later."}
-        )
-
-    response = await call_next(request)
-    return response
+    return openapi_payload().response(request, cache_control="private, no-cache")
 
 
 @app.exception_handler(StarletteHTTPException)
@@ -493,7 +481,8 @@ async def response_validation_exception_handler(request: Request, exc: ResponseV
 @app.exception_handler(Exception)
 async def general_exception_handler(request: Request, exc: Exception):
     # Log full traceback for debugging
-    logger.exception(f"Unhandled exception on {request.method} {request.url.path}: {exc}")
+    request_id = getattr(request.state, "request_id", None)
+    logger.exception(f"Unhandled exception on {request.method} {request.url.path} [{request_id}]: {exc}")
 
     if settings.DEBUG or getattr(settings, "EXPOSE_ERRORS_IN_RESPONSE", False):
         tb = traceback.format_exc()
@@ -525,12 +514,20 @@ async def startup_event():
     print(f"🔐 Docs Login:         http://127.0.0.1:8000/docs/login")
     print(f"🔑 API Auth:           POST /api/v1/auth/login")
     print("=" * 70)
+    # Per-worker listener that evicts in-memory cached objects on writes
+    response_cache.start_listener()
+    # Per-worker rate-limit pre-filter, flushed to Redis in the background
+    rate_limiter.start_sync()
+    # Serialize and compress the OpenAPI schema once, off the event loop
+    await asyncio.to_thread(openapi_payload)
     print("✅ Application started successfully")
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     print("👋 Shutting down application...")
+    await response_cache.stop_listener()
+    await rate_limiter.stop_sync()
 
 
 @app.get("/health", tags=["Health"])
@@ -11,7 +11,11 @@ from . import (
     transaction,
     achievement,
     gallery_photo,
-    follow
+    follow,
+    translation,
+    content_translation,
+    stored_file,
+    view_count_flush
 )
 
 __all__ = [
@@ -27,5 +31,9 @@ __all__ = [
     "transaction",
     "achievement",
     "gallery_photo",
-    "follow"
+    "follow",
+    "translation",
+    "content_translation",
+    "stored_file",
+    "view_count_flush"
 ]
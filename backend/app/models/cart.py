@@ -1,9 +1,13 @@
-from sqlalchemy import Column, Integer, ForeignKey
+from sqlalchemy import Column, Integer, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from ..db.base import BaseModel
 
 class Cart(BaseModel):
     __tablename__ = "cart"
+    __table_args__ = (
+        # A user's cart, and the "is this item already in it" lookup
+        Index("ix_cart_user_id_merch_id", "user_id", "merch_id"),
+    )
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
     merch_id = Column(Integer, ForeignKey("merches.id", ondelete="CASCADE"))
     quantity = Column(Integer, default=1)
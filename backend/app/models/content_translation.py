@@ -0,0 +1,30 @@
+"""
+ContentTranslation model — pre-translated fields of news, courses,
+education and job vacancies.
+"""
+from sqlalchemy import Column, String, Text, UniqueConstraint
+
+from app.db.base import BaseModel
+
+
+class ContentTranslation(BaseModel):
+    """One row per (resource row, field, target language)."""
+    __tablename__ = "content_translations"
+
+    # Response cache resource name ("news", "courses"...) and the row's id
+    # as text (course ids are UUIDs)
+    resource = Column(String(30), nullable=False)
+    resource_id = Column(String(36), nullable=False)
+    field = Column(String(50), nullable=False)
+    lang = Column(String(5), nullable=False)
+    text = Column(Text, nullable=False)
+    # md5 of the source text this was translated from; a mismatch with the
+    # current source means the field changed and the translation is stale
+    source_hash = Column(String(32), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("resource", "resource_id", "lang", "field", name="uq_content_translation"),
+    )
+
+    def __repr__(self):
+        return f"<ContentTranslation({self.resource}:{self.resource_id}.{self.field}, lang={self.lang})>"
@@ -13,10 +13,13 @@ from sqlalchemy import (
     ForeignKey,
     Enum,
     func,
+    Index,
+    text,
 )
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from app.db.base import Base        
+from app.core.search import search_vector_column
 
 
 # ─── Enums ────────────────────────────────────────────────────────────────────
@@ -29,6 +32,14 @@ class CourseStatus(str, PyEnum):
     draft     = "draft"      # Saved by trainer but not yet submitted
 
 
+class TranscodeStatus(str, PyEnum):
+    """Progress of the HLS transcoding of a course video (app.services.video)."""
+    pending    = "pending"     # Queued
+    processing = "processing"  # ffmpeg running
+    ready      = "ready"       # hls_manifest_url is set
+    failed     = "failed"      # See transcode_error; the course can't be approved
+
+
 class SportType(str, PyEnum):
     """Sport categories available for filtering."""
     futbol      = "Futbol"
@@ -52,11 +63,26 @@ class Course(Base):
     Represents a sport training course video uploaded by a trainer or admin.
 
     Flow:
-      trainer uploads → status=pending
+      trainer uploads → status=pending, transcode_status=pending
+      video transcoded → transcode_status=ready (approvable from now on)
       admin approves  → status=approved  (publicly visible)
       admin rejects   → status=rejected  (hidden, trainer can resubmit)
+
+    Admin uploads skip the review: publish_when_ready approves them as soon
+    as transcoding completes.
     """
     __tablename__ = "courses"
+    __table_args__ = (
+        Index("ix_courses_search_vector", "search_vector", postgresql_using="gin"),
+        # Public list only ever shows approved courses; the review queue only pending
+        Index("ix_courses_approved_created_at_id", "created_at", "id",
+              postgresql_where=text("status = 'approved'")),
+        Index("ix_courses_approved_sport_type_created_at_id", "sport_type", "created_at", "id",
+              postgresql_where=text("status = 'approved'")),
+        Index("ix_courses_pending_created_at", "created_at",
+              postgresql_where=text("status = 'pending'")),
+        Index("ix_courses_uploaded_by_id_created_at", "uploaded_by_id", "created_at"),
+    )
 
     # Primary key — UUID for security (no sequential IDs exposed in QR codes)
     id = Column(
@@ -80,6 +106,19 @@ class Course(Base):
     # Duration in seconds (extracted server-side on upload)
     duration_seconds = Column(Integer, nullable=True)
 
+    # ── Transcoding ────────────────────────────────────────────────────────
+    # HLS master playlist of the bitrate renditions (video_url stays the original)
+    hls_manifest_url = Column(String(1024), nullable=True)
+
+    # NULL for courses uploaded before transcoding existed (served as uploaded)
+    transcode_status = Column(Enum(TranscodeStatus), nullable=True)
+
+    # Why transcoding failed (ffmpeg's last output lines)
+    transcode_error = Column(Text, nullable=True)
+
+    # Approve once transcoding completes (uploaded by an admin)
+    publish_when_ready = Column(Boolean, default=False, server_default="false", nullable=False)
+
     # Difficulty: 1=Beginner, 2=Intermediate, 3=Advanced
     difficulty_level = Column(Integer, default=1, nullable=False)
 
@@ -127,16 +166,21 @@ class Course(Base):
     lazy="select",
     )
     
+    # Not part of any response: loaded only when asked for (e.g. with
+    # UserLoad.related(Course.reviewed_by, UserLoad.CARD))
     reviewed_by = relationship(
         "User",
         foreign_keys=[reviewed_by_id],
-        lazy="joined",
+        lazy="select",
     )
 
     # ── Engagement stats (optional, can be removed if not needed) ──────────
     view_count = Column(Integer, default=0, nullable=False)
     rating     = Column(Float, default=0.0, nullable=False)
 
+    # Full-text search (generated by Postgres, GIN-indexed; see core/search.py)
+    search_vector = search_vector_column(("title", "A"), ("description", "B"))
+
     # ── Timestamps ─────────────────────────────────────────────────────────
     created_at = Column(
         DateTime(timezone=True),
@@ -1,6 +1,7 @@
-from sqlalchemy import Column, String, Text, Enum, Float
+from sqlalchemy import Column, String, Text, Enum, Float, Index
 import enum
 from ..db.base import BaseModel
+from ..core.search import search_vector_column
 
 class Region(str, enum.Enum):
     ANDIJAN = "andijan"
@@ -26,6 +27,13 @@ class EducationType(str, enum.Enum):
 
 class Education(BaseModel):
     __tablename__ = "education"
+    __table_args__ = (
+        Index("ix_education_search_vector", "search_vector", postgresql_using="gin"),
+        # List pages: filter, then newest first (btree scans backwards for DESC)
+        Index("ix_education_created_at_id", "created_at", "id"),
+        Index("ix_education_region_created_at_id", "region", "created_at", "id"),
+        Index("ix_education_type_created_at_id", "type", "created_at", "id"),
+    )
     name = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
     region = Column(Enum(Region), nullable=False)
@@ -38,4 +46,6 @@ class Education(BaseModel):
     image_url = Column(String(500), nullable=True)
     phone = Column(String(20), nullable=True)
     rating = Column(Float, nullable=True, default=0.0)
-    maps_link = Column(String(500), nullable=True)
\ No newline at end of file
+    maps_link = Column(String(500), nullable=True)
+    # Full-text search (generated by Postgres, GIN-indexed; see core/search.py)
+    search_vector = search_vector_column(("name", "A"), ("description", "B"), ("address", "C"))
@@ -1,9 +1,13 @@
-from sqlalchemy import Column, Integer, ForeignKey
+from sqlalchemy import Column, Integer, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from ..db.base import BaseModel
 
 class Favorite(BaseModel):
     __tablename__ = "favorites"
+    __table_args__ = (
+        # A user's favorites, and the "is this item already saved" lookup
+        Index("ix_favorites_user_id_merch_id", "user_id", "merch_id"),
+    )
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
     merch_id = Column(Integer, ForeignKey("merches.id", ondelete="CASCADE"))
     user = relationship("User", back_populates="favorites")
@@ -1,4 +1,5 @@
 from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from ..db.base import BaseModel
 
@@ -12,5 +13,7 @@ class GalleryPhoto(BaseModel):
 
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     image_url = Column(String(500), nullable=False)
+    # WebP variants (app.services.images); NULL until processed
+    image_variants = Column(JSONB(none_as_null=True), nullable=True)
 
     user = relationship("User", back_populates="gallery_photos")
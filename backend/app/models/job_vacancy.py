@@ -1,6 +1,7 @@
-from sqlalchemy import Column, String, Text, Integer, Boolean, Enum
+from sqlalchemy import Column, String, Text, Integer, Boolean, Enum, Index
 import enum
 from app.db.base import BaseModel
+from app.core.search import search_vector_column
 from app.models.education import Region  # reuse the same 14-region enum used elsewhere
 
 
@@ -27,6 +28,15 @@ class JobSportType(str, enum.Enum):
 
 class JobVacancy(BaseModel):
     __tablename__ = "job_vacancies"
+    __table_args__ = (
+        Index("ix_job_vacancies_search_vector", "search_vector", postgresql_using="gin"),
+        # List pages: filter, then newest first (btree scans backwards for DESC)
+        Index("ix_job_vacancies_created_at_id", "created_at", "id"),
+        Index("ix_job_vacancies_is_active_created_at_id", "is_active", "created_at", "id"),
+        Index("ix_job_vacancies_region_created_at", "region", "created_at"),
+        Index("ix_job_vacancies_employment_type_created_at", "employment_type", "created_at"),
+        Index("ix_job_vacancies_sport_type_created_at", "sport_type", "created_at"),
+    )
     title = Column(String(255), nullable=False)
     description = Column(Text, nullable=False)
     company = Column(String(255), nullable=False)
@@ -46,4 +56,6 @@ class JobVacancy(BaseModel):
     )
     salary_range = Column(String(100), nullable=True)
     contact = Column(String(255))
-    is_active = Column(Boolean, default=True)
\ No newline at end of file
+    is_active = Column(Boolean, default=True)
+    # Full-text search (generated by Postgres, GIN-indexed; see core/search.py)
+    search_vector = search_vector_column(("title", "A"), ("company", "A"), ("description", "B"))
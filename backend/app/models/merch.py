@@ -1,11 +1,26 @@
 """Merch Model"""
-from sqlalchemy import Column, String, Text, Integer, ForeignKey, Boolean, Float
+from sqlalchemy import Column, String, Text, Integer, ForeignKey, Boolean, Float, Index, text
 from sqlalchemy.orm import relationship
 from app.db.base import BaseModel
+from app.core.search import search_vector_column
 
 class Merch(BaseModel):
     """Personal merchandise model"""
     __tablename__ = "merches"
+    __table_args__ = (
+        Index("ix_merches_search_vector", "search_vector", postgresql_using="gin"),
+        # Trigram indexes for name/brand autocomplete (/merches/suggest)
+        Index("ix_merches_name_trgm", "name", postgresql_using="gin",
+              postgresql_ops={"name": "gin_trgm_ops"}),
+        Index("ix_merches_brand_trgm", "brand", postgresql_using="gin",
+              postgresql_ops={"brand": "gin_trgm_ops"}),
+        # List pages: filter, then newest first (btree scans backwards for DESC)
+        Index("ix_merches_created_at_id", "created_at", "id"),
+        Index("ix_merches_is_available_created_at_id", "is_available", "created_at", "id"),
+        Index("ix_merches_owner_id_created_at", "owner_id", "created_at"),
+        Index("ix_merches_new_created_at_id", "created_at", "id", postgresql_where=text("is_new")),
+        Index("ix_merches_discount_percent", "discount_percent", postgresql_where=text("discount_percent > 0")),
+    )
     
     name = Column(String(255), nullable=False)
     brand = Column(String(255), nullable=False)
@@ -21,6 +36,9 @@ class Merch(BaseModel):
 
     owner_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     owner = relationship("User", back_populates="merches")
+
+    # Full-text search (generated by Postgres, GIN-indexed; see core/search.py)
+    search_vector = search_vector_column(("name", "A"), ("brand", "A"), ("description", "B"))
     
     favorites = relationship("Favorite", back_populates="merch", cascade="all, delete-orphan")
     cart_items = relationship("Cart", back_populates="merch", cascade="all, delete-orphan")
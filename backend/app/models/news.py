@@ -1,11 +1,12 @@
 """
 News Model
 """
-from sqlalchemy import Column, String, Text, Integer, ForeignKey, Enum
+from sqlalchemy import Column, String, Text, Integer, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship
 import enum
 
 from app.db.base import BaseModel
+from app.core.search import search_vector_column
 
 
 class NewsCategory(str, enum.Enum):
@@ -23,6 +24,13 @@ class News(BaseModel):
     News and articles model
     """
     __tablename__ = "news"
+    __table_args__ = (
+        Index("ix_news_search_vector", "search_vector", postgresql_using="gin"),
+        # List pages: filter, then newest first (btree scans backwards for DESC)
+        Index("ix_news_created_at_id", "created_at", "id"),
+        Index("ix_news_category_created_at_id", "category", "created_at", "id"),
+        Index("ix_news_author_id_created_at", "author_id", "created_at"),
+    )
     
     title = Column(String(500), nullable=False, index=True)
     slug = Column(String(500), unique=True, index=True, nullable=False)
@@ -36,6 +44,9 @@ class News(BaseModel):
     author_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     author = relationship("User", back_populates="news_articles")
 
+    # Full-text search (generated by Postgres, GIN-indexed; see core/search.py)
+    search_vector = search_vector_column(("title", "A"), ("snippet", "B"), ("content", "C"))
+
     
     def __repr__(self):
         return "<News>"
\ No newline at end of file
@@ -0,0 +1,36 @@
+"""
+StoredFile model — content-addressed uploads and their reference counts.
+"""
+from sqlalchemy import BigInteger, Column, Index, Integer, String, text
+from sqlalchemy.dialects.postgresql import JSONB
+
+from app.db.base import BaseModel
+
+
+class StoredFile(BaseModel):
+    """
+    One row per file in upload storage. The key embeds the file's SHA-256,
+    so identical uploads share a single file; ref_count is the number of
+    rows (avatars, covers, gallery photos, courses...) pointing at it.
+    """
+    __tablename__ = "stored_files"
+
+    # Storage key, e.g. "avatars/3f/3fa9...c1.jpg" (served at /uploads/<key>)
+    key = Column(String(255), unique=True, nullable=False)
+    sha256 = Column(String(64), nullable=False)
+    size = Column(BigInteger, nullable=False)
+    content_type = Column(String(100), nullable=True)
+    ref_count = Column(Integer, nullable=False, default=0, server_default="0")
+    # Files derived from this one, deleted with it: an image's WebP variants
+    # ({"thumb": {"url", "width", "height"}, ...}, {} if it couldn't be
+    # decoded), a video's HLS renditions and poster ({"hls": {"url", "keys",
+    # "duration"}, "poster": {...}})
+    variants = Column(JSONB(none_as_null=True), nullable=True)
+
+    __table_args__ = (
+        # Garbage collection scans unreferenced files by age
+        Index("ix_stored_files_unreferenced", "updated_at", postgresql_where=text("ref_count <= 0")),
+    )
+
+    def __repr__(self):
+        return f"<StoredFile({self.key}, refs={self.ref_count})>"
@@ -0,0 +1,26 @@
+"""
+Translation model — durable store of machine translations.
+
+Redis holds the hot set for 24 hours but evicts under memory pressure; rows
+here are the second tier, so an evicted translation is reloaded instead of
+being sent to the translation backend again.
+"""
+from sqlalchemy import Column, String, Text
+
+from app.db.base import BaseModel
+
+
+class Translation(BaseModel):
+    """One row per (source text, source language, target language)."""
+    __tablename__ = "translations"
+
+    # blake2b digest of the languages + normalized source text (see
+    # TranslationService._digest); also the Redis key suffix
+    text_hash = Column(String(32), unique=True, index=True, nullable=False)
+    source_lang = Column(String(5), nullable=False)
+    target_lang = Column(String(5), nullable=False)
+    source_text = Column(Text, nullable=False)
+    translated_text = Column(Text, nullable=False)
+
+    def __repr__(self):
+        return f"<Translation({self.source_lang}->{self.target_lang}, text_hash={self.text_hash})>"
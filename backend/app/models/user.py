@@ -1,8 +1,9 @@
 """
 User Model
 """
-from sqlalchemy import Column, String, Boolean, Enum, Text, Integer, Float
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Boolean, Enum, Text, Integer, Float, Index
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import relationship, load_only, selectinload
 import enum
 
 from app.db.base import BaseModel
@@ -29,6 +30,16 @@ class User(BaseModel):
     User model for authentication and profile
     """
     __tablename__ = "users"
+    __table_args__ = (
+        # Trigram indexes for name/email lookups (ILIKE '%...%' and /users/suggest)
+        Index("ix_users_full_name_trgm", "full_name", postgresql_using="gin",
+              postgresql_ops={"full_name": "gin_trgm_ops"}),
+        Index("ix_users_email_trgm", "email", postgresql_using="gin",
+              postgresql_ops={"email": "gin_trgm_ops"}),
+        # Admin user list: filter, then newest first
+        Index("ix_users_created_at_id", "created_at", "id"),
+        Index("ix_users_role_created_at_id", "role", "created_at", "id"),
+    )
 
     # Authentication
     email = Column(String(255), unique=True, index=True, nullable=False)
@@ -39,6 +50,9 @@ class User(BaseModel):
     phone = Column(String(20), nullable=True)
     avatar_url = Column(String(500), nullable=True)
     cover_url = Column(String(500), nullable=True)
+    # WebP variants of the avatar/cover (app.services.images); NULL until processed
+    avatar_variants = Column(JSONB(none_as_null=True), nullable=True)
+    cover_variants = Column(JSONB(none_as_null=True), nullable=True)
     bio = Column(Text, nullable=True)
 
     # Role and permissions
@@ -82,7 +96,8 @@ class User(BaseModel):
     favorites = relationship("Favorite", back_populates="user", cascade="all, delete-orphan")
     cart_items = relationship("Cart", back_populates="user", cascade="all, delete-orphan")
     transactions = relationship("Transaction", back_populates="user", cascade="all, delete-orphan")
-    uploaded_courses = relationship("Course", foreign_keys="Course.uploaded_by_id", back_populates="uploaded_by", lazy="selectin")
+    # Loaded on demand only - an eager load here fires an extra query on every User load
+    uploaded_courses = relationship("Course", foreign_keys="Course.uploaded_by_id", back_populates="uploaded_by")
     # Structured achievements (achievements table). Named achievement_entries to
     # avoid clashing with the legacy `achievements` Text column above.
     achievement_entries = relationship("Achievement", back_populates="user", cascade="all, delete-orphan")
@@ -90,3 +105,45 @@ class User(BaseModel):
 
     def __repr__(self):
         return f"<User(id={self.id}, email={self.email}, role={self.role})>"
+
+
+class UserLoad:
+    """
+    Named loader profiles for User rows.
+
+    Each profile is the set of columns a kind of caller needs; pick the
+    smallest one that covers the fields you read or serialize. Columns
+    outside a partial profile raise on access instead of lazy-loading (which
+    would fail under async SQLAlchemy anyway).
+
+    Usage:
+        select(User).options(*UserLoad.options(UserLoad.AUTH))
+        select(News).options(UserLoad.related(News.author, UserLoad.CARD))
+    """
+    # Login / credential checks
+    AUTH = (User.id, User.email, User.hashed_password, User.role, User.is_active, User.is_superuser)
+    # Nested author/owner/uploader info (AuthorInfo, UploaderInfo, cart/favorite owners)
+    CARD = (User.id, User.email, User.full_name, User.role, User.avatar_url, User.avatar_variants, User.sport_type)
+    # Every column, no relationships (UserResponse, current user)
+    PROFILE = None
+
+    @staticmethod
+    def options(profile) -> list:
+        """Loader options for a `select(User)` query."""
+        if profile is None:
+            return []
+        return [load_only(*profile, raiseload=True)]
+
+    @staticmethod
+    def related(relationship_attr, profile, parent=None):
+        """
+        Loader option for Users reached through a relationship (e.g. News.author).
+
+        Args:
+            parent: An existing loader to chain from, e.g.
+                selectinload(Cart.merch) for Cart.merch -> Merch.owner
+        """
+        loader = parent.selectinload(relationship_attr) if parent is not None else selectinload(relationship_attr)
+        if profile is None:
+            return loader
+        return loader.load_only(*profile, raiseload=True)
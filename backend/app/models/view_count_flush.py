@@ -0,0 +1,22 @@
+"""
+ViewCountFlush model — view counter flushes already applied to Postgres.
+"""
+from sqlalchemy import Column, String
+
+from app.db.base import BaseModel
+
+
+class ViewCountFlush(BaseModel):
+    """
+    One row per applied flush of a buffered view-count hash (see
+    app.core.view_counter), inserted in the transaction that adds its
+    deltas, so a flush retried after its commit is recognised and skipped.
+    """
+    __tablename__ = "view_count_flushes"
+
+    # Random id stored in the hash being flushed
+    flush_id = Column(String(32), unique=True, nullable=False)
+    resource = Column(String(30), nullable=False)
+
+    def __repr__(self):
+        return f"<ViewCountFlush({self.resource}:{self.flush_id})>"
@@ -9,6 +9,12 @@ class PaginatedResponse(BaseModel, Generic[T]):
     total: int
     skip: int
     limit: int
+    # Opaque keyset cursor for the next page (pass back as ?cursor=...);
+    # None on the last page.
+    next_cursor: Optional[str] = None
+    # True when `total` is the Postgres planner's estimate (free-text searches
+    # over large tables) rather than an exact count.
+    total_is_estimate: bool = False
 
 class MessageResponse(BaseModel):
     message: str
@@ -1,9 +1,11 @@
 import uuid
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional
 
-from pydantic import BaseModel, Field, HttpUrl
-from app.models.course import CourseStatus, SportType
+from pydantic import BaseModel, Field, HttpUrl, computed_field
+from app.models.course import CourseStatus, SportType, TranscodeStatus
+from app.schemas.common import PaginatedResponse
+from app.schemas.image import ImageVariants, srcset
 
 
 # ─── Shared base ──────────────────────────────────────────────────────────────
@@ -57,8 +59,14 @@ class UploaderInfo(BaseModel):
     id:        int               # matches your User.id type (see users.py — plain int, not UUID)
     full_name: Optional[str] = None
     avatar_url: Optional[str] = None
+    avatar_variants: Optional[ImageVariants] = None
     sport_type: Optional[str] = None
 
+    @computed_field
+    @property
+    def avatar_srcset(self) -> Optional[str]:
+        return srcset(self.avatar_variants)
+
     model_config = {"from_attributes": True}
 
 
@@ -69,6 +77,8 @@ class CourseResponse(CourseBase):
     video_url:         str
     thumbnail_url:     Optional[str]
     duration_seconds:  Optional[int]
+    hls_manifest_url:  Optional[str] = None            # adaptive stream; play video_url without it
+    transcode_status:  Optional[TranscodeStatus] = None  # None: uploaded before transcoding
     qr_code_url:       Optional[str]
     qr_code_image_url: Optional[str]
     status:            CourseStatus
@@ -84,8 +94,32 @@ class CourseResponse(CourseBase):
 
 # ─── Paginated list response ──────────────────────────────────────────────────
 
-class CoursesPage(BaseModel):
-    items: List[CourseResponse]
-    total: int
-    skip:  int
-    limit: int
\ No newline at end of file
+class CoursesPage(PaginatedResponse[CourseResponse]):
+    """Paginated course list (items/total/skip/limit/next_cursor)."""
+
+
+# ─── Public list card (no description / review fields) ───────────────────────
+
+class CourseCard(BaseModel):
+    id:                uuid.UUID
+    title:             str
+    sport_type:        SportType
+    difficulty_level:  int
+    video_url:         str
+    thumbnail_url:     Optional[str]
+    duration_seconds:  Optional[int]
+    hls_manifest_url:  Optional[str] = None
+    qr_code_url:       Optional[str]
+    qr_code_image_url: Optional[str]
+    status:            CourseStatus
+    view_count:        int
+    rating:            float
+    uploaded_by:       Optional[UploaderInfo]
+    created_at:        datetime
+    updated_at:        datetime
+
+    model_config = {"from_attributes": True}
+
+
+class CourseCardsPage(PaginatedResponse[CourseCard]):
+    """Paginated public course list of cards."""
@@ -2,6 +2,7 @@ from pydantic import BaseModel, Field
 from typing import Optional
 from datetime import datetime
 from app.models.education import Region, EducationType
+from app.schemas.common import PaginatedResponse
 
 
 class EducationBase(BaseModel):
@@ -47,9 +48,9 @@ class EducationResponse(EducationBase):
         from_attributes = True
 
 
-class EducationList(BaseModel):
-    """Schema for paginated education list"""
-    items: list[EducationResponse]
-    total: int
-    skip: int
-    limit: int
+class EducationCard(EducationResponse):
+    """Education list card; description is cut to a short excerpt"""
+
+
+class EducationCardList(PaginatedResponse[EducationCard]):
+    """Schema for paginated public education list"""
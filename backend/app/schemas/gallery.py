@@ -1,13 +1,21 @@
 from datetime import datetime
-from pydantic import BaseModel
+from typing import Optional
+from pydantic import BaseModel, computed_field
+from app.schemas.image import ImageVariants, srcset
 
 
 class GalleryPhotoResponse(BaseModel):
     id: int
     user_id: int
     image_url: str
+    image_variants: Optional[ImageVariants] = None  # WebP copies; None until processed
     created_at: datetime  # maps to the "uploaded_at" concept from the spec
 
+    @computed_field
+    @property
+    def image_srcset(self) -> Optional[str]:
+        return srcset(self.image_variants)
+
     class Config:
         from_attributes = True
 
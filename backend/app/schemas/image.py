@@ -0,0 +1,22 @@
+"""Responsive image variants (see app.services.images)"""
+from typing import Dict, Optional
+from pydantic import BaseModel
+
+
+class ImageVariant(BaseModel):
+    """A resized WebP copy of an uploaded image"""
+    url: str
+    width: int
+    height: int
+
+
+# Variant name ("thumb", "card", "full") -> variant
+ImageVariants = Dict[str, ImageVariant]
+
+
+def srcset(variants: Optional[ImageVariants]) -> Optional[str]:
+    """`srcset` attribute value ("<url> 160w, <url> 480w, ...") of `variants`, None without any."""
+    if not variants:
+        return None
+    widths = {variant.width: variant.url for variant in variants.values()}
+    return ", ".join(f"{url} {width}w" for width, url in sorted(widths.items()))
@@ -4,6 +4,7 @@ from datetime import datetime
 
 from app.models.job_vacancy import EmploymentType, JobSportType
 from app.models.education import Region
+from app.schemas.common import PaginatedResponse
 
 
 class JobVacancyBase(BaseModel):
@@ -51,9 +52,9 @@ class JobVacancyResponse(JobVacancyBase):
         from_attributes = True
 
 
-class JobVacancyList(BaseModel):
-    """Schema for paginated job vacancy list"""
-    items: list[JobVacancyResponse]
-    total: int
-    skip: int
-    limit: int
\ No newline at end of file
+class JobVacancyCard(JobVacancyResponse):
+    """Job vacancy list card; description is cut to a short excerpt"""
+
+
+class JobVacancyCardList(PaginatedResponse[JobVacancyCard]):
+    """Schema for paginated public job vacancy list"""
@@ -1,6 +1,7 @@
 from typing import Optional
 from pydantic import BaseModel, Field
 from datetime import datetime
+from app.schemas.common import PaginatedResponse
 
 class MerchBase(BaseModel):
     name: str = Field(..., min_length=1, max_length=255)
@@ -44,9 +45,8 @@ class MerchResponse(MerchBase):
     class Config:
         from_attributes = True
 
-class MerchList(BaseModel):
-    """Schema for paginated merchandise list"""
-    items: list[MerchResponse]
-    total: int
-    skip: int
-    limit: int
\ No newline at end of file
+class MerchCard(MerchResponse):
+    """Merchandise list card; description is cut to a short excerpt"""
+
+class MerchCardList(PaginatedResponse[MerchCard]):
+    """Schema for paginated public merchandise list"""
@@ -1,8 +1,10 @@
-from pydantic import BaseModel, Field
-from typing import Optional, List
+from pydantic import BaseModel, Field, computed_field
+from typing import Optional
 from datetime import datetime
 from app.models.news import NewsCategory
 from app.models.user import UserRole
+from app.schemas.common import PaginatedResponse
+from app.schemas.image import ImageVariants, srcset
 
 
 class NewsBase(BaseModel):
@@ -35,6 +37,12 @@ class AuthorInfo(BaseModel):
     full_name: str
     role: UserRole
     avatar_url: Optional[str] = None
+    avatar_variants: Optional[ImageVariants] = None
+
+    @computed_field
+    @property
+    def avatar_srcset(self) -> Optional[str]:
+        return srcset(self.avatar_variants)
 
     class Config:
         from_attributes = True
@@ -56,12 +64,31 @@ class NewsResponse(NewsBase):
         from_attributes = True
 
 
-class NewsList(BaseModel):
+class NewsList(PaginatedResponse[NewsResponse]):
     """Schema for paginated news list"""
-    items: List[NewsResponse]
-    total: int
-    skip: int
-    limit: int
+
+
+class NewsCard(BaseModel):
+    """News list card: everything but the full content"""
+    id: int
+    title: str
+    slug: str
+    # The article's snippet, or the start of its content when it has none
+    snippet: Optional[str] = None
+    image_url: Optional[str] = None
+    category: NewsCategory
+    views_count: int
+    author_id: Optional[int]
+    created_at: datetime
+    updated_at: datetime
+    author: Optional[AuthorInfo] = None
+
+    class Config:
+        from_attributes = True
+
+
+class NewsCardList(PaginatedResponse[NewsCard]):
+    """Schema for paginated public news list"""
 
 
 class NewsFilter(BaseModel):
@@ -79,6 +106,8 @@ __all__ = [
     "NewsUpdate",
     "NewsResponse",
     "NewsList",
+    "NewsCard",
+    "NewsCardList",
     "NewsFilter",
     "AuthorInfo"
 ]
\ No newline at end of file
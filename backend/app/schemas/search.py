@@ -0,0 +1,30 @@
+from enum import Enum
+from pydantic import BaseModel
+from typing import Optional, List
+from datetime import datetime
+
+
+class SearchResultType(str, Enum):
+    """Resource types covered by the unified search"""
+    NEWS = "news"
+    COURSE = "course"
+    JOB_VACANCY = "job_vacancy"
+    EDUCATION = "education"
+    MERCH = "merch"
+
+
+class SearchHit(BaseModel):
+    """A single search result, linking to the resource's own detail endpoint"""
+    type: SearchResultType
+    id: str  # course ids are UUIDs, everything else integers
+    title: str
+    excerpt: Optional[str] = None
+    image_url: Optional[str] = None
+    rank: float
+    created_at: datetime
+
+
+class SearchResults(BaseModel):
+    """Search results across resource types, most relevant first"""
+    query: str
+    items: List[SearchHit]
@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+from typing import Optional, List
+
+
+class Suggestion(BaseModel):
+    """A typeahead match"""
+    id: int
+    label: str  # user full name / merch name
+    detail: Optional[str] = None  # user sport type / merch brand
+    image_url: Optional[str] = None
+    score: float  # pg_trgm word similarity, 0..1
+
+
+class SuggestionList(BaseModel):
+    """Typeahead matches, best first"""
+    query: str
+    items: List[Suggestion]
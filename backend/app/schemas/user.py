@@ -1,7 +1,9 @@
 from typing import Optional
 from datetime import datetime
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, EmailStr, Field, computed_field
 from app.models.user import UserRole, VerificationStatus
+from app.schemas.common import PaginatedResponse
+from app.schemas.image import ImageVariants, srcset
 
 
 class UserBase(BaseModel):
@@ -49,6 +51,9 @@ class UserResponse(UserBase):
     id: int
     avatar_url: Optional[str] = None
     cover_url: Optional[str] = None
+    # WebP copies of the avatar/cover; None until processed
+    avatar_variants: Optional[ImageVariants] = None
+    cover_variants: Optional[ImageVariants] = None
     is_active: bool
     is_verified: bool
     verification_status: VerificationStatus
@@ -65,6 +70,16 @@ class UserResponse(UserBase):
     created_at: datetime
     updated_at: datetime
 
+    @computed_field
+    @property
+    def avatar_srcset(self) -> Optional[str]:
+        return srcset(self.avatar_variants)
+
+    @computed_field
+    @property
+    def cover_srcset(self) -> Optional[str]:
+        return srcset(self.cover_variants)
+
     class Config:
         from_attributes = True
 
@@ -77,9 +92,5 @@ class UserInDB(UserResponse):
         from_attributes = True
 
 
-class UserListResponse(BaseModel):
+class UserListResponse(PaginatedResponse[UserResponse]):
     """Schema for paginated user list"""
-    items: list[UserResponse]
-    total: int
-    skip: int
-    limit: int
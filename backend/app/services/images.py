@@ -0,0 +1,208 @@
+"""
+Responsive image variants
+
+Avatars, covers and gallery photos are stored as uploaded - up to 8MB,
+often straight off a phone camera - while most places show them a few
+hundred pixels wide. After an upload is committed, a Celery task
+(process_image_task) makes fixed-width WebP copies, IMAGE_VARIANT_WIDTHS:
+
+    thumb    160px   avatars on cards and in lists
+    card     480px   cards, the gallery grid
+    full    1280px   cover backdrop, gallery lightbox
+
+Copies are never upscaled (a variant as wide as the original is shared by
+the larger names), EXIF orientation is applied before resizing, and the
+output carries no metadata: no EXIF (camera, GPS position), XMP or ICC
+profile.
+
+Variants are content-addressed like their original - the original's key with
+"_<name>.webp" in place of its extension - so identical uploads share them.
+The variant map is kept on the original's stored_files row (the collector
+deletes the variants with it) and copied onto the rows using the image
+(IMAGE_FIELDS), where the response schemas expose it along with a ready
+`srcset`. Until the task has run it is NULL, and clients fall back to the
+original URL.
+"""
+import io
+import logging
+import os
+import uuid
+from typing import Any, BinaryIO, Dict, Optional, Tuple
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+from sqlalchemy import select, update
+
+from app.core.config import settings
+from app.db.session import SyncSessionLocal
+from app.models.gallery_photo import GalleryPhoto
+from app.models.stored_file import StoredFile
+from app.models.user import User
+from app.services.storage import StorageBackend, storage_service
+
+logger = logging.getLogger(__name__)
+
+# (image URL column, variants column) of every row an image can be used by
+IMAGE_FIELDS = (
+    (User.avatar_url, User.avatar_variants),
+    (User.cover_url, User.cover_variants),
+    (GalleryPhoto.image_url, GalleryPhoto.image_variants),
+)
+
+
+def _prepare(image: Image.Image) -> Image.Image:
+    """Upright, in a mode WebP can store, first frame only."""
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ("RGB", "RGBA"):
+        has_alpha = "A" in image.getbands() or "transparency" in image.info
+        image = image.convert("RGBA" if has_alpha else "RGB")
+    return image
+
+
+def render_variants(
+        source: BinaryIO,
+        widths: Optional[Dict[str, int]] = None,
+        quality: Optional[int] = None,
+) -> Dict[str, Tuple[bytes, int, int]]:
+    """
+    Resize an image to each width, as metadata-free WebP.
+
+    Args:
+        source: The original image file
+        widths: Variant name -> width (default: IMAGE_VARIANT_WIDTHS)
+        quality: WebP quality (default: IMAGE_VARIANT_QUALITY)
+
+    Returns:
+        Variant name -> (WebP bytes, width, height); names whose width is at
+        least the original's share one copy at the original size
+
+    Raises:
+        UnidentifiedImageError / OSError: `source` isn't a decodable image
+    """
+    widths = widths or settings.IMAGE_VARIANT_WIDTHS
+    quality = quality or settings.IMAGE_VARIANT_QUALITY
+
+    with Image.open(source) as original:
+        # JPEGs can be decoded at 1/2, 1/4 or 1/8 scale, much faster than
+        # decoding in full and resizing down. Both sides are kept at least
+        # the largest width, as EXIF orientation may swap them.
+        largest = max(widths.values())
+        original.draft(original.mode, (largest, largest))
+        image = _prepare(original)
+
+        by_width: Dict[int, Tuple[bytes, int, int]] = {}
+        rendered = {}
+        for name, width in sorted(widths.items(), key=lambda item: item[1]):
+            width = min(width, image.width)
+            if width not in by_width:
+                height = max(1, round(image.height * width / image.width))
+                resized = image if width == image.width else image.resize(
+                    (width, height), Image.Resampling.LANCZOS, reducing_gap=3.0
+                )
+                buffer = io.BytesIO()
+                # Only what's passed here is written: no exif/xmp/icc_profile
+                resized.save(buffer, "WEBP", quality=quality, method=4)
+                by_width[width] = (buffer.getvalue(), width, height)
+            rendered[name] = by_width[width]
+    return rendered
+
+
+def _store(backend: StorageBackend, key: str, data: bytes) -> None:
+    tmp_dir = storage_service.tmp_dir
+    os.makedirs(tmp_dir, exist_ok=True)
+    path = os.path.join(tmp_dir, uuid.uuid4().hex)
+    try:
+        with open(path, "wb") as f:
+            f.write(data)
+        backend.put_file(path, key, "image/webp")
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def make_variants(key: str, backend: Optional[StorageBackend] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Render and store the variants of the stored image `key`; variants that
+    already exist are kept.
+
+    Returns:
+        Variant name -> {"url", "width", "height"}; {} if `key` isn't an image
+    """
+    backend = backend or storage_service.backend
+    with backend.open(key) as source:
+        try:
+            rendered = render_variants(source)
+        except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as e:
+            logger.warning(f"Could not make variants of {key}: {e}")
+            return {}
+
+    base = os.path.splitext(key)[0]
+    variants = {}
+    for name, (data, width, height) in rendered.items():
+        # Names sharing a size share the copy of the smallest of them
+        variant_key = next(
+            (
+                backend.key_from_url(variant["url"]) for variant in variants.values()
+                if variant["width"] == width
+            ),
+            f"{base}_{name}.webp",
+        )
+        if not backend.exists(variant_key):
+            _store(backend, variant_key, data)
+        variants[name] = {"url": backend.url(variant_key), "width": width, "height": height}
+    return variants
+
+
+def process_image(url: str) -> int:
+    """
+    Make (or reuse) the variants of the uploaded image at `url` and record
+    them on every row using it (blocking; runs in Celery).
+
+    Returns:
+        Number of rows updated
+    """
+    backend = storage_service.backend
+    key = backend.key_from_url(url)
+    if key is None:
+        return 0
+
+    with SyncSessionLocal() as session:
+        # Locked so the collector can't delete the file (and miss the
+        # variants) while they are being made
+        stored = session.execute(
+            select(StoredFile.id, StoredFile.variants).where(StoredFile.key == key).with_for_update()
+        ).one_or_none()
+        if stored is None:
+            return 0  # Uploaded before content addressing
+
+        variants = stored.variants
+        if variants is None:
+            variants = make_variants(key, backend)
+            session.execute(update(StoredFile).where(StoredFile.id == stored.id).values(variants=variants))
+
+        updated = 0
+        for url_column, variants_column in IMAGE_FIELDS:
+            result = session.execute(
+                update(url_column.class_)
+                .where(url_column == url)
+                .values({variants_column.key: variants})
+            )
+            updated += result.rowcount
+        session.commit()
+    return updated
+
+
+def schedule_image_processing(*urls: Optional[str]) -> None:
+    """
+    Queue variant processing of newly stored images; call after committing
+    the rows that use them. A broker outage only leaves the variants NULL,
+    so it is logged.
+    """
+    from app.workers.tasks import process_image_task
+
+    for url in urls:
+        if not url or storage_service.backend.key_from_url(url) is None:
+            continue
+        try:
+            process_image_task.delay(url)
+        except Exception as e:
+            logger.warning(f"Could not queue image processing of {url}: {e}")
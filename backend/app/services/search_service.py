@@ -0,0 +1,86 @@
+"""Unified Search Service"""
+from typing import Iterable, List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import String, cast, func, literal, select, union_all
+from app.core.cards import EXCERPT_LENGTH
+from app.core.search import to_tsquery
+from app.models.course import Course, CourseStatus
+from app.models.education import Education
+from app.models.job_vacancy import JobVacancy
+from app.models.merch import Merch
+from app.models.news import News
+from app.schemas.search import SearchHit, SearchResultType
+
+
+class SearchService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    def _branch(self, result_type: SearchResultType, model, title, text, image_url, tsquery, *filters):
+        """One resource's matches, projected onto the common SearchHit columns."""
+        return (
+            select(
+                literal(result_type.value).label("type"),
+                cast(model.id, String).label("id"),
+                title.label("title"),
+                func.left(text, EXCERPT_LENGTH).label("excerpt"),
+                image_url.label("image_url"),
+                func.ts_rank(model.search_vector, tsquery).label("rank"),
+                model.created_at.label("created_at"),
+            )
+            .where(model.search_vector.op("@@")(tsquery), *filters)
+        )
+
+    async def search(
+        self,
+        text: str,
+        types: Optional[Iterable[SearchResultType]] = None,
+        limit: int = 20
+    ) -> List[SearchHit]:
+        """
+        Search all (or the given) resource types in one ranked query.
+
+        Args:
+            text: User query (websearch syntax: "phrases", OR, -exclusions)
+            types: Resource types to include; all when empty
+            limit: Maximum number of hits
+
+        Returns:
+            Hits ordered by relevance, newest first among equals
+        """
+        tsquery = to_tsquery(text)
+        wanted = set(types or SearchResultType)
+        branches = {
+            SearchResultType.NEWS: self._branch(
+                SearchResultType.NEWS, News, News.title,
+                func.coalesce(News.snippet, News.content), News.image_url, tsquery,
+            ),
+            SearchResultType.COURSE: self._branch(
+                SearchResultType.COURSE, Course, Course.title,
+                Course.description, Course.thumbnail_url, tsquery,
+                Course.status == CourseStatus.approved,
+            ),
+            SearchResultType.JOB_VACANCY: self._branch(
+                SearchResultType.JOB_VACANCY, JobVacancy, JobVacancy.title,
+                JobVacancy.description, JobVacancy.image_url, tsquery,
+                JobVacancy.is_active == True,
+            ),
+            SearchResultType.EDUCATION: self._branch(
+                SearchResultType.EDUCATION, Education, Education.name,
+                Education.description, Education.image_url, tsquery,
+            ),
+            SearchResultType.MERCH: self._branch(
+                SearchResultType.MERCH, Merch, Merch.name,
+                Merch.description, Merch.image_url, tsquery,
+            ),
+        }
+        selects = [branch for result_type, branch in branches.items() if result_type in wanted]
+
+        combined = union_all(*selects).subquery("hits")
+        query = (
+            select(combined)
+            .order_by(combined.c.rank.desc(), combined.c.created_at.desc())
+            .limit(limit)
+        )
+        result = await self.db.execute(query)
+        return [SearchHit(**row._mapping) for row in result]
@@ -0,0 +1,383 @@
+"""
+Upload storage
+
+Uploads are streamed chunk by chunk off the event loop: each chunk is read
+from the request's spooled file, written to a temporary file with aiofiles
+and fed to a SHA-256 in a worker thread (hashlib releases the GIL), and the
+size limit is enforced as the chunks arrive. Only a complete, accepted file
+is handed to the storage backend, so a rejected upload never leaves a
+partial file behind.
+
+Files are content-addressed: the key is "<subfolder>/<sha[:2]>/<sha><ext>",
+so re-uploading an identical file (retries, profile edits) reuses the stored
+copy instead of writing another. URLs keep the /uploads/<key> form.
+
+Each stored file has a `stored_files` row counting the rows that use it.
+Endpoints acquire() the URLs they store and release() the ones they replace
+or delete, in the same transaction as the change; collect_garbage() (a beat
+task) then deletes files unreferenced for longer than STORAGE_GC_GRACE_PERIOD.
+Files uploaded before content addressing have no row and are never touched.
+Derived files (image variants, see app.services.images; a video's HLS
+renditions and poster, see app.services.video) are listed on their
+original's row and deleted with it.
+
+save_upload() registers the row - bumping its updated_at - in its own
+committed transaction *before* writing the file, and the collector locks the
+rows it deletes and re-checks their age, so an upload racing the collection
+of the same file either waits and then writes the file anew, or makes the
+row too recent to collect.
+
+STORAGE_BACKEND picks the backend from STORAGE_BACKENDS:
+
+    local   files under UPLOAD_DIR, served by the /uploads static mount
+
+Backends are blocking; StorageService calls them from a worker thread and the
+collector (in Celery) calls them directly. A new backend (e.g. S3-compatible
+object storage) implements StorageBackend and registers itself with
+@register_backend("name").
+
+Request bodies are also capped before they are parsed (see
+BodySizeLimitMiddleware), so an oversized upload is refused without being
+spooled to disk first.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import shutil
+import uuid
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import BinaryIO, Callable, Dict, Iterable, Optional, Type
+
+import aiofiles
+from fastapi import HTTPException, UploadFile
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal, SyncSessionLocal
+from app.models.stored_file import StoredFile
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024  # 1MB at a time, so a huge file is never buffered in memory
+
+STORAGE_BACKENDS: Dict[str, Type["StorageBackend"]] = {}
+
+
+def register_backend(name: str) -> Callable[[Type["StorageBackend"]], Type["StorageBackend"]]:
+    """Class decorator adding a backend to STORAGE_BACKENDS under `name`."""
+    def decorator(cls: Type["StorageBackend"]) -> Type["StorageBackend"]:
+        cls.name = name
+        STORAGE_BACKENDS[name] = cls
+        return cls
+    return decorator
+
+
+class StorageBackend:
+    """Where finished uploads are kept. Keys are relative paths ("avatars/3f/3fa9...jpg")."""
+
+    name = "base"
+
+    def put_file(self, path: str, key: str, content_type: Optional[str] = None) -> None:
+        """Move the finished local file at `path` into storage under `key`."""
+        raise NotImplementedError
+
+    def open(self, key: str) -> BinaryIO:
+        """Open `key` for reading (a binary file object; close it when done)."""
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        """Remove `key`; a missing key is not an error."""
+        raise NotImplementedError
+
+    def exists(self, key: str) -> bool:
+        raise NotImplementedError
+
+    def url(self, key: str) -> str:
+        """Public URL of `key`."""
+        raise NotImplementedError
+
+    def local_path(self, key: str) -> Optional[str]:
+        """Filesystem path of `key`, if the backend keeps files locally (None otherwise)."""
+        return None
+
+    def key_from_url(self, url: str) -> Optional[str]:
+        """Inverse of url(); None for URLs this backend didn't produce."""
+        raise NotImplementedError
+
+
+@register_backend("local")
+class LocalStorageBackend(StorageBackend):
+    """Files under `root` (UPLOAD_DIR), served at /uploads/<key>"""
+
+    URL_PREFIX = "/uploads/"
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or settings.UPLOAD_DIR
+
+    def _path(self, key: str) -> str:
+        path = os.path.normpath(os.path.join(self.root, key))
+        if not path.startswith(os.path.normpath(self.root) + os.sep):
+            raise ValueError(f"Storage key escapes the upload directory: {key!r}")
+        return path
+
+    def put_file(self, path: str, key: str, content_type: Optional[str] = None) -> None:
+        dest = self._path(key)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        # A rename when the temp dir is on the same filesystem (the default)
+        if os.stat(path).st_dev == os.stat(os.path.dirname(dest)).st_dev:
+            os.replace(path, dest)
+        else:
+            shutil.copyfile(path, dest)
+            os.remove(path)
+
+    def open(self, key: str) -> BinaryIO:
+        return open(self._path(key), "rb")
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def url(self, key: str) -> str:
+        return f"{self.URL_PREFIX}{key}"
+
+    def local_path(self, key: str) -> Optional[str]:
+        return self._path(key)
+
+    def key_from_url(self, url: str) -> Optional[str]:
+        if url and url.startswith(self.URL_PREFIX):
+            return url[len(self.URL_PREFIX):]
+        return None
+
+
+def get_backend(name: Optional[str] = None) -> StorageBackend:
+    """Instantiate the backend registered as `name` (default: STORAGE_BACKEND)."""
+    name = name or settings.STORAGE_BACKEND
+    backend_class = STORAGE_BACKENDS.get(name)
+    if backend_class is None:
+        raise ValueError(f"Unknown storage backend {name!r}")
+    return backend_class()
+
+
+@dataclass(frozen=True)
+class StoredUpload:
+    """A saved upload"""
+    key: str
+    url: str
+    size: int
+    sha256: str
+    content_type: Optional[str]
+
+
+class StorageService:
+    """
+    Saves uploads through a StorageBackend and tracks who uses them
+    """
+
+    def __init__(self, backend: Optional[StorageBackend] = None, tmp_dir: Optional[str] = None):
+        """
+        Args:
+            backend: Storage backend (default: the STORAGE_BACKEND one)
+            tmp_dir: Where uploads are streamed before they are accepted
+                (default: UPLOAD_DIR/.incoming, on the same filesystem so
+                the local backend can rename instead of copy)
+        """
+        self.backend = backend or get_backend()
+        self.tmp_dir = tmp_dir or settings.UPLOAD_TMP_DIR or os.path.join(settings.UPLOAD_DIR, ".incoming")
+
+    @staticmethod
+    def _check_extension(filename: Optional[str], allowed_extensions: Iterable[str]) -> str:
+        """
+        The extension is checked against an explicit allowlist - the client's
+        Content-Type header (checked separately by callers) is just a header
+        the client sets and can be spoofed.
+        """
+        ext = os.path.splitext(filename or "")[1].lower()
+        if ext not in allowed_extensions:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unsupported file extension: {ext or '(none)'}. "
+                       f"Allowed: {', '.join(sorted(allowed_extensions))}",
+            )
+        return ext
+
+    async def _spool(self, upload: UploadFile, max_size_bytes: Optional[int]):
+        """
+        Stream `upload` into a temporary file, hashing it on the way.
+
+        Returns:
+            (temporary path, size, sha256 hex digest)
+        """
+        await asyncio.to_thread(os.makedirs, self.tmp_dir, exist_ok=True)
+        path = os.path.join(self.tmp_dir, uuid.uuid4().hex)
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            async with aiofiles.open(path, "wb") as f:
+                while True:
+                    chunk = await upload.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if max_size_bytes and size > max_size_bytes:
+                        raise HTTPException(
+                            status_code=400,
+                            detail=f"File exceeds the maximum allowed size of "
+                                   f"{max_size_bytes // (1024 * 1024)}MB.",
+                        )
+                    await asyncio.to_thread(digest.update, chunk)
+                    await f.write(chunk)
+        except BaseException:
+            # Don't leave the partial file of a rejected or aborted upload behind
+            await self._discard(path)
+            raise
+        return path, size, digest.hexdigest()
+
+    @staticmethod
+    async def _discard(path: str) -> None:
+        try:
+            await asyncio.to_thread(os.remove, path)
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    async def _register(key: str, sha256: str, size: int, content_type: Optional[str]) -> None:
+        """
+        Create the file's row, or mark an existing one as just used, so the
+        collector leaves it alone until the caller has acquired it.
+        """
+        stmt = insert(StoredFile).values(
+            key=key, sha256=sha256, size=size, content_type=content_type, ref_count=0
+        )
+        async with AsyncSessionLocal() as db:
+            await db.execute(stmt.on_conflict_do_update(index_elements=["key"], set_={"updated_at": func.now()}))
+            await db.commit()
+
+    async def save_upload(
+            self,
+            upload: UploadFile,
+            subfolder: str,
+            allowed_extensions: Iterable[str],
+            max_size_bytes: Optional[int] = None,
+    ) -> StoredUpload:
+        """
+        Save an uploaded file under `subfolder`, reusing an identical stored file.
+
+        The caller must acquire() the returned URL when it stores it;
+        otherwise the file is collected after STORAGE_GC_GRACE_PERIOD.
+
+        Args:
+            upload: The request's file
+            subfolder: Key prefix (e.g. "avatars", "courses/videos")
+            allowed_extensions: Accepted extensions, with the dot
+            max_size_bytes: Size limit, enforced while streaming
+
+        Returns:
+            Where the file is stored, with its size and SHA-256
+        """
+        ext = self._check_extension(upload.filename, allowed_extensions)
+        path, size, sha256 = await self._spool(upload, max_size_bytes)
+
+        key = f"{subfolder}/{sha256[:2]}/{sha256}{ext}"
+        try:
+            await self._register(key, sha256, size, upload.content_type)
+            if await asyncio.to_thread(self.backend.exists, key):
+                await self._discard(path)  # Already stored: keep the existing copy
+            else:
+                await asyncio.to_thread(self.backend.put_file, path, key, upload.content_type)
+        except BaseException:
+            await self._discard(path)
+            raise
+        return StoredUpload(
+            key=key,
+            url=self.backend.url(key),
+            size=size,
+            sha256=sha256,
+            content_type=upload.content_type,
+        )
+
+    async def _adjust(self, db: AsyncSession, urls: Iterable[Optional[str]], delta: int) -> None:
+        keys = Counter(key for key in (self.backend.key_from_url(url) for url in urls if url) if key)
+        for key, count in keys.items():
+            # onupdate bumps updated_at, so the grace period runs from the last release
+            await db.execute(
+                update(StoredFile)
+                .where(StoredFile.key == key)
+                .values(ref_count=StoredFile.ref_count + delta * count)
+            )
+
+    async def acquire(self, db: AsyncSession, *urls: Optional[str]) -> None:
+        """
+        Count a new reference to each stored file in `urls`; commit with the
+        change that stores them. URLs without a stored_files row (external
+        or legacy uploads) are ignored.
+        """
+        await self._adjust(db, urls, 1)
+
+    async def release(self, db: AsyncSession, *urls: Optional[str]) -> None:
+        """Drop a reference to each stored file in `urls`; commit with the change that drops them."""
+        await self._adjust(db, urls, -1)
+
+    async def replace(self, db: AsyncSession, old_url: Optional[str], new_url: Optional[str]) -> None:
+        """release(old_url) + acquire(new_url), for a field changing value."""
+        if old_url != new_url:
+            await self.release(db, old_url)
+            await self.acquire(db, new_url)
+
+    def collect_garbage(self, batch_size: int = 500) -> int:
+        """
+        Delete files that have had no references for STORAGE_GC_GRACE_PERIOD
+        (blocking; runs in Celery).
+
+        Returns:
+            Number of files deleted
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=settings.STORAGE_GC_GRACE_PERIOD)
+        collected = 0
+        while True:
+            with SyncSessionLocal() as session:
+                # Locked until commit: a concurrent upload of the same file waits
+                rows = session.execute(
+                    select(StoredFile.id, StoredFile.key, StoredFile.variants)
+                    .where(StoredFile.ref_count <= 0, StoredFile.updated_at < cutoff)
+                    .order_by(StoredFile.updated_at)
+                    .limit(batch_size)
+                    .with_for_update(skip_locked=True)
+                ).all()
+                if not rows:
+                    return collected
+
+                deleted = []
+                for row in rows:
+                    # A variant is one file at "url", or several ("keys": HLS playlists and segments)
+                    variant_keys = set()
+                    for variant in (row.variants or {}).values():
+                        variant_keys.update(variant.get("keys") or [self.backend.key_from_url(variant["url"])])
+                    try:
+                        for key in variant_keys - {None}:
+                            self.backend.delete(key)
+                        self.backend.delete(row.key)
+                    except Exception as e:
+                        logger.warning(f"Could not delete stored file {row.key}: {e}")
+                        continue
+                    deleted.append(row.id)
+                if deleted:
+                    session.execute(delete(StoredFile).where(StoredFile.id.in_(deleted)))
+                session.commit()
+
+            collected += len(deleted)
+            if len(rows) < batch_size or not deleted:
+                return collected
+
+
+# Create singleton instance
+storage_service = StorageService()
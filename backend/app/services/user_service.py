@@ -1,14 +1,58 @@
 """
 User Service - Business logic for user operations
 """
-from typing import Optional, List
+from typing import Dict, Optional, List
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, update
 from sqlalchemy.exc import IntegrityError
 
+from app.models.gallery_photo import GalleryPhoto
+from app.models.merch import Merch
+from app.models.news import News
 from app.models.user import User, UserRole
 from app.schemas.user import UserCreate, UserUpdate
+from app.core.cache import response_cache
+from app.core.counting import invalidate_counts
 from app.core.password import get_password_hash, verify_password
+from app.core.principal import principal_cache
+from app.services.storage import storage_service
+
+# Response cache resource -> (model, owner column) of the content deleted
+# along with its user (User.news_articles / User.merches cascade)
+USER_CONTENT = {
+    "news": (News, News.author_id),
+    "merches": (Merch, Merch.owner_id),
+}
+
+
+async def release_user_files(db: AsyncSession, user: User) -> Dict[str, List[int]]:
+    """
+    Release the stored files of `user` and of the rows deleted with them
+    (gallery photos, news, merch); commit with the delete.
+
+    Returns:
+        The ids of the deleted news and merch per response cache resource,
+        for invalidate_deleted_user()
+    """
+    gallery = await db.scalars(select(GalleryPhoto.image_url).where(GalleryPhoto.user_id == user.id))
+    urls = [user.avatar_url, user.cover_url, user.passport_url, *gallery]
+    content = {}
+    for resource, (model, owner_column) in USER_CONTENT.items():
+        rows = (await db.execute(select(model.id, model.image_url).where(owner_column == user.id))).all()
+        urls.extend(row.image_url for row in rows)
+        content[resource] = [row.id for row in rows]
+    await storage_service.release(db, *urls)
+    return content
+
+
+async def invalidate_deleted_user(user_id: int, content: Dict[str, List[int]]) -> None:
+    """Call after committing the delete of a user: drops the cached counts, responses and principal."""
+    await invalidate_counts(User)
+    for resource, ids in content.items():
+        if ids:
+            await invalidate_counts(USER_CONTENT[resource][0])
+            await response_cache.invalidate(resource, *ids)
+    await principal_cache.invalidate(user_id)
 
 
 class UserService:
@@ -103,8 +147,10 @@ class UserService:
         if not user:
             return False
 
+        content = await release_user_files(self.db, user)
         await self.db.delete(user)
         await self.db.commit()
+        await invalidate_deleted_user(user_id, content)
 
         return True
 
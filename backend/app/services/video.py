@@ -0,0 +1,348 @@
+"""
+Course video transcoding
+
+upload_course stores the video as uploaded (mp4/webm/mov/avi, up to 500MB),
+and that one file used to be what every viewer got. After the course is
+committed, a Celery task (transcode_course_task) now runs ffmpeg on it:
+
+    - HLS renditions at VIDEO_HLS_RENDITIONS (360p/720p/1080p H.264 + AAC by
+      default, none above the source's resolution), cut into
+      VIDEO_HLS_SEGMENT_SECONDS segments with a keyframe at every boundary,
+      under one master playlist (Course.hls_manifest_url)
+    - a poster frame, used as the thumbnail when none was uploaded
+    - the duration (Course.duration_seconds), from ffprobe
+
+The outputs derive from the video's content: they are stored next to it
+("<sha>_hls/...", "<sha>_poster.jpg") and listed on its stored_files row, so
+an identical upload reuses them and the collector deletes them with it.
+
+A course can only be approved once transcode_status is ready (see
+review_course); admin uploads, which used to go live immediately, are
+approved here when transcoding completes (publish_when_ready). ffmpeg
+failing on a file marks the course failed, with its output in
+transcode_error; other errors (database, storage) are retried by the task,
+which marks the course failed once its retries run out. A course a broker
+outage never queued, or whose worker died, is queued again by
+requeue_stalled_transcodes (beat) after VIDEO_TRANSCODE_STALL_AFTER.
+"""
+import json
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from PIL import Image
+from sqlalchemy import func, select, update
+
+from app.core.cache import response_cache
+from app.core.config import settings
+from app.core.counting import invalidate_counts_sync
+from app.db.session import SyncSessionLocal
+from app.models.course import Course, CourseStatus, TranscodeStatus
+from app.models.stored_file import StoredFile
+from app.services.storage import CHUNK_SIZE, StorageBackend, storage_service
+
+logger = logging.getLogger(__name__)
+
+POSTER_MAX_WIDTH = 1280
+
+_CONTENT_TYPES = {
+    ".m3u8": "application/vnd.apple.mpegurl",
+    ".ts": "video/mp2t",
+}
+
+
+class TranscodeError(Exception):
+    """ffmpeg/ffprobe couldn't process the video."""
+
+
+@dataclass(frozen=True)
+class VideoInfo:
+    """What ffprobe says about a video"""
+    duration: float
+    width: int
+    height: int
+    has_audio: bool
+
+
+def _run(args: Sequence[str], timeout: Optional[int] = None) -> str:
+    """Run ffmpeg/ffprobe; TranscodeError with the end of its output if it fails."""
+    try:
+        result = subprocess.run(
+            args, capture_output=True, text=True, timeout=timeout or settings.VIDEO_TRANSCODE_TIMEOUT
+        )
+    except subprocess.TimeoutExpired:
+        raise TranscodeError(f"{os.path.basename(args[0])} timed out")
+    if result.returncode != 0:
+        raise TranscodeError("\n".join(result.stderr.strip().splitlines()[-20:]))
+    return result.stdout
+
+
+def probe(path: str) -> VideoInfo:
+    """Duration, frame size and audio presence of the video at `path`."""
+    info = json.loads(_run(
+        [settings.FFPROBE_BINARY, "-v", "error", "-print_format", "json", "-show_format", "-show_streams", path],
+        timeout=120,
+    ))
+    streams = info.get("streams", [])
+    video = next((stream for stream in streams if stream.get("codec_type") == "video"), None)
+    if video is None:
+        raise TranscodeError("The file has no video stream")
+    duration = info.get("format", {}).get("duration") or video.get("duration")
+    return VideoInfo(
+        duration=float(duration or 0),
+        width=int(video["width"]),
+        height=int(video["height"]),
+        has_audio=any(stream.get("codec_type") == "audio" for stream in streams),
+    )
+
+
+def _renditions(info: VideoInfo) -> List[Tuple[int, int, int]]:
+    """VIDEO_HLS_RENDITIONS up to the source's resolution (at least the smallest one)."""
+    renditions = sorted(settings.VIDEO_HLS_RENDITIONS)
+    short_side = min(info.width, info.height)
+    return [rendition for rendition in renditions if rendition[0] <= short_side] or renditions[:1]
+
+
+def _hls_command(source: str, out_dir: str, info: VideoInfo, renditions: List[Tuple[int, int, int]]) -> List[str]:
+    count = len(renditions)
+    segment = settings.VIDEO_HLS_SEGMENT_SECONDS
+    filters = [f"[0:v]split={count}" + "".join(f"[v{i}]" for i in range(count))]
+    for i, (side, _, _) in enumerate(renditions):
+        # Short side to `side` and the long one in proportion, so portrait
+        # (phone) videos get the same quality steps
+        filters.append(f"[v{i}]scale=w='if(gt(iw,ih),-2,{side})':h='if(gt(iw,ih),{side},-2)'[v{i}out]")
+
+    args = [settings.FFMPEG_BINARY, "-hide_banner", "-y", "-i", source, "-filter_complex", ";".join(filters)]
+    for i, (_, video_kbps, audio_kbps) in enumerate(renditions):
+        args += [
+            "-map", f"[v{i}out]", f"-c:v:{i}", "libx264", f"-b:v:{i}", f"{video_kbps}k",
+            f"-maxrate:v:{i}", f"{video_kbps * 107 // 100}k", f"-bufsize:v:{i}", f"{video_kbps * 2}k",
+        ]
+        if info.has_audio:
+            args += ["-map", "0:a:0", f"-c:a:{i}", "aac", f"-b:a:{i}", f"{audio_kbps}k"]
+    if info.has_audio:
+        args += ["-ac", "2"]
+
+    stream_map = " ".join(f"v:{i},a:{i}" if info.has_audio else f"v:{i}" for i in range(count))
+    return args + [
+        "-preset", "veryfast", "-profile:v", "main", "-pix_fmt", "yuv420p",
+        # A keyframe at every segment boundary, so players can switch renditions there
+        "-force_key_frames", f"expr:gte(t,n_forced*{segment})", "-sc_threshold", "0",
+        "-f", "hls", "-hls_time", str(segment), "-hls_playlist_type", "vod",
+        "-hls_flags", "independent_segments",
+        "-hls_segment_filename", os.path.join(out_dir, "v%v", "seg_%05d.ts"),
+        # Written next to the v%v directories
+        "-master_pl_name", "master.m3u8",
+        "-var_stream_map", stream_map,
+        os.path.join(out_dir, "v%v", "index.m3u8"),
+    ]
+
+
+def _poster_command(source: str, path: str, info: VideoInfo) -> List[str]:
+    # A little way in: the first frames are often black or a fade-in
+    at = min(info.duration * 0.1, 5.0)
+    return [
+        settings.FFMPEG_BINARY, "-hide_banner", "-y", "-ss", f"{at:.2f}", "-i", source,
+        "-frames:v", "1", "-vf", f"scale='min({POSTER_MAX_WIDTH},iw)':-2", "-q:v", "3", path,
+    ]
+
+
+def _store_tree(backend: StorageBackend, directory: str, prefix: str) -> List[str]:
+    """
+    Move the files under `directory` into storage under `prefix`. Playlists
+    go last, so none is visible before the segments it lists.
+
+    Returns:
+        The stored keys
+    """
+    paths = [os.path.join(root, name) for root, _, names in os.walk(directory) for name in names]
+    # Segments, then rendition playlists, then the master playlist
+    paths.sort(key=lambda path: (path.endswith(".m3u8"), os.path.basename(path) == "master.m3u8", path))
+    keys = []
+    for path in paths:
+        key = f"{prefix}/{os.path.relpath(path, directory).replace(os.sep, '/')}"
+        backend.put_file(path, key, _CONTENT_TYPES.get(os.path.splitext(path)[1]))
+        keys.append(key)
+    return keys
+
+
+def transcode_video(key: str, backend: Optional[StorageBackend] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Make the HLS renditions and poster of the stored video `key`.
+
+    Returns:
+        {"hls": {"url", "keys", "duration"}, "poster": {"url", "width", "height"}}
+
+    Raises:
+        TranscodeError: ffmpeg/ffprobe failed on the file
+    """
+    backend = backend or storage_service.backend
+    base = os.path.splitext(key)[0]
+    os.makedirs(storage_service.tmp_dir, exist_ok=True)
+    # In the upload temp dir: same filesystem as the local backend, so the
+    # outputs are renamed into place rather than copied
+    with tempfile.TemporaryDirectory(dir=storage_service.tmp_dir) as work_dir:
+        source = backend.local_path(key)
+        if source is None:
+            source = os.path.join(work_dir, "source" + os.path.splitext(key)[1])
+            with backend.open(key) as src, open(source, "wb") as dst:
+                shutil.copyfileobj(src, dst, CHUNK_SIZE)
+
+        info = probe(source)
+        renditions = _renditions(info)
+        hls_dir = os.path.join(work_dir, "hls")
+        for i in range(len(renditions)):
+            os.makedirs(os.path.join(hls_dir, f"v{i}"))
+        _run(_hls_command(source, hls_dir, info, renditions))
+
+        poster_path = os.path.join(work_dir, "poster.jpg")
+        _run(_poster_command(source, poster_path, info), timeout=120)
+        with Image.open(poster_path) as poster:
+            poster_width, poster_height = poster.size
+
+        hls_keys = _store_tree(backend, hls_dir, f"{base}_hls")
+        poster_key = f"{base}_poster.jpg"
+        backend.put_file(poster_path, poster_key, "image/jpeg")
+
+    return {
+        "hls": {"url": backend.url(f"{base}_hls/master.m3u8"), "keys": hls_keys, "duration": info.duration},
+        "poster": {"url": backend.url(poster_key), "width": poster_width, "height": poster_height},
+    }
+
+
+def _finish(
+        course_id: uuid.UUID,
+        outputs: Optional[Dict[str, Dict[str, Any]]] = None,
+        error: Optional[str] = None,
+) -> TranscodeStatus:
+    """Record the outcome on the course (ready with `outputs`, else failed with `error`)."""
+    if outputs is None:
+        values = {"transcode_status": TranscodeStatus.failed, "transcode_error": error}
+    else:
+        values = {
+            "transcode_status": TranscodeStatus.ready,
+            "transcode_error": None,
+            "hls_manifest_url": outputs["hls"]["url"],
+            "duration_seconds": round(outputs["hls"]["duration"]),
+            # The poster only stands in for a missing thumbnail
+            "thumbnail_url": func.coalesce(Course.thumbnail_url, outputs["poster"]["url"]),
+        }
+
+    with SyncSessionLocal() as session:
+        session.execute(update(Course).where(Course.id == course_id).values(**values))
+        if outputs is not None:
+            # Admin uploads go live now
+            session.execute(
+                update(Course)
+                .where(Course.id == course_id, Course.publish_when_ready, Course.status == CourseStatus.pending)
+                .values(status=CourseStatus.approved, publish_when_ready=False)
+            )
+        session.commit()
+
+    invalidate_counts_sync(Course)
+    response_cache.invalidate_sync("courses", course_id)
+    return values["transcode_status"]
+
+
+def transcode_course(course_id: str) -> Optional[TranscodeStatus]:
+    """
+    Transcode a course's video, or reuse the outputs of an identical upload,
+    and record them on the course (blocking; runs in Celery).
+
+    Returns:
+        The course's transcode status afterwards; None if it was deleted
+    """
+    backend = storage_service.backend
+    course_uuid = uuid.UUID(course_id)
+
+    with SyncSessionLocal() as session:
+        course = session.execute(
+            select(Course.video_url, Course.transcode_status).where(Course.id == course_uuid)
+        ).one_or_none()
+        if course is None:
+            return None
+        if course.transcode_status == TranscodeStatus.ready:
+            return TranscodeStatus.ready
+        session.execute(
+            update(Course)
+            .where(Course.id == course_uuid)
+            .values(transcode_status=TranscodeStatus.processing, transcode_error=None)
+        )
+        session.commit()
+
+        key = backend.key_from_url(course.video_url)
+        stored = session.execute(
+            select(StoredFile.id, StoredFile.variants).where(StoredFile.key == key)
+        ).one_or_none() if key else None
+
+    if stored is None:
+        return _finish(course_uuid, error="The video is not in upload storage")
+
+    outputs = stored.variants if stored.variants and "hls" in stored.variants else None
+    if outputs is None:
+        try:
+            outputs = transcode_video(key, backend)
+        except TranscodeError as e:
+            logger.warning(f"Could not transcode course {course_id}: {e}")
+            return _finish(course_uuid, error=str(e))
+        with SyncSessionLocal() as session:
+            session.execute(update(StoredFile).where(StoredFile.id == stored.id).values(variants=outputs))
+            session.commit()
+
+    return _finish(course_uuid, outputs=outputs)
+
+
+def fail_transcode(course_id: str, error: str) -> None:
+    """Mark a course's transcoding failed, for an error the task stopped retrying (blocking)."""
+    _finish(uuid.UUID(course_id), error=error)
+
+
+def requeue_stalled_transcodes() -> int:
+    """
+    Queue transcoding again for courses pending or processing for
+    VIDEO_TRANSCODE_STALL_AFTER: never queued (broker outage), or their
+    worker died mid-run (blocking; runs in Celery). Review only approves a
+    ready course, so without this they'd wait forever.
+
+    Returns:
+        Number of courses queued
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=settings.VIDEO_TRANSCODE_STALL_AFTER)
+    with SyncSessionLocal() as session:
+        # Back to pending, which bumps updated_at: the next sweeps leave
+        # them alone for another VIDEO_TRANSCODE_STALL_AFTER
+        course_ids = session.scalars(
+            update(Course)
+            .where(
+                Course.transcode_status.in_((TranscodeStatus.pending, TranscodeStatus.processing)),
+                Course.updated_at < cutoff,
+            )
+            .values(transcode_status=TranscodeStatus.pending)
+            .returning(Course.id)
+        ).all()
+        session.commit()
+
+    for course_id in course_ids:
+        logger.warning(f"Requeueing stalled transcoding of course {course_id}")
+        schedule_transcode(course_id)
+    return len(course_ids)
+
+
+def schedule_transcode(course_id: Any) -> None:
+    """
+    Queue transcoding of a course's video; call after committing the course.
+    A broker outage leaves the course pending until
+    requeue_stalled_transcodes queues it, so it is logged.
+    """
+    from app.workers.tasks import transcode_course_task
+
+    try:
+        transcode_course_task.delay(str(course_id))
+    except Exception as e:
+        logger.warning(f"Could not queue transcoding of course {course_id}: {e}")
@@ -4,7 +4,8 @@ from app.core.config import settings
 celery_app = Celery(
     "sport_portal_worker",
     broker=settings.CELERY_BROKER_URL,
-    backend=settings.CELERY_RESULT_BACKEND
+    backend=settings.CELERY_RESULT_BACKEND,
+    include=["app.workers.tasks"],
 )
 
 celery_app.conf.update(
@@ -12,4 +13,18 @@ celery_app.conf.update(
     result_serializer=settings.CELERY_RESULT_SERIALIZER,
     timezone=settings.CELERY_TIMEZONE,
     enable_utc=True,
+    beat_schedule={
+        "flush-view-counts": {
+            "task": "app.workers.tasks.flush_view_counts_task",
+            "schedule": settings.VIEW_COUNT_FLUSH_INTERVAL,
+        },
+        "collect-unreferenced-files": {
+            "task": "app.workers.tasks.collect_unreferenced_files_task",
+            "schedule": settings.STORAGE_GC_INTERVAL,
+        },
+        "requeue-stalled-transcodes": {
+            "task": "app.workers.tasks.requeue_stalled_transcodes_task",
+            "schedule": settings.VIDEO_TRANSCODE_SWEEP_INTERVAL,
+        },
+    },
 )
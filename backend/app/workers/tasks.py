@@ -1,4 +1,9 @@
 from app.workers.celery_app import celery_app
+from app.core.view_counter import view_counter
+from app.core.content_translation import translate_content
+from app.services.images import process_image
+from app.services.storage import storage_service
+from app.services.video import fail_transcode, requeue_stalled_transcodes, transcode_course
 
 @celery_app.task
 def send_email_task(email: str, subject: str, body: str):
@@ -11,3 +16,53 @@ def process_payment_task(transaction_id: int):
     """Process payment asynchronously"""
     print(f"Processing payment for transaction {transaction_id}")
     return True
+
+@celery_app.task
+def flush_view_counts_task():
+    """Write buffered news/course view counts to the database"""
+    flushed = view_counter.flush()
+    print(f"Flushed view counts: {flushed}")
+    return flushed
+
+@celery_app.task(bind=True, max_retries=3, default_retry_delay=60)
+def translate_content_task(self, resource: str, object_id: str):
+    """Store en/ru translations of a news/course/education/job vacancy row"""
+    try:
+        return translate_content(resource, object_id)
+    except Exception as e:
+        raise self.retry(exc=e)
+
+@celery_app.task
+def collect_unreferenced_files_task():
+    """Delete uploads no row has referenced for STORAGE_GC_GRACE_PERIOD"""
+    collected = storage_service.collect_garbage()
+    print(f"Collected unreferenced files: {collected}")
+    return collected
+
+@celery_app.task(bind=True, max_retries=3, default_retry_delay=60)
+def process_image_task(self, url: str):
+    """Make the WebP variants of an uploaded avatar/cover/gallery photo"""
+    try:
+        return process_image(url)
+    except Exception as e:
+        raise self.retry(exc=e)
+
+@celery_app.task(bind=True, max_retries=3, default_retry_delay=300)
+def transcode_course_task(self, course_id: str):
+    """HLS renditions, poster and duration of an uploaded course video"""
+    try:
+        status = transcode_course(course_id)
+    except Exception as e:
+        if self.request.retries >= self.max_retries:
+            # Out of retries: the course must not stay processing
+            fail_transcode(course_id, str(e) or type(e).__name__)
+            raise
+        raise self.retry(exc=e)
+    return status.value if status else None
+
+@celery_app.task
+def requeue_stalled_transcodes_task():
+    """Queue transcoding again for courses stuck pending/processing"""
+    queued = requeue_stalled_transcodes()
+    print(f"Requeued stalled transcodes: {queued}")
+    return queued
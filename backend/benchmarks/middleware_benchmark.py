@@ -0,0 +1,156 @@
+"""
+Middleware overhead benchmark
+
+Serves a trivial endpoint through two otherwise identical apps and reports
+requests/s and latency percentiles for each:
+
+    legacy  the former @app.middleware("http") pair (timing + rate limiting)
+    asgi    RequestContextMiddleware (timing + rate limiting + request ids)
+
+Requests are sent in-process through httpx's ASGI transport, so the numbers
+are middleware and framework cost only, without sockets or a server.
+
+Needs Redis at REDIS_URL: both apps rate limit for real, with limits raised
+so nothing is rejected. Keys go under a throwaway prefix and are removed
+afterwards.
+
+Usage (from backend/):
+    python -m benchmarks.middleware_benchmark
+    python -m benchmarks.middleware_benchmark --mode asgi --requests 20000 --concurrency 64
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from typing import Callable, Dict, List
+
+import httpx
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse
+
+from app.core.config import settings
+from app.core.middleware import RequestContextMiddleware
+from app.core.rate_limiter import RateLimiter, limits_for_path, rate_limit_identity
+from app.core.redis import get_redis
+
+
+def build_app(mode: str, rate_limiter: RateLimiter) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    if mode == "asgi":
+        app.add_middleware(RequestContextMiddleware, rate_limiter=rate_limiter)
+        return app
+
+    # The middleware as it was in main.py before RequestContextMiddleware
+    @app.middleware("http")
+    async def add_process_time_header(request: Request, call_next: Callable):
+        start_time = time.time()
+        response = await call_next(request)
+        process_time = time.time() - start_time
+        response.headers["X-Process-Time"] = str(process_time)
+        return response
+
+    @app.middleware("http")
+    async def rate_limit_middleware(request: Request, call_next: Callable):
+        identity = rate_limit_identity(
+            request.headers.get("authorization"),
+            request.client.host if request.client else None,
+        )
+        result = await rate_limiter.check(identity, limits_for_path(request.url.path))
+        if result is None:
+            return await call_next(request)
+        if not result.allowed:
+            return JSONResponse(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                content={"detail": "Rate limit exceeded. Please try again later."},
+                headers=result.headers,
+            )
+        response = await call_next(request)
+        response.headers.update(result.headers)
+        return response
+
+    return app
+
+
+async def run(mode: str, args) -> Dict[str, float]:
+    rate_limiter = RateLimiter()
+    rate_limiter.prefix = f"rl-bench:{uuid.uuid4().hex}:"
+    if args.prefilter:
+        rate_limiter.start_sync()
+
+    app = build_app(mode, rate_limiter)
+    transport = httpx.ASGITransport(app=app)
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    remaining = args.requests
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Warm up routing, the Lua script and the pre-filter
+        for _ in range(50):
+            await client.get("/ping")
+
+        async def worker():
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                started = time.perf_counter()
+                response = await client.get("/ping")
+                latencies.append(time.perf_counter() - started)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        try:
+            started = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+            elapsed = time.perf_counter() - started
+        finally:
+            await rate_limiter.stop_sync()
+            redis = get_redis()
+            keys = [key async for key in redis.scan_iter(match=f"{rate_limiter.prefix}*")]
+            if keys:
+                await redis.delete(*keys)
+
+    latencies.sort()
+    return {
+        "req/s": len(latencies) / elapsed,
+        "p50 ms": statistics.median(latencies) * 1000,
+        "p99 ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+        "non-200": sum(count for code, count in statuses.items() if code != 200),
+    }
+
+
+async def run_all(modes: List[str], args):
+    for mode in modes:
+        stats = await run(mode, args)
+        print(f"{mode:>6}: " + "  ".join(
+            f"{name}={value:.3f}" if isinstance(value, float) else f"{name}={value}"
+            for name, value in stats.items()
+        ))
+    await get_redis().close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=["legacy", "asgi", "both"], default="both")
+    parser.add_argument("--requests", type=int, default=10000)
+    parser.add_argument("--concurrency", type=int, default=32, help="requests in flight")
+    parser.add_argument(
+        "--no-prefilter", dest="prefilter", action="store_false",
+        help="check every request against Redis instead of the per-worker pre-filter",
+    )
+    args = parser.parse_args()
+
+    # Measure the allowed path only
+    settings.RATE_LIMIT_PER_MINUTE = settings.RATE_LIMIT_PER_HOUR = 10 ** 9
+
+    modes = ["legacy", "asgi"] if args.mode == "both" else [args.mode]
+    # One event loop for all modes: the shared Redis client is bound to it
+    asyncio.run(run_all(modes, args))
+
+
+if __name__ == "__main__":
+    main()
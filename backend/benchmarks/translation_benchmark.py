@@ -0,0 +1,150 @@
+"""
+Translation throughput benchmark
+
+Translates synthetic list pages through TranslationService with the offline
+backend (simulated network latency, no external service), and reports
+throughput, latency percentiles, cache hit ratio and backend calls, so
+batching/caching changes can be compared run to run.
+
+Needs Redis at REDIS_URL (keys go under a throwaway prefix and are removed
+afterwards); the Postgres translation store is not used.
+
+Usage (from backend/):
+    python -m benchmarks.translation_benchmark
+    python -m benchmarks.translation_benchmark --mode both --pages 500 --latency-ms 200
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import threading
+import time
+import uuid
+from typing import Dict, List
+
+from app.core.translation import TranslationService
+from app.core.translation_backends import OfflineBackend
+
+FIELDS = ["title", "description", "content"]
+WORDS = (
+    "sport milliy terma jamoa chempionat futbol kurash boks yengil atletika "
+    "murabbiy sportchi musobaqa g'alaba medal oltin kumush bronza mashg'ulot "
+    "stadion o'yin final yarim hafta yil toshkent samarqand buxoro andijon "
+    "yosh iqtidorli olimpiada rekord natija jahon osiyo kubogi"
+).split()
+
+
+class CountingBackend(OfflineBackend):
+    """Offline backend that counts what actually reaches the "network"."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.texts = 0
+
+    def translate_batch(self, texts, source_lang, target_lang):
+        with self._lock:
+            self.calls += 1
+            self.texts += len(texts)
+        return super().translate_batch(texts, source_lang, target_lang)
+
+
+def build_vocabulary(size: int, rng: random.Random) -> List[str]:
+    return [" ".join(rng.choices(WORDS, k=rng.randint(4, 24))) + f" {i}" for i in range(size)]
+
+
+def build_pages(pages: int, items: int, vocabulary: List[str], rng: random.Random) -> List[List[Dict[str, str]]]:
+    """Pages of items whose fields repeat with a skewed (popular-first) distribution."""
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    return [
+        [
+            {field: text for field, text in zip(FIELDS, rng.choices(vocabulary, weights=weights, k=len(FIELDS)))}
+            for _ in range(items)
+        ]
+        for _ in range(pages)
+    ]
+
+
+async def translate_sequential(service: TranslationService, page, lang: str):
+    """The pre-batching path: one awaited translate() per field of every item."""
+    result = []
+    for item in page:
+        translated = dict(item)
+        for field in FIELDS:
+            translated[field] = await service.translate(item[field], lang)
+        result.append(translated)
+    return result
+
+
+async def translate_batched(service: TranslationService, page, lang: str):
+    return await service.translate_list(page, lang, fields_to_translate=FIELDS)
+
+
+async def run(mode: str, pages, args) -> Dict[str, float]:
+    backend = CountingBackend(latency=args.latency_ms / 1000, per_text_latency=args.per_text_ms / 1000)
+    service = TranslationService(backend=backend, persist=False)
+    service.cache_prefix = f"translation-bench:{uuid.uuid4().hex}:"
+    service.batch_size = args.batch_size
+    translate = translate_batched if mode == "batched" else translate_sequential
+
+    limiter = asyncio.Semaphore(args.concurrency)
+    latencies: List[float] = []
+
+    async def one(page):
+        async with limiter:
+            started = time.perf_counter()
+            await translate(service, page, args.lang)
+            latencies.append(time.perf_counter() - started)
+
+    try:
+        started = time.perf_counter()
+        await asyncio.gather(*(one(page) for page in pages))
+        elapsed = time.perf_counter() - started
+    finally:
+        redis = await service._get_redis()
+        keys = [key async for key in redis.scan_iter(match=f"{service.cache_prefix}*")]
+        if keys:
+            await redis.delete(*keys)
+        await redis.close()
+
+    requested = sum(len(page) for page in pages) * len(FIELDS)
+    latencies.sort()
+    return {
+        "pages/s": len(pages) / elapsed,
+        "items/s": len(pages) * args.items / elapsed,
+        "p50 ms": statistics.median(latencies) * 1000,
+        "p99 ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+        "hit ratio": 1 - backend.texts / requested,
+        "backend calls": backend.calls,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=["batched", "sequential", "both"], default="batched")
+    parser.add_argument("--pages", type=int, default=200, help="list pages to translate")
+    parser.add_argument("--items", type=int, default=20, help="items per page")
+    parser.add_argument("--vocabulary", type=int, default=2000, help="distinct source strings")
+    parser.add_argument("--concurrency", type=int, default=8, help="pages translated at once")
+    parser.add_argument("--batch-size", type=int, default=10, help="texts per backend call")
+    parser.add_argument("--latency-ms", type=float, default=150, help="simulated round-trip per backend call")
+    parser.add_argument("--per-text-ms", type=float, default=5, help="simulated extra time per text")
+    parser.add_argument("--lang", default="en")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    pages = build_pages(args.pages, args.items, build_vocabulary(args.vocabulary, rng), rng)
+    modes = ["sequential", "batched"] if args.mode == "both" else [args.mode]
+
+    for mode in modes:
+        stats = asyncio.run(run(mode, pages, args))
+        print(f"{mode:>10}: " + "  ".join(
+            f"{name}={value:.3f}" if isinstance(value, float) else f"{name}={value}"
+            for name, value in stats.items()
+        ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Rows for tests, with every required column filled in; keyword arguments override."""
+import itertools
+
+import bcrypt
+from sqlalchemy.orm import Session
+
+from app.models.course import Course, CourseStatus, SportType
+from app.models.merch import Merch
+from app.models.news import News
+from app.models.user import User, UserRole
+
+_sequence = itertools.count(1)
+
+# Hashed like /auth/register does (at the lowest cost); every test user shares it
+PASSWORD = "secret-password"
+_PASSWORD_HASH = bcrypt.hashpw(PASSWORD.encode("utf-8"), bcrypt.gensalt(rounds=4)).decode("utf-8")
+
+
+def _add(session: Session, row):
+    session.add(row)
+    session.flush()
+    return row
+
+
+def make_user(session: Session, **fields) -> User:
+    n = next(_sequence)
+    return _add(session, User(**{
+        "email": f"user{n}@example.com",
+        "hashed_password": _PASSWORD_HASH,
+        "full_name": f"User {n}",
+        "role": UserRole.ATHLETE,
+        **fields,
+    }))
+
+
+def make_news(session: Session, **fields) -> News:
+    n = next(_sequence)
+    return _add(session, News(**{
+        "title": f"News {n}",
+        "slug": f"news-{n}",
+        "content": f"Content of news {n}",
+        **fields,
+    }))
+
+
+def make_merch(session: Session, **fields) -> Merch:
+    n = next(_sequence)
+    return _add(session, Merch(**{
+        "name": f"Merch {n}",
+        "brand": "Brand",
+        "price": 100000,
+        "stock": 10,
+        **fields,
+    }))
+
+
+def make_course(session: Session, **fields) -> Course:
+    n = next(_sequence)
+    return _add(session, Course(**{
+        "title": f"Course {n}",
+        "sport_type": SportType.futbol,
+        "video_url": f"/uploads/courses/video{n}.mp4",
+        "status": CourseStatus.approved,
+        **fields,
+    }))
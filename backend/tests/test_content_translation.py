@@ -0,0 +1,71 @@
+"""Write-time translation shares the translation caches with read-time translation"""
+from typing import List
+
+import pytest
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.content_translation import translate_content
+from app.core.translation import translation_service
+from app.core.translation_backends import TranslationBackend
+from app.models.content_translation import ContentTranslation
+from tests.factories import make_news
+
+
+class RecordingBackend(TranslationBackend):
+    """Prefixes the target language; records what was sent and can fail after a number of batches."""
+    name = "recording"
+
+    def __init__(self, fail_after: int = -1):
+        self.sent: List[str] = []
+        self.fail_after = fail_after
+
+    def translate_batch(self, texts: List[str], source_lang: str, target_lang: str) -> List[str]:
+        if self.fail_after == 0:
+            raise RuntimeError("backend unavailable")
+        self.fail_after -= 1
+        self.sent.extend(texts)
+        return [f"[{target_lang}] {text}" for text in texts]
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    backend = RecordingBackend()
+    monkeypatch.setattr(translation_service, "backend", backend)
+    return backend
+
+
+def test_text_shared_between_rows_is_translated_once(db_session, backend):
+    first = make_news(db_session, title="Olimpiada natijalari")
+    second = make_news(db_session, title="Olimpiada natijalari")
+    db_session.commit()
+
+    translate_content("news", str(first.id))
+    translate_content("news", str(second.id))
+
+    assert backend.sent.count("Olimpiada natijalari") == len(settings.CONTENT_TRANSLATION_LANGUAGES)
+    titles = db_session.scalars(
+        select(ContentTranslation.text).where(ContentTranslation.field == "title", ContentTranslation.lang == "en")
+    ).all()
+    assert titles == ["[en] Olimpiada natijalari"] * 2
+
+
+def test_retry_only_sends_what_is_still_missing(db_session, backend, monkeypatch):
+    news = make_news(db_session, title="Sarlavha", snippet="Qisqacha", content="Matn")
+    db_session.commit()
+    monkeypatch.setattr(translation_service, "batch_size", 1)
+    backend.fail_after = 2
+
+    with pytest.raises(RuntimeError):
+        translate_content("news", str(news.id))
+    assert backend.sent == ["Sarlavha", "Qisqacha"]
+
+    backend.sent.clear()
+    backend.fail_after = -1
+    translate_content("news", str(news.id))
+
+    # English: only the field that failed; then Russian in full
+    assert backend.sent == ["Matn", "Sarlavha", "Qisqacha", "Matn"]
+    assert db_session.scalar(
+        select(ContentTranslation.text).where(ContentTranslation.field == "content", ContentTranslation.lang == "en")
+    ) == "[en] Matn"
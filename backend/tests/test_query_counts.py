@@ -0,0 +1,94 @@
+"""
+SQL statements per API request
+
+Every endpoint should run a fixed number of statements however many rows it
+returns (no lazy load per row), and load nested users with the smallest
+UserLoad profile that covers what it serializes. Redis is unavailable in the
+tests, so the counts include the queries the caches normally save (e.g.
+the current user, the direct view-count UPDATE).
+"""
+import pytest
+
+from app.models.course import CourseStatus
+from app.models.user import UserRole
+from tests.factories import make_course, make_merch, make_news, make_user
+
+ROWS = 5
+
+
+@pytest.fixture
+def seeded(db_session):
+    """
+    ROWS news, merch items, approved and pending courses, each by a
+    different trainer; the approved courses are reviewed by an admin.
+    """
+    admin = make_user(db_session, role=UserRole.ADMIN, is_superuser=True)
+    ids = {"admin": admin.email}
+    for _ in range(ROWS):
+        trainer = make_user(db_session, role=UserRole.TRAINER)
+        ids.update(trainer=trainer.email, user=trainer.id)
+        ids["news"] = make_news(db_session, author_id=trainer.id).id
+        ids["merch"] = make_merch(db_session, owner_id=trainer.id).id
+        ids["course"] = make_course(db_session, uploaded_by_id=trainer.id, reviewed_by_id=admin.id).id
+        make_course(db_session, uploaded_by_id=trainer.id, status=CourseStatus.pending)
+    db_session.commit()
+    return ids
+
+
+def _loads_whole_user(statement: str) -> bool:
+    # Only AUTH and PROFILE loads read the password hash; a JOIN means an
+    # eager relationship (e.g. Course.reviewed_by) rode along
+    return "users.hashed_password" in statement or "JOIN users" in statement
+
+
+# (path, statements). Lists: count + page + one IN query for the nested
+# users. Details: validators + row (+ nested users) + direct view count.
+PUBLIC_ENDPOINTS = [
+    ("/api/v1/news/", 3),
+    ("/api/v1/news/{news}/", 4),
+    ("/api/v1/courses", 3),
+    ("/api/v1/courses/{course}", 4),
+    ("/api/v1/merches/", 2),
+    ("/api/v1/merches/{merch}", 2),
+]
+
+
+@pytest.mark.parametrize("path, expected", PUBLIC_ENDPOINTS)
+async def test_public_endpoint_statements(client, seeded, statements, path, expected):
+    response = await client.get(path.format(**seeded))
+
+    assert response.status_code == 200, response.text
+    assert len(statements) == expected, statements.statements
+    assert not any(_loads_whole_user(statement) for statement in statements.statements)
+
+
+async def test_login_loads_auth_columns_only(login, seeded, statements):
+    await login(seeded["admin"])
+
+    assert len(statements) == 1
+    assert "users.full_name" not in statements.statements[0]
+
+
+# (path, who, statements): the current user (a full row, as Redis can't serve
+# the principal), then as above.
+AUTHENTICATED_ENDPOINTS = [
+    ("/api/v1/users/me", "trainer", 3),
+    ("/api/v1/users/{user}/", "trainer", 3),
+    ("/api/v1/courses/my", "trainer", 4),
+    ("/api/v1/news/my/articles", "trainer", 4),
+    ("/api/v1/courses/admin/pending", "admin", 4),
+    ("/api/v1/courses/admin/all", "admin", 4),
+]
+
+
+@pytest.mark.parametrize("path, who, expected", AUTHENTICATED_ENDPOINTS)
+async def test_authenticated_endpoint_statements(client, login, seeded, statements, path, who, expected):
+    headers = await login(seeded[who])
+    statements.clear()
+
+    response = await client.get(path.format(**seeded), headers=headers)
+
+    assert response.status_code == 200, response.text
+    assert len(statements) == expected, statements.statements
+    # Only the current user (and a requested profile) is a whole row
+    assert sum(_loads_whole_user(statement) for statement in statements.statements) <= 2
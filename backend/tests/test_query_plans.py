@@ -0,0 +1,201 @@
+"""
+Query plans of the list endpoints on large tables
+
+Seeds ROWS rows into each large table, then EXPLAINs every statement an
+endpoint runs (with its actual parameters) and fails on a sequential scan
+of a large table: the composite/partial indexes of migration 8f2c4e6a1d93,
+the search GIN indexes and the primary keys must serve the card selects,
+search filters, keyset pages and counts.
+"""
+import itertools
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import insert, text
+
+from app.db.session import SyncSessionLocal, engine
+from app.models.cart import Cart
+from app.models.course import Course, CourseStatus, SportType
+from app.models.education import Education, EducationType, Region
+from app.models.favorite import Favorite
+from app.models.job_vacancy import EmploymentType, JobSportType, JobVacancy
+from app.models.merch import Merch
+from app.models.news import News, NewsCategory
+from app.models.user import User, UserRole
+from tests.conftest import truncate_all
+from tests.factories import make_user
+
+ROWS = 20000
+USERS = 5000
+# Words in one title out of SEARCH_WORDS, for selective search terms
+SEARCH_WORDS = 2000
+
+LARGE_TABLES = ("users", "news", "merches", "courses", "job_vacancies", "education", "cart", "favorites")
+
+
+def _rows(count: int, make):
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    return [{"created_at": start + timedelta(minutes=i), "updated_at": start + timedelta(minutes=i), **make(i)}
+            for i in range(count)]
+
+
+@pytest.fixture(scope="module")
+def large_tables(database):
+    """ROWS rows per large table (USERS users), vacuumed and analyzed."""
+    rng = random.Random(11)
+    with database.begin() as connection:
+        user_ids = connection.execute(
+            insert(User).returning(User.id),
+            _rows(USERS, lambda i: {
+                "email": f"seed{i}@example.com", "hashed_password": "x", "full_name": f"Seed User {i}",
+                "role": list(UserRole)[i % len(UserRole)],
+            }),
+        ).scalars().all()
+        connection.execute(insert(News), _rows(ROWS, lambda i: {
+            "title": f"Article word{i % SEARCH_WORDS}", "slug": f"article-{i}", "content": "Text",
+            "category": list(NewsCategory)[i % len(NewsCategory)], "author_id": rng.choice(user_ids),
+        }))
+        merch_ids = connection.execute(insert(Merch).returning(Merch.id), _rows(ROWS, lambda i: {
+            "name": f"Item word{i % SEARCH_WORDS}", "brand": "Brand", "price": 1000, "stock": 1,
+            "is_available": i % 10 != 0, "is_new": i % 50 == 0, "discount_percent": 20 if i % 40 == 0 else 0,
+            "owner_id": rng.choice(user_ids),
+        })).scalars().all()
+        connection.execute(insert(Course), _rows(ROWS, lambda i: {
+            "title": f"Course word{i % SEARCH_WORDS}", "video_url": f"/uploads/courses/{i}.mp4",
+            "sport_type": list(SportType)[i % len(SportType)],
+            "status": CourseStatus.pending if i % 20 == 0 else CourseStatus.approved,
+            "uploaded_by_id": rng.choice(user_ids),
+        }))
+        connection.execute(insert(JobVacancy), _rows(ROWS, lambda i: {
+            "title": f"Vacancy word{i % SEARCH_WORDS}", "description": "Text", "company": "Club", "contact": "+998",
+            "region": list(Region)[i % len(Region)],
+            "employment_type": list(EmploymentType)[i % len(EmploymentType)],
+            "sport_type": list(JobSportType)[i % len(JobSportType)],
+            "is_active": i % 5 != 0,
+        }))
+        connection.execute(insert(Education), _rows(ROWS, lambda i: {
+            "name": f"School word{i % SEARCH_WORDS}", "region": list(Region)[i % len(Region)],
+            "type": list(EducationType)[i % len(EducationType)],
+        }))
+        pairs = rng.sample(list(itertools.product(user_ids, merch_ids[:100])), ROWS)
+        for model in (Cart, Favorite):
+            connection.execute(insert(model), _rows(ROWS, lambda i: {"user_id": pairs[i][0], "merch_id": pairs[i][1]}))
+
+    with database.connect() as connection:
+        connection.execution_options(isolation_level="AUTOCOMMIT").execute(text("VACUUM ANALYZE"))
+    yield user_ids
+    truncate_all(database)
+
+
+@pytest.fixture
+def member(large_tables):
+    """An admin with a cart item and a favorite, among everyone else's rows."""
+    # Not db_session, which would empty the module's tables afterwards
+    with SyncSessionLocal() as session:
+        user = make_user(session, role=UserRole.ADMIN, is_superuser=True)
+        merch_id = session.execute(text("SELECT min(id) FROM merches")).scalar_one()
+        session.add_all([Cart(user_id=user.id, merch_id=merch_id), Favorite(user_id=user.id, merch_id=merch_id)])
+        session.commit()
+        yield user.email
+        session.execute(text("DELETE FROM users WHERE id = :id"), {"id": user.id})
+        session.commit()
+
+
+def _scans(plan: dict):
+    """Every node of an EXPLAIN (FORMAT JSON) plan."""
+    yield plan
+    for child in plan.get("Plans", ()):
+        yield from _scans(child)
+
+
+async def _seq_scans(statements) -> list:
+    """
+    (table, statement) of every sequential scan of a large table in the
+    recorded SELECTs.
+
+    An exact count (cached per filter, see app.core.counting) that matches
+    at least half of a table may scan it: it reads those rows whatever the
+    plan.
+    """
+    found = []
+    async with engine.connect() as connection:
+        table_rows = dict((await connection.execute(text(
+            "SELECT relname, reltuples FROM pg_class WHERE relname = ANY(:tables)"
+        ), {"tables": list(LARGE_TABLES)})).all())
+        for statement, parameters in zip(statements.statements, statements.parameters):
+            # count_rows() EXPLAINs for its estimate itself
+            if not statement.lstrip().upper().startswith("SELECT"):
+                continue
+            plan = (await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)).scalar()
+            for node in _scans(plan[0]["Plan"]):
+                table = node.get("Relation Name")
+                if node["Node Type"] != "Seq Scan" or table not in LARGE_TABLES:
+                    continue
+                if statement.startswith("SELECT count(*)") and node["Plan Rows"] >= table_rows[table] / 2:
+                    continue
+                found.append((table, statement))
+    return found
+
+
+PUBLIC_LISTS = [
+    "/api/v1/news/",
+    "/api/v1/news/?category=NEWS",
+    "/api/v1/news/?search=word17",
+    "/api/v1/merches/",
+    "/api/v1/merches/?is_available=true",
+    "/api/v1/merches/?filter=new",
+    "/api/v1/merches/?filter=discount",
+    "/api/v1/merches/?search=word17",
+    "/api/v1/merches/?search=word17&filter=discount",
+    "/api/v1/courses",
+    "/api/v1/courses?sport_type=Futbol",
+    "/api/v1/courses?search=word17",
+    "/api/v1/job-vacancies/",
+    "/api/v1/job-vacancies/?is_active=true",
+    "/api/v1/job-vacancies/?region=samarkand",
+    "/api/v1/job-vacancies/?employment_type=full_time",
+    "/api/v1/job-vacancies/?sport_type=tennis",
+    "/api/v1/education/",
+    "/api/v1/education/?region=samarkand",
+    "/api/v1/education/?type=school",
+    "/api/v1/users/",
+    "/api/v1/users/?role=trainer",
+]
+
+
+@pytest.mark.parametrize("path", PUBLIC_LISTS)
+async def test_list_pages_use_indexes(client, large_tables, statements, path):
+    response = await client.get(path)
+    assert response.status_code == 200, response.text
+
+    assert await _seq_scans(statements) == []
+
+
+@pytest.mark.parametrize("path", ["/api/v1/news/", "/api/v1/courses", "/api/v1/merches/", "/api/v1/users/"])
+async def test_keyset_pages_use_indexes(client, large_tables, statements, path):
+    first = (await client.get(path)).json()
+    assert first["next_cursor"]
+    statements.clear()
+
+    response = await client.get(path, params={"cursor": first["next_cursor"]})
+    assert response.status_code == 200, response.text
+
+    assert await _seq_scans(statements) == []
+
+
+@pytest.mark.parametrize("path", [
+    "/api/v1/cart/",
+    "/api/v1/favorites/",
+    "/api/v1/news/my/articles",
+    "/api/v1/courses/my",
+    "/api/v1/courses/admin/pending",
+])
+async def test_member_lists_use_indexes(client, login, member, statements, path):
+    headers = await login(member)
+    statements.clear()
+
+    response = await client.get(path, headers=headers)
+    assert response.status_code == 200, response.text
+
+    assert await _seq_scans(statements) == []
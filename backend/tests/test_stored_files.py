@@ -0,0 +1,80 @@
+"""Every row pointing at a stored file holds one reference to it, whichever way it is written or deleted"""
+import pytest
+from sqlalchemy import select
+
+import app.services.user_service as user_service
+from app.core.cache import response_cache
+from app.models.news import News
+from app.models.stored_file import StoredFile
+from app.models.user import UserRole
+from app.services.storage import storage_service
+from tests.factories import make_merch, make_news, make_user
+
+
+def _stored(session, name: str, ref_count: int = 0) -> str:
+    """URL of a new stored_files row."""
+    key = f"images/{name}.jpg"
+    session.add(StoredFile(key=key, sha256="0" * 64, size=1, ref_count=ref_count))
+    session.flush()
+    return storage_service.backend.url(key)
+
+
+def _ref_counts(session) -> dict:
+    session.expire_all()
+    return dict(session.execute(select(StoredFile.key, StoredFile.ref_count)).all())
+
+
+@pytest.fixture
+def invalidations(monkeypatch):
+    """(counted model, cache resource + ids) of every invalidation after a user delete."""
+    calls = []
+
+    async def invalidate_counts(model):
+        calls.append(model.__tablename__)
+
+    async def invalidate(resource, *object_ids):
+        calls.append((resource, *object_ids))
+
+    monkeypatch.setattr(user_service, "invalidate_counts", invalidate_counts)
+    monkeypatch.setattr(response_cache, "invalidate", invalidate)
+    return calls
+
+
+async def test_deleting_an_account_releases_its_news_and_merch_files(
+        client, login, db_session, invalidations
+):
+    user = make_user(db_session, avatar_url=_stored(db_session, "avatar", 1))
+    news = make_news(db_session, author_id=user.id, image_url=_stored(db_session, "news", 1))
+    merch = make_merch(db_session, owner_id=user.id, image_url=_stored(db_session, "merch", 2))
+    db_session.commit()
+    news_id, merch_id = news.id, merch.id
+    headers = await login(user.email)
+
+    response = await client.delete("/api/v1/users/me", headers=headers)
+    assert response.status_code == 200, response.text
+
+    assert _ref_counts(db_session) == {"images/avatar.jpg": 0, "images/news.jpg": 0, "images/merch.jpg": 1}
+    assert invalidations == ["users", "news", ("news", news_id), "merches", ("merches", merch_id)]
+
+
+async def test_news_image_is_counted_on_create_update_and_delete(client, login, db_session, invalidations):
+    admin = make_user(db_session, role=UserRole.ADMIN)
+    first, second = _stored(db_session, "first"), _stored(db_session, "second")
+    db_session.commit()
+    headers = await login(admin.email)
+
+    response = await client.post("/api/v1/news/", headers=headers, json={
+        "title": "Sarlavha", "content": "Matn", "category": "NEWS", "image_url": first,
+    })
+    assert response.status_code == 201, response.text
+    news_id = response.json()["id"]
+    assert _ref_counts(db_session) == {"images/first.jpg": 1, "images/second.jpg": 0}
+
+    response = await client.put(f"/api/v1/news/{news_id}/", headers=headers, json={"image_url": second})
+    assert response.status_code == 200, response.text
+    assert _ref_counts(db_session) == {"images/first.jpg": 0, "images/second.jpg": 1}
+
+    response = await client.delete(f"/api/v1/news/{news_id}/", headers=headers)
+    assert response.status_code == 204, response.text
+    assert _ref_counts(db_session) == {"images/first.jpg": 0, "images/second.jpg": 0}
+    assert db_session.get(News, news_id) is None
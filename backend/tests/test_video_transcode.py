@@ -0,0 +1,87 @@
+"""A course's transcoding always ends ready or failed, whatever goes wrong on the way"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import app.services.video as video
+from app.core.config import settings
+from app.models.course import Course, TranscodeStatus
+from app.models.stored_file import StoredFile
+from app.workers.tasks import transcode_course_task
+from tests.factories import make_course
+
+OUTPUTS = {
+    "hls": {"url": "/uploads/courses/ab/video_hls/master.m3u8", "keys": [], "duration": 61.4},
+    "poster": {"url": "/uploads/courses/ab/video_poster.jpg", "width": 1280, "height": 720},
+}
+
+
+@pytest.fixture
+def course(db_session) -> Course:
+    """A course whose video is in upload storage, waiting to be transcoded."""
+    db_session.add(StoredFile(key="courses/ab/video.mp4", sha256="0" * 64, size=1))
+    course = make_course(
+        db_session, video_url="/uploads/courses/ab/video.mp4", transcode_status=TranscodeStatus.pending
+    )
+    db_session.commit()
+    return course
+
+
+@pytest.fixture
+def transcode(monkeypatch):
+    """Stands in for ffmpeg: raises the queued errors, one per call, then returns OUTPUTS."""
+    errors = []
+
+    def transcode_video(key, backend=None):
+        transcode_video.calls += 1
+        if errors:
+            raise errors.pop(0)
+        return OUTPUTS
+
+    transcode_video.calls = 0
+    transcode_video.errors = errors
+    monkeypatch.setattr(video, "transcode_video", transcode_video)
+    return transcode_video
+
+
+def test_transient_errors_are_retried(db_session, course, transcode):
+    transcode.errors.append(ConnectionError("storage unavailable"))
+
+    result = transcode_course_task.apply(args=[str(course.id)])
+
+    assert result.get() == "ready"
+    assert transcode.calls == 2
+    db_session.refresh(course)
+    assert (course.transcode_status, course.duration_seconds) == (TranscodeStatus.ready, 61)
+
+
+def test_course_fails_once_retries_run_out(db_session, course, transcode):
+    transcode.errors.extend(ConnectionError("storage unavailable") for _ in range(10))
+
+    result = transcode_course_task.apply(args=[str(course.id)])
+
+    assert result.failed()
+    assert transcode.calls == transcode_course_task.max_retries + 1
+    db_session.refresh(course)
+    assert (course.transcode_status, course.transcode_error) == (TranscodeStatus.failed, "storage unavailable")
+
+
+def test_stalled_courses_are_queued_again(db_session, monkeypatch):
+    queued = []
+    monkeypatch.setattr(transcode_course_task, "delay", queued.append)
+    stalled = datetime.now(timezone.utc) - timedelta(seconds=settings.VIDEO_TRANSCODE_STALL_AFTER + 60)
+    never_queued = make_course(db_session, transcode_status=TranscodeStatus.pending, updated_at=stalled)
+    worker_died = make_course(db_session, transcode_status=TranscodeStatus.processing, updated_at=stalled)
+    make_course(db_session, transcode_status=TranscodeStatus.processing)
+    make_course(db_session, transcode_status=TranscodeStatus.failed, updated_at=stalled)
+    make_course(db_session, transcode_status=TranscodeStatus.ready, updated_at=stalled)
+    make_course(db_session, updated_at=stalled)
+    db_session.commit()
+
+    assert video.requeue_stalled_transcodes() == 2
+
+    assert sorted(queued) == sorted([str(never_queued.id), str(worker_died.id)])
+    db_session.refresh(worker_died)
+    assert worker_died.transcode_status == TranscodeStatus.pending
+    # Not again until they've stalled for another VIDEO_TRANSCODE_STALL_AFTER
+    assert video.requeue_stalled_transcodes() == 0
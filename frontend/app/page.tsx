@@ -183,7 +183,7 @@ function HomeContent() {
         const transformed = response.items.map((news: any) => ({
           id: String(news.id),
           title: news.title || "News Title",
-          excerpt: news.description || news.content || "No description",
+          excerpt: news.description || news.snippet || news.content || "No description",
           image: news.image_url || news.image || "/placeholder.svg",
           date: news.created_at
             ? news.created_at.split("T")[0]